@@ -105,4 +105,13 @@ class FieldForm(forms.ModelForm):
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
             'picture': forms.ClearableFileInput(attrs={'class': 'form-control-file'}),
             'herd': forms.SelectMultiple(attrs={'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+
+class CattleImportForm(forms.Form):
+    """
+    Form for uploading a CSV file of cattle to import.
+
+    The file needs a header line with at least the number, gender and breed columns, see my_farm.imports.
+    """
+    csv_file = forms.FileField(label='CSV file', widget=forms.ClearableFileInput(attrs={'class': 'form-control-file'}))
@@ -55,6 +55,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'my_farm.memo.RequestMemoMiddleware',
 ]
 
 ROOT_URLCONF = 'my_cattle.urls'
@@ -90,6 +91,46 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Calculated groups and reports are stored in the 'reports' cache. Set MY_FARM_REPORT_CACHE=file to keep them in
+# files shared by all worker processes instead of the memory of each process. The cached results are keyed by the
+# farm data version stored in the database (the FarmDataVersion row), so a write in any process, including the
+# run_report_worker process, invalidates them in every process whichever backend is used.
+
+REPORT_CACHE_MAX_ENTRIES = 256
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'my_farm_reports',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': REPORT_CACHE_MAX_ENTRIES},
+    },
+}
+
+if os.environ.get('MY_FARM_REPORT_CACHE') == 'file':
+    CACHES['reports'] = {
+        'BACKEND': 'my_farm.cache.LRUFileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'reports'),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': REPORT_CACHE_MAX_ENTRIES},
+    }
+
+
+# Retention of the saved livestock movement reports, applied by the prune_reports command. Reports are kept when
+# they are among the last KEEP_LAST, newer than MAX_AGE_DAYS or, with KEEP_MONTHLY, the first report of their month.
+
+REPORT_RETENTION = {
+    'KEEP_LAST': 20,
+    'MAX_AGE_DAYS': None,
+    'KEEP_MONTHLY': False,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
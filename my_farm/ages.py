@@ -0,0 +1,149 @@
+from calendar import monthrange
+from datetime import date
+
+# Ordinal stored for a missing date. It is later than any real date, so cattle without an entry date never enter a
+# group, cattle without an end date never leave, and cattle without a birthdate keep their birth weight.
+MISSING_DATE_ORDINAL = date.max.toordinal()
+
+AGE_GROUPS = ['Cows', 'Calves', 'Young_Heifer', 'Adult_Heifer', 'Young_Bull', 'Adult_Bull']
+YOUNG_AGE_MONTHS = 12
+ADULT_AGE_MONTHS = 24
+
+
+def date_ordinal(value):
+    """
+    Converts a date to its day ordinal.
+
+    :param value: The date, or None.
+    :return: The day ordinal, or MISSING_DATE_ORDINAL for a missing date.
+    """
+    return value.toordinal() if value is not None else MISSING_DATE_ORDINAL
+
+
+def ordinal_date(ordinal):
+    """
+    Converts a day ordinal back to a date.
+
+    :param ordinal: The day ordinal.
+    :return: The date, or None for MISSING_DATE_ORDINAL.
+    """
+    return date.fromordinal(ordinal) if ordinal != MISSING_DATE_ORDINAL else None
+
+
+def age_in_months(birth_date, estimation_date):
+    """
+    Calculates the number of whole months between the birthdate and the estimation date.
+
+    The result matches dateutil's relativedelta: a month is complete on the same day of the next month, or on the
+    last day of the next month if it is shorter.
+
+    :param birth_date: The birthdate of the cattle.
+    :param estimation_date: The estimation date, not earlier than the birthdate.
+    :return: The age in whole months.
+    """
+    months = (estimation_date.year - birth_date.year) * 12 + estimation_date.month - birth_date.month
+    if estimation_date.day < birth_date.day and \
+            estimation_date.day < monthrange(estimation_date.year, estimation_date.month)[1]:
+        months -= 1
+    return months
+
+
+def add_months(value, months):
+    """
+    Shifts a date by a number of months, clamping the day to the length of the resulting month.
+
+    :param value: The date to shift.
+    :param months: The number of months to add, may be negative.
+    :return: The shifted date.
+    """
+    year, month = divmod(value.month - 1 + months, 12)
+    year += value.year
+    return date(year, month + 1, min(value.day, monthrange(year, month + 1)[1]))
+
+
+def age_threshold_ordinal(estimation_date, months):
+    """
+    Finds the latest birthdate at which cattle are at least the given number of months old on the estimation date.
+
+    Cattle born on or before the returned day ordinal are at least `months` old, so an age class can be decided with
+    a single integer comparison per animal.
+
+    :param estimation_date: The estimation date.
+    :param months: The age in months.
+    :return: The day ordinal of the latest qualifying birthdate.
+    """
+    threshold = add_months(estimation_date, -months)
+    threshold_ordinal = threshold.toordinal()
+    # A birthdate at the end of a longer month can still complete its months on the last day of a shorter one.
+    while age_in_months(date.fromordinal(threshold_ordinal + 1), estimation_date) >= months:
+        threshold_ordinal += 1
+    return threshold_ordinal
+
+
+def classify_ordinals(genders, birth_ordinals, entry_ordinals, estimation_date, gender_keys=('Cow', 'Heifer', 'Bull')):
+    """
+    Sorts cattle, given as parallel columns, into the age groups in a single pass.
+
+    Cows form their own group. Heifers and bulls are calves until 12 months old, young until 24 months old and
+    adults afterwards. Cattle that have not entered the farm or are not born by the estimation date are left out.
+
+    :param genders: The gender of each cattle, as the values in gender_keys.
+    :param birth_ordinals: The birthdate ordinal of each cattle, MISSING_DATE_ORDINAL if unknown.
+    :param entry_ordinals: The entry date ordinal of each cattle, MISSING_DATE_ORDINAL if unknown.
+    :param estimation_date: The estimation date for the classification.
+    :param gender_keys: The values representing 'Cow', 'Heifer' and 'Bull' in the genders column.
+    :return: A dictionary mapping each group name to the list of positions of its cattle.
+    """
+    estimation_ordinal = estimation_date.toordinal()
+    young_ordinal = age_threshold_ordinal(estimation_date, YOUNG_AGE_MONTHS)
+    adult_ordinal = age_threshold_ordinal(estimation_date, ADULT_AGE_MONTHS)
+
+    groups = {group_name: [] for group_name in AGE_GROUPS}
+    cow, heifer, bull = gender_keys
+    cows = groups['Cows']
+    calves = groups['Calves']
+    age_classes = {
+        heifer: (groups['Young_Heifer'], groups['Adult_Heifer']),
+        bull: (groups['Young_Bull'], groups['Adult_Bull']),
+    }
+
+    for index, (gender, birth_ordinal, entry_ordinal) in enumerate(zip(genders, birth_ordinals, entry_ordinals)):
+        if entry_ordinal > estimation_ordinal:
+            continue
+        if gender == cow:
+            cows.append(index)
+            continue
+        if gender not in age_classes or birth_ordinal > estimation_ordinal:
+            continue
+
+        young, adult = age_classes[gender]
+        if birth_ordinal > young_ordinal:
+            calves.append(index)
+        elif birth_ordinal > adult_ordinal:
+            young.append(index)
+        else:
+            adult.append(index)
+
+    return groups
+
+
+def age_group(gender, birth_date, on_date):
+    """
+    Finds the age group of a single cattle on a date, following the same rules as classify_ordinals.
+
+    :param gender: The gender of the cattle.
+    :param birth_date: The birthdate of the cattle, or None.
+    :param on_date: The date.
+    :return: The group name, or None if the cattle does not belong to any group.
+    """
+    if gender == 'Cow':
+        return 'Cows'
+    if gender not in ('Heifer', 'Bull') or birth_date is None or birth_date > on_date:
+        return None
+
+    months = age_in_months(birth_date, on_date)
+    if months < YOUNG_AGE_MONTHS:
+        return 'Calves'
+    if months < ADULT_AGE_MONTHS:
+        return f'Young_{gender}'
+    return f'Adult_{gender}'
@@ -0,0 +1,124 @@
+from datetime import date
+from django.db.models import Case, Count, DateField, F, FloatField, Func, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest, Round
+from django.db.models.lookups import LessThan
+from .ages import ADULT_AGE_MONTHS, AGE_GROUPS, YOUNG_AGE_MONTHS, age_threshold_ordinal
+from .growth import growth_registry
+from .models import Cattle
+
+
+class DaysBetween(Func):
+    """
+    The number of days from a start date to an end date, negative when the end date is earlier, computed by the
+    database. The arguments are the end date and the start date.
+    """
+
+    arg_joiner = ' - '
+    template = '(%(expressions)s)'
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, template='CAST(julianday(%(expressions)s) AS INTEGER)',
+                              arg_joiner=') - julianday(', **extra_context)
+
+
+def active_on(on_date):
+    """
+    Selects the cattle that have not left the farm before a date, like SnapshotGroup.active_positions.
+
+    :param on_date: The date.
+    :return: The Q condition.
+    """
+    return Q(end_date__isnull=True) | Q(end_date__gte=on_date)
+
+
+def age_group_expression(on_date):
+    """
+    Builds the age group of each cattle on a date as a Case expression, following the rules of
+    my_farm.ages.classify_ordinals. The month thresholds are calculated once for the date, so each cattle is
+    classified with date comparisons in the database.
+
+    :param on_date: The date of the classification.
+    :return: The Case expression, the group name or NULL for cattle outside of every group.
+    """
+    young = date.fromordinal(age_threshold_ordinal(on_date, YOUNG_AGE_MONTHS))
+    adult = date.fromordinal(age_threshold_ordinal(on_date, ADULT_AGE_MONTHS))
+    entered = Q(entry_date__lte=on_date)
+    born = entered & Q(birth_date__lte=on_date)
+    return Case(
+        When(entered & Q(gender='Cow'), then=Value('Cows')),
+        When(born & Q(gender__in=['Heifer', 'Bull'], birth_date__gt=young), then=Value('Calves')),
+        When(born & Q(gender='Heifer', birth_date__gt=adult), then=Value('Young_Heifer')),
+        When(born & Q(gender='Heifer'), then=Value('Adult_Heifer')),
+        When(born & Q(gender='Bull', birth_date__gt=adult), then=Value('Young_Bull')),
+        When(born & Q(gender='Bull'), then=Value('Adult_Bull')),
+        default=None,
+    )
+
+
+def growth_expression(table, age_days):
+    """
+    Builds the weight of a growth table as a Case expression over its linear phases, see GrowthModel.phases(). The
+    weights are exact for linear and piecewise curves, and within GROWTH_PHASE_TOLERANCE for the other curves.
+
+    :param table: The GrowthTable.
+    :param age_days: The expression of the age in days, not negative.
+    :return: The weight expression.
+    """
+    whens = []
+    for start_age, end_age, start_weight, daily_gain in table.phases[:-1]:
+        weight = Value(start_weight) + Value(daily_gain) * (age_days - Value(start_age))
+        whens.append(When(LessThan(age_days, end_age), then=weight))
+    last_weight = Value(table.phases[-1][2], output_field=FloatField())
+    return Case(*whens, default=last_weight, output_field=FloatField()) if whens else last_weight
+
+
+def weight_expression(on_date):
+    """
+    Builds the estimated weight of each cattle on a date as a Case expression over the growth tables of the breeds
+    and genders, like GroupsManagement.estimate_weights. Unborn cattle and cattle without a birthdate have the birth
+    weight.
+
+    :param on_date: The date of the estimation.
+    :return: The weight expression, NULL for cattle without a growth model.
+    """
+    age_days = Greatest(Coalesce(DaysBetween(Value(on_date, output_field=DateField()), F('birth_date')), 0), 0)
+    whens = []
+    for breed, gender in sorted(growth_registry.models, key=lambda key: (key[0] is None, str(key[0]), key[1])):
+        condition = Q(gender=gender) if breed is None else Q(gender=gender, breed=breed)
+        whens.append(When(condition, then=growth_expression(growth_registry.table(gender, breed), age_days)))
+    return Case(*whens, default=None, output_field=FloatField())
+
+
+def group_totals(on_date, cattle=None):
+    """
+    Counts the cattle and sums their estimated weights for every age group on a date with a single GROUP BY query,
+    without loading the cattle. The weights are rounded to two decimals before they are summed, like in
+    SnapshotGroup.total_weight.
+
+    :param on_date: The date of the classification and weights.
+    :param cattle: The queryset of the cattle to aggregate, every cattle by default. Filter it with active_on() for
+        the cattle that have not left the farm. Deleted cattle are left out.
+    :return: A dictionary mapping each group name to a dictionary with the 'count' and the 'weight'.
+    """
+    cattle = (cattle if cattle is not None else Cattle.objects.all()).filter(deleted=False)
+    totals = {group_name: {'count': 0, 'weight': 0} for group_name in AGE_GROUPS}
+    rows = cattle.annotate(age_group=age_group_expression(on_date)).filter(age_group__isnull=False).order_by() \
+        .values('age_group').annotate(count=Count('id'), weight=Sum(Round(weight_expression(on_date), 2)))
+    for row in rows:
+        totals[row['age_group']] = {'count': row['count'], 'weight': row['weight'] or 0}
+    return totals
+
+
+def group_cattle(group_name, on_date, cattle=None):
+    """
+    Selects the cattle of an age group on a date, with their estimated 'weight' annotated.
+
+    :param group_name: The name of the group, one of AGE_GROUPS.
+    :param on_date: The date of the classification and weights.
+    :param cattle: The queryset of the cattle to select from, every cattle by default. Deleted cattle are left out.
+    :return: The queryset.
+    """
+    cattle = (cattle if cattle is not None else Cattle.objects.all()).filter(deleted=False)
+    return cattle.annotate(age_group=age_group_expression(on_date)).filter(age_group=group_name) \
+        .annotate(weight=Round(weight_expression(on_date), 2))
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MyFarmConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'my_farm'
+
+    def ready(self):
+        from . import signals  # noqa: F401
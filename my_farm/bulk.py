@@ -0,0 +1,115 @@
+from django.db import transaction
+from .counters import FarmCounters
+from .ledger import record_cattle_list_events
+from .models import Cattle, Herd
+
+# The filters that can select the cattle of a bulk operation, by request parameter.
+BULK_FILTERS = {
+    'herd': 'herd_id',
+    'gender': 'gender',
+    'breed': 'breed',
+    'acquisition_method': 'acquisition_method',
+}
+
+
+def select_cattle(cattle_ids=None, filters=None):
+    """
+    Selects the cattle of a bulk operation, by ids or by filters. Deleted cattle are never selected.
+
+    :param cattle_ids: The ids of the cattle.
+    :param filters: A dictionary of BULK_FILTERS names and values. The 'active' filter selects cattle that have not
+        left the farm.
+    :return: The queryset of the selected cattle.
+    :raises ValueError: If neither ids nor filters are provided or a filter is unknown.
+    """
+    filters = filters or {}
+    unknown = [name for name in filters if name not in BULK_FILTERS and name != 'active']
+    if unknown:
+        raise ValueError(f"Unknown filter {', '.join(unknown)}.")
+    if not cattle_ids and not filters:
+        raise ValueError('Select the cattle by ids or by a filter.')
+
+    cattle = Cattle.objects.filter(deleted=False)
+    if cattle_ids:
+        cattle = cattle.filter(id__in=cattle_ids)
+    for name, value in filters.items():
+        if name == 'active':
+            cattle = cattle.filter(end_date__isnull=True)
+        else:
+            cattle = cattle.filter(**{BULK_FILTERS[name]: value})
+    return cattle
+
+
+def move_to_herd(cattle, herd):
+    """
+    Moves the selected cattle to a herd.
+
+    :param cattle: The queryset of the cattle.
+    :param herd: The Herd, or None to remove the cattle from their herd.
+    :return: The number of cattle moved.
+    """
+    return _bulk_update(cattle.exclude(herd=herd) if herd is not None else cattle.exclude(herd__isnull=True),
+                        herd=herd)
+
+
+def record_loss(cattle, loss_method, end_date):
+    """
+    Records that the selected cattle left the farm, e.g. the sale of a truckload.
+
+    :param cattle: The queryset of the cattle.
+    :param loss_method: The loss method, one of the Cattle.LOSS_METHOD choices.
+    :param end_date: The date the cattle left.
+    :return: The number of cattle updated.
+    :raises ValueError: If the loss method is not valid.
+    """
+    if loss_method not in dict(Cattle.LOSS_METHOD):
+        raise ValueError(f"Invalid loss method. Must be one of {', '.join(dict(Cattle.LOSS_METHOD))}.")
+    return _bulk_update(cattle, loss_method=loss_method, end_date=end_date)
+
+
+def soft_delete(cattle):
+    """
+    Soft deletes the selected cattle, like Cattle.delete().
+
+    :param cattle: The queryset of the cattle.
+    :return: The number of cattle deleted.
+    """
+    return _bulk_update(cattle, deleted=True)
+
+
+def _bulk_update(cattle, **values):
+    """
+    Updates the selected cattle with a single statement in a transaction, records their ledger events as one batch
+    and recounts the herds they left or joined. The farm data version is changed once, by FarmDataQuerySet.update.
+
+    :param cattle: The queryset of the cattle.
+    :param values: The field values to set.
+    :return: The number of cattle updated.
+    """
+    with transaction.atomic():
+        previous = {row['id']: row for row in cattle.order_by().values('id', 'gender', 'herd_id')}
+        if not previous:
+            return 0
+
+        updated = Cattle.objects.filter(id__in=list(previous)).update(**values)
+        cattle_list = list(Cattle.objects.filter(id__in=list(previous)).order_by())
+        record_cattle_list_events(cattle_list, previous)
+        FarmCounters().recount(herd_ids={row['herd_id'] for row in previous.values()} |
+                               {cattle.herd_id for cattle in cattle_list})
+    return updated
+
+
+def assign_herds_to_field(herd_ids, field):
+    """
+    Moves herds to a field with a single statement and recounts the fields they left and the field.
+
+    :param herd_ids: The ids of the herds.
+    :param field: The Field.
+    :return: The number of herds moved.
+    """
+    with transaction.atomic():
+        herds = Herd.objects.filter(id__in=herd_ids)
+        previous_field_ids = set(herds.order_by().values_list('field_id', flat=True))
+        updated = herds.update(field=field)
+        FarmCounters().recount(field_ids=previous_field_ids | {field.pk})
+    return updated
@@ -0,0 +1,188 @@
+import hashlib
+import os
+import uuid
+from datetime import date
+from django.apps import apps
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import transaction
+from .growth import growth_registry
+from .memo import forget_memoized, memoize
+
+REPORT_CACHE_ALIAS = 'reports'
+# The primary key of the single FarmDataVersion row.
+DATA_VERSION_ID = 1
+# Longer key arguments are hashed to keep the keys valid for every cache backend.
+MAX_KEY_ARGUMENTS_LENGTH = 100
+
+
+class LRUFileBasedCache(FileBasedCache):
+    """
+    A file based cache that evicts the least recently used entries when MAX_ENTRIES is reached.
+
+    Reading an entry touches its file, so the modification times order the entries by their last use.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self, version)
+        if value is self:
+            return default
+        try:
+            os.utime(self._key_to_file(key, version))
+        except FileNotFoundError:
+            pass
+        return value
+
+    def _cull(self):
+        filelist = self._list_cache_files()
+        num_entries = len(filelist)
+        if num_entries < self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            return self.clear()
+
+        def last_used(fname):
+            try:
+                return os.path.getmtime(fname)
+            except FileNotFoundError:
+                return 0
+
+        filelist.sort(key=last_used)
+        for fname in filelist[:int(num_entries / self._cull_frequency)]:
+            self._delete(fname)
+
+
+class ResultCache:
+    """
+    Caches calculated results under keys that include the farm data version and the growth model version.
+
+    The data version changes whenever cattle, herds or fields change, so results calculated from older data are never
+    read again and are left for the LRU eviction of the cache backend. The version is stored in the FarmDataVersion
+    row and changed in the transaction of the write, so a write in one process invalidates the results cached by
+    every other process, whatever the cache backend. It is read once per unit of work, see my_farm.memo.
+    """
+
+    def __init__(self, alias=REPORT_CACHE_ALIAS):
+        """
+        Initializes a ResultCache instance.
+
+        :param alias: The alias of the cache in the CACHES setting.
+        """
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def _version_model():
+        return apps.get_model('my_farm', 'FarmDataVersion')
+
+    def data_version(self):
+        """
+        Returns the current farm data version, creating one if the database does not hold it.
+
+        :return: The data version string.
+        """
+        return memoize('farm_data_version', [], self._load_version)
+
+    def _load_version(self):
+        version = self._version_model().objects.filter(pk=DATA_VERSION_ID).values_list('version', flat=True).first()
+        if version is None:
+            version = self._version_model().objects.get_or_create(
+                pk=DATA_VERSION_ID, defaults={'version': uuid.uuid4().hex})[0].version
+        return version
+
+    def bump_version(self):
+        """
+        Changes the farm data version, so every result calculated before is recalculated. The change is part of the
+        current transaction, so it is rolled back together with the write.
+
+        :return: A tuple of the previous version, None if there was none, and the new version.
+        """
+        model = self._version_model()
+        version = uuid.uuid4().hex
+        with transaction.atomic(savepoint=False):
+            previous = model.objects.select_for_update().filter(pk=DATA_VERSION_ID).values_list(
+                'version', flat=True).first()
+            if previous is None:
+                model.objects.update_or_create(pk=DATA_VERSION_ID, defaults={'version': version})
+            else:
+                model.objects.filter(pk=DATA_VERSION_ID).update(version=version)
+        forget_memoized()
+        memoize('farm_data_version', [], lambda: version)
+        return previous, version
+
+    def key(self, name, *args, versioned=True):
+        """
+        Builds the cache key of a result.
+
+        :param name: The name of the calculation.
+        :param args: The arguments of the calculation.
+        :param versioned: Whether the key includes the data and growth model versions. Results calculated only from
+            data that never changes, e.g. saved reports, can leave them out.
+        :return: The cache key.
+        """
+        arguments = ':'.join(self._key_part(argument) for argument in args)
+        if len(arguments) > MAX_KEY_ARGUMENTS_LENGTH:
+            arguments = hashlib.sha1(arguments.encode()).hexdigest()
+        if not versioned:
+            return f'{name}:{arguments}'
+        return f'{name}:{self.data_version()}:{growth_registry.version()}:{arguments}'
+
+    def get_or_calculate(self, name, args, calculate, versioned=True):
+        """
+        Returns a cached result, calculating and storing it on a miss.
+
+        :param name: The name of the calculation.
+        :param args: The arguments of the calculation, part of the cache key.
+        :param calculate: The function calculating the result.
+        :param versioned: Whether the result depends on the farm data and growth models, see key().
+        :return: The result.
+        """
+        key = self.key(name, *args, versioned=versioned)
+        result = self.cache.get(key, self)
+        if result is not self:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = calculate()
+        self.cache.set(key, result, timeout=None)
+        return result
+
+    @classmethod
+    def _key_part(cls, argument):
+        """
+        Formats a calculation argument for the cache key, dates in ISO format and sequences joined by '_'.
+
+        :param argument: The argument.
+        :return: The formatted argument.
+        """
+        if isinstance(argument, (list, tuple)):
+            return '_'.join(cls._key_part(item) for item in argument)
+        if isinstance(argument, date):
+            return argument.isoformat()
+        return str(argument)
+
+    def stats(self):
+        """
+        Returns the hit and miss counters of this process.
+
+        :return: A dictionary with the 'hits', 'misses' and 'hit_rate'.
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': round(self.hits / lookups, 4) if lookups else 0}
+
+    def clear(self):
+        """
+        Removes every cached result and resets the counters.
+        """
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+result_cache = ResultCache()
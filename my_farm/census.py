@@ -0,0 +1,176 @@
+from datetime import date, timedelta
+from .models import Cattle
+from .growth import growth_registry
+from .ages import AGE_GROUPS, YOUNG_AGE_MONTHS, ADULT_AGE_MONTHS, add_months
+
+# Ordinals used as open ends of the intervals cattle stay in a group or in a weight phase.
+OPEN_START_ORDINAL = 0
+OPEN_END_ORDINAL = date.max.toordinal() + 1
+
+
+class HerdCensus:
+    """
+    Calculates the daily headcount and estimated live weight of each age group over a date range.
+
+    Every cattle is turned into a few events - entering the farm, leaving it and crossing the 12 and 24 month age
+    thresholds - which are swept once with prefix sums, so the cost grows with cattle + days rather than
+    cattle x days.
+    """
+
+    def __init__(self, start_date, end_date):
+        """
+        Initializes a HerdCensus instance for the provided date range.
+
+        :param start_date: The first day of the census.
+        :param end_date: The last day of the census, inclusive.
+        :raises ValueError: If the end date is earlier than the start date.
+        """
+        if end_date < start_date:
+            raise ValueError('The end date must not be earlier than the start date.')
+
+        self.start_date = start_date
+        self.end_date = end_date
+        self.start_ordinal = start_date.toordinal()
+        self.days = end_date.toordinal() - self.start_ordinal + 1
+        self.count_changes = {group_name: [0] * (self.days + 1) for group_name in AGE_GROUPS}
+        self.weight_changes = {group_name: [0.0] * (self.days + 1) for group_name in AGE_GROUPS}
+        self.slope_changes = {group_name: [0.0] * (self.days + 1) for group_name in AGE_GROUPS}
+
+    def add_cattle_list(self, cattle_list):
+        """
+        Adds the events of each cattle in the list to the census.
+
+        :param cattle_list: The cattle dictionaries, each containing 'gender', 'breed', 'birth_date', 'entry_date' and
+            'end_date'.
+        """
+        for cattle in cattle_list:
+            self.add_cattle(cattle)
+
+    def add_cattle(self, cattle):
+        """
+        Adds the events of a single cattle to the census.
+
+        Cattle are counted from their entry date up to and including their end date. Heifers and bulls move from
+        the calves to the young and then to the adult group as they reach 12 and 24 months.
+
+        :param cattle: The cattle dictionary, containing 'gender', 'breed', 'birth_date', 'entry_date' and 'end_date'.
+        """
+        if cattle['entry_date'] is None or cattle['gender'] not in ('Cow', 'Heifer', 'Bull'):
+            return
+
+        present_from = cattle['entry_date'].toordinal()
+        present_to = cattle['end_date'].toordinal() + 1 if cattle['end_date'] is not None else OPEN_END_ORDINAL
+        phases = self._weight_phases(cattle)
+        gender = cattle['gender']
+        birth_date = cattle['birth_date']
+
+        if gender == 'Cow':
+            self._add_stay('Cows', present_from, present_to, phases)
+            return
+        if birth_date is None:
+            return
+
+        born = birth_date.toordinal()
+        young_from = add_months(birth_date, YOUNG_AGE_MONTHS).toordinal()
+        adult_from = add_months(birth_date, ADULT_AGE_MONTHS).toordinal()
+
+        self._add_stay('Calves', max(present_from, born), min(present_to, young_from), phases)
+        self._add_stay(f'Young_{gender}', max(present_from, young_from), min(present_to, adult_from), phases)
+        self._add_stay(f'Adult_{gender}', max(present_from, adult_from), present_to, phases)
+
+    def series(self):
+        """
+        Sweeps the recorded events into the daily series of each group.
+
+        :return: A dictionary with the census dates and, for each group, the daily 'count' and 'weight' lists.
+        """
+        groups = {}
+        for group_name in AGE_GROUPS:
+            count_changes = self.count_changes[group_name]
+            weight_changes = self.weight_changes[group_name]
+            slope_changes = self.slope_changes[group_name]
+
+            count = 0
+            weight = 0.0
+            slope = 0.0
+            counts = []
+            weights = []
+            for day in range(self.days):
+                count += count_changes[day]
+                weight += slope + weight_changes[day]
+                slope += slope_changes[day]
+                counts.append(count)
+                weights.append(round(weight, 2) if count else 0)
+
+            groups[group_name] = {'count': counts, 'weight': weights}
+
+        return {
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat(),
+            'dates': [(self.start_date + timedelta(days=day)).isoformat() for day in range(self.days)],
+            'groups': groups,
+        }
+
+    def calculate_census(self):
+        """
+        Loads the cattle with a single query and calculates the daily series of each group.
+
+        :return: The census series, see series().
+        """
+        cattle_list = Cattle.objects.filter(deleted=False).values(
+            'gender', 'breed', 'birth_date', 'entry_date', 'end_date')
+        self.add_cattle_list(cattle_list.iterator())
+        return self.series()
+
+    @staticmethod
+    def _weight_phases(cattle):
+        """
+        Describes the estimated weight of the cattle as linear phases over time, from the phases of its growth table.
+
+        The weight is the birth weight until birth and follows the growth table afterwards, matching
+        GroupsManagement.estimate_weights.
+
+        :param cattle: The cattle dictionary, containing 'gender', 'birth_date' and optionally 'breed'.
+        :return: A list of (start ordinal, end ordinal, weight at start, daily gain) tuples.
+        """
+        table = growth_registry.table(cattle['gender'], cattle.get('breed'))
+        if cattle['birth_date'] is None:
+            return [(OPEN_START_ORDINAL, OPEN_END_ORDINAL, table.weights[0], 0.0)]
+
+        born = cattle['birth_date'].toordinal()
+        phases = [(OPEN_START_ORDINAL, born, table.weights[0], 0.0)]
+        for first_age, end_age, weight, daily_gain in table.phases:
+            phase_end = born + end_age if end_age is not None else OPEN_END_ORDINAL
+            phases.append((born + first_age, phase_end, weight, daily_gain))
+        return phases
+
+    def _add_stay(self, group_name, stay_from, stay_to, phases):
+        """
+        Records the events of a cattle staying in a group from stay_from up to, but not including, stay_to.
+
+        :param group_name: The name of the group.
+        :param stay_from: The ordinal of the first day in the group.
+        :param stay_to: The ordinal of the first day no longer in the group.
+        :param phases: The weight phases of the cattle, see _weight_phases().
+        """
+        first = max(stay_from, self.start_ordinal) - self.start_ordinal
+        last = min(stay_to, self.start_ordinal + self.days) - self.start_ordinal
+        if first >= last:
+            return
+
+        self.count_changes[group_name][first] += 1
+        self.count_changes[group_name][last] -= 1
+
+        weight_changes = self.weight_changes[group_name]
+        slope_changes = self.slope_changes[group_name]
+        for phase_from, phase_to, phase_weight, daily_gain in phases:
+            segment_first = max(first, phase_from - self.start_ordinal)
+            segment_last = min(last, phase_to - self.start_ordinal)
+            if segment_first >= segment_last:
+                continue
+
+            weight = phase_weight + (segment_first + self.start_ordinal - phase_from) * daily_gain
+            weight_changes[segment_first] += weight
+            slope_changes[segment_first] += daily_gain
+            weight_changes[segment_last] -= weight + (segment_last - segment_first) * daily_gain
+            slope_changes[segment_last] -= daily_gain
@@ -4,4 +4,19 @@ MALE_BIRTH_WEIGHT = 36
 DAILY_WEIGHT_GAIN = 1.05
 FEMALE_MAX_WEIGHT = 600
 MALE_MAX_WEIGHT = 800
+CROSSBREED_FEMALE_BIRTH_WEIGHT = 34
+CROSSBREED_FEMALE_MATURE_WEIGHT = 620
+CROSSBREED_FEMALE_GROWTH_RATE = 0.005
+CROSSBREED_MALE_GROWTH_POINTS = [(0, 38), (205, 260), (365, 420), (730, 700), (1460, 900)]
+GROWTH_TABLE_DAYS = 20 * 366
+GROWTH_PHASE_TOLERANCE = 0.5
 MAX_REPORTS = 20
+REPORT_JOB_POLL_INTERVAL = 2
+REPORT_RETENTION_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 500
+SEARCH_PAGE_SIZE = 20
+TAG_MATCH_LIMIT = 5
+TAG_SIMILARITY = 0.3
+TAG_LOOKUP_MAX_TAGS = 1000
+LIST_PAGE_SIZE = 20
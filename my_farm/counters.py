@@ -0,0 +1,198 @@
+from datetime import date
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Round
+from .groups import GroupsManagement
+from .models import Cattle, Field, Herd
+
+HERD_COUNTERS = ['active_cattle_count', 'total_cattle_count', 'live_weight']
+FIELD_COUNTERS = ['herd_count', 'active_cattle_count', 'total_cattle_count', 'live_weight']
+# The cattle values a herd counter depends on.
+COUNTED_CATTLE_FIELDS = ['herd_id', 'gender', 'breed', 'birth_date', 'loss_method', 'deleted']
+
+
+class FarmCounters:
+    """
+    Maintains the counter columns of the herds and fields, so list pages read them instead of counting cattle.
+
+    The counters of the herds and fields touched by a bulk write are recounted from the cattle in the same
+    transaction. A single saved or deleted cattle only changes the counters of its herds and their fields by its own
+    contribution, see update_cattle(). The live weight is the estimated weight of the active cattle on the date the
+    herd was counted on, stored in counted_on; the reconcile command refreshes it and repairs counters changed by
+    writes that skip this class.
+
+    Counters are written with the base managers, so updating them does not change the farm data version.
+    """
+
+    def __init__(self, on_date=None):
+        """
+        Initializes a FarmCounters instance.
+
+        :param on_date: The date of the live weight estimates, today by default.
+        """
+        self.on_date = on_date or date.today()
+
+    def count_herds(self, herd_ids):
+        """
+        Counts the cattle of herds with a single query. Active cattle are not deleted and have no loss method.
+
+        :param herd_ids: The ids of the herds.
+        :return: A dictionary mapping each herd id to a dictionary of HERD_COUNTERS values.
+        """
+        counters = {herd_id: {'active_cattle_count': 0, 'total_cattle_count': 0, 'live_weight': 0}
+                    for herd_id in herd_ids}
+        cattle_list = Cattle.objects.filter(herd_id__in=counters, deleted=False).order_by().values(
+            'herd_id', 'gender', 'breed', 'birth_date', 'loss_method')
+
+        active_cattle = []
+        for cattle in cattle_list:
+            counters[cattle['herd_id']]['total_cattle_count'] += 1
+            if cattle['loss_method'] is None:
+                counters[cattle['herd_id']]['active_cattle_count'] += 1
+                active_cattle.append(cattle)
+
+        weights = GroupsManagement().estimate_cattle_list_weights(active_cattle, self.on_date)
+        for cattle, weight in zip(active_cattle, weights):
+            counters[cattle['herd_id']]['live_weight'] += weight
+        for values in counters.values():
+            values['live_weight'] = round(values['live_weight'], 2)
+        return counters
+
+    def count_fields(self, field_ids, herd_counters=None):
+        """
+        Sums the counters of the herds of fields with a single query.
+
+        :param field_ids: The ids of the fields.
+        :param herd_counters: The herd counters to use instead of the stored ones, see count_herds().
+        :return: A dictionary mapping each field id to a dictionary of FIELD_COUNTERS values.
+        """
+        herd_counters = herd_counters or {}
+        counters = {field_id: dict.fromkeys(FIELD_COUNTERS, 0) for field_id in field_ids}
+        for herd in Herd.objects.filter(field_id__in=counters).order_by().values('id', 'field_id', *HERD_COUNTERS):
+            values = counters[herd['field_id']]
+            values['herd_count'] += 1
+            for counter in HERD_COUNTERS:
+                values[counter] += herd_counters.get(herd['id'], herd)[counter]
+        for values in counters.values():
+            values['live_weight'] = round(values['live_weight'], 2)
+        return counters
+
+    def save(self, herd_counters=None, field_counters=None):
+        """
+        Stores counters with one bulk update per model.
+
+        :param herd_counters: The counters of herds, see count_herds().
+        :param field_counters: The counters of fields, see count_fields().
+        """
+        if herd_counters:
+            Herd._base_manager.bulk_update(
+                [Herd(id=herd_id, counted_on=self.on_date, **values) for herd_id, values in herd_counters.items()],
+                [*HERD_COUNTERS, 'counted_on'])
+        if field_counters:
+            Field._base_manager.bulk_update(
+                [Field(id=field_id, counted_on=self.on_date, **values)
+                 for field_id, values in field_counters.items()],
+                [*FIELD_COUNTERS, 'counted_on'])
+
+    def update_cattle(self, previous=None, current=None):
+        """
+        Updates the counters of the herds of one saved or deleted cattle and of their fields by the contribution of the
+        cattle, without recounting the other cattle of the herds. The weight of the cattle is estimated on the date
+        the herd was counted on, so every weight of a herd keeps the same estimation date.
+
+        :param previous: A dictionary of the COUNTED_CATTLE_FIELDS values stored before the write, or None for a new
+            cattle.
+        :param current: A dictionary of the COUNTED_CATTLE_FIELDS values stored after the write, or None for a deleted
+            cattle.
+        """
+        contributions = [(values, sign) for values, sign in [(previous, -1), (current, 1)]
+                         if values is not None and values['herd_id'] is not None and not values['deleted']]
+        if len(contributions) == 2 and contributions[0][0] == contributions[1][0]:
+            return
+        if not contributions:
+            return
+
+        herds = {herd['id']: herd for herd in Herd._base_manager.filter(
+            id__in={values['herd_id'] for values, sign in contributions}).order_by().values(
+            'id', 'field_id', 'counted_on')}
+        herd_deltas = {}
+        for values, sign in contributions:
+            herd = herds.get(values['herd_id'])
+            if herd is None:
+                continue
+            delta = herd_deltas.setdefault(herd['id'], dict.fromkeys(HERD_COUNTERS, 0))
+            delta['total_cattle_count'] += sign
+            if values['loss_method'] is None:
+                delta['active_cattle_count'] += sign
+                weight = GroupsManagement().estimate_cattle_list_weights([values], herd['counted_on'] or self.on_date)
+                delta['live_weight'] += sign * weight[0]
+
+        field_deltas = {}
+        for herd_id, delta in herd_deltas.items():
+            field_id = herds[herd_id]['field_id']
+            if field_id is not None:
+                field_delta = field_deltas.setdefault(field_id, dict.fromkeys(HERD_COUNTERS, 0))
+                for counter in HERD_COUNTERS:
+                    field_delta[counter] += delta[counter]
+
+        with transaction.atomic():
+            for herd_id, delta in herd_deltas.items():
+                counted_on = {} if herds[herd_id]['counted_on'] else {'counted_on': self.on_date}
+                Herd._base_manager.filter(pk=herd_id).update(**self._increments(delta), **counted_on)
+            for field_id, delta in field_deltas.items():
+                Field._base_manager.filter(pk=field_id).update(**self._increments(delta))
+
+    @staticmethod
+    def _increments(delta):
+        """
+        Builds the update() values adding a delta to the counters, keeping the live weight rounded like the recount.
+
+        :param delta: A dictionary of HERD_COUNTERS deltas.
+        :return: A dictionary of expressions by counter.
+        """
+        increments = {counter: F(counter) + value for counter, value in delta.items()}
+        increments['live_weight'] = Round(increments['live_weight'], 2)
+        return increments
+
+    def recount(self, herd_ids=(), field_ids=()):
+        """
+        Recounts herds, their fields and other fields in a transaction, e.g. after cattle moved between herds or
+        herds between fields.
+
+        :param herd_ids: The ids of the herds, None values are ignored.
+        :param field_ids: The ids of other fields, None values are ignored.
+        """
+        herd_ids = {herd_id for herd_id in herd_ids if herd_id is not None}
+        field_ids = {field_id for field_id in field_ids if field_id is not None}
+        if not herd_ids and not field_ids:
+            return
+
+        with transaction.atomic():
+            if herd_ids:
+                self.save(herd_counters=self.count_herds(herd_ids))
+                field_ids.update(Herd.objects.filter(id__in=herd_ids, field__isnull=False).order_by().values_list(
+                    'field_id', flat=True))
+            self.save(field_counters=self.count_fields(field_ids))
+
+    def reconcile(self, dry_run=False):
+        """
+        Recounts every herd and field and stores the counters, repairing the drifted ones and refreshing the live
+        weights.
+
+        :param dry_run: Whether to only find the drifted counters without storing any.
+        :return: A dictionary with the number of 'herds' and 'fields' whose counters drifted.
+        """
+        with transaction.atomic():
+            stored_herds = {herd['id']: herd for herd in Herd.objects.order_by().values('id', *HERD_COUNTERS)}
+            herd_counters = self.count_herds(stored_herds)
+            stored_fields = {field['id']: field for field in Field.objects.order_by().values('id', *FIELD_COUNTERS)}
+            field_counters = self.count_fields(stored_fields, herd_counters)
+
+            drifted_herds = {herd_id: values for herd_id, values in herd_counters.items()
+                             if any(stored_herds[herd_id][counter] != value for counter, value in values.items())}
+            drifted_fields = {field_id: values for field_id, values in field_counters.items()
+                              if any(stored_fields[field_id][counter] != value for counter, value in values.items())}
+            if not dry_run:
+                self.save(herd_counters, field_counters)
+
+        return {'herds': len(drifted_herds), 'fields': len(drifted_fields)}
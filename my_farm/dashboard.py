@@ -0,0 +1,56 @@
+from datetime import date
+from .aggregates import group_totals
+from .cache import result_cache
+from .models import Cattle, Field, Herd
+from .rollup import DailyRollup
+
+
+def farm_summary(on_date=None):
+    """
+    Returns the numbers of the home dashboard. They are cached until the farm data changes, and the cache key
+    includes the date, so the age groups roll over at midnight.
+
+    :param on_date: The date of the summary, today by default.
+    :return: The summary dictionary, see calculate_farm_summary().
+    """
+    on_date = on_date or date.today()
+    return result_cache.get_or_calculate('farm_summary', [on_date], lambda: calculate_farm_summary(on_date))
+
+
+def calculate_farm_summary(on_date):
+    """
+    Counts the active herds, active fields and active cattle of every age group. Active cattle have no end date. The
+    cattle are counted from the daily rollup when it is current for the date, see rollup_active_cattle(), and with
+    aggregate queries otherwise, see my_farm.aggregates.group_totals.
+
+    :param on_date: The date of the summary.
+    :return: A dictionary with the 'groups' mapping each group name to its number of active cattle, the
+        'total_cattle_count', the 'active_herds_count' and the 'active_field_count'.
+    """
+    groups = rollup_active_cattle(on_date)
+    if groups is None:
+        totals = group_totals(on_date, Cattle.objects.filter(end_date__isnull=True))
+        groups = {group_name: group['count'] for group_name, group in totals.items()}
+    return {
+        'groups': groups,
+        'total_cattle_count': sum(groups.values()),
+        'active_herds_count': Herd.objects.filter(is_active=True, start_date__lte=on_date).count(),
+        'active_field_count': Field.objects.filter(is_active=True).count(),
+    }
+
+
+def rollup_active_cattle(on_date):
+    """
+    Counts the active cattle of every age group from the headcounts of the daily rollup, see
+    DailyRollup.headcounts. The rollup counts cattle until the day they leave, so the cattle with a later end date
+    are counted with an aggregate query and subtracted.
+
+    :param on_date: The date.
+    :return: A dictionary mapping each group name to its number of active cattle, or None if the rollup is not
+        current for the date.
+    """
+    headcounts = DailyRollup().headcounts(on_date)
+    if headcounts is None:
+        return None
+    leaving = group_totals(on_date, Cattle.objects.filter(end_date__gt=on_date))
+    return {group_name: headcount - leaving[group_name]['count'] for group_name, headcount in headcounts.items()}
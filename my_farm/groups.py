@@ -1,6 +1,13 @@
-from dateutil.relativedelta import relativedelta
+from array import array
+from datetime import date
+from .cache import result_cache
 from .models import Cattle
-from .constants import FEMALE_BIRTH_WEIGHT, MALE_BIRTH_WEIGHT, FEMALE_MAX_WEIGHT, MALE_MAX_WEIGHT, DAILY_WEIGHT_GAIN
+from .growth import growth_registry
+from .memo import memoize
+from .snapshot import HerdSnapshot, SnapshotGroup
+from .ages import MISSING_DATE_ORDINAL, date_ordinal, age_in_months, add_months, classify_ordinals
+
+PERIOD_GRANULARITIES = {'month': 1, 'quarter': 3, 'year': 12}
 
 
 class GroupNumbers:
@@ -15,7 +22,7 @@ class GroupNumbers:
         :param group_name: The name of the group.
         :param group_data: The data associated with the group.
         """
-        self.filter_acquisition_loss_dates = None
+        self.acquisition_loss_ids = set()
         self.group_name = group_name
         self.group_data = group_data
         self.start_date_count = 0
@@ -60,22 +67,31 @@ class GroupNumbers:
         :param start_date_groups: A dictionary containing the group data organized by group name for the start date.
         :param end_date_groups: A dictionary containing the group data organized by group name for the end date.
         """
-        start_date_list = start_date_groups.get(self.group_name, [])
-        end_date_list = end_date_groups.get(self.group_name, [])
+        start_date_group = SnapshotGroup.from_group_data(start_date_groups.get(self.group_name, []))
+        end_date_group = SnapshotGroup.from_group_data(end_date_groups.get(self.group_name, []))
 
-        start_date_filtered = [cattle for cattle in start_date_list if (cattle['cattle']['end_date'] is None or
-                                                                        cattle['cattle']['end_date'] >= start_date)]
+        start_date_filtered = start_date_group.active_positions(start_date)
+        end_date_filtered = end_date_group.active_positions(end_date)
 
-        end_date_filtered = [cattle for cattle in end_date_list if (cattle['cattle']['end_date'] is None or
-                                                                    cattle['cattle']['end_date'] >= end_date)]
+        self.quantity_from_totals(
+            {'count': len(start_date_filtered), 'weight': start_date_group.total_weight(start_date_filtered)},
+            {'count': len(end_date_filtered), 'weight': end_date_group.total_weight(end_date_filtered)})
 
-        self.start_date_count = len(start_date_filtered)
-        self.end_date_count = len(end_date_filtered)
+    def quantity_from_totals(self, start_date_totals, end_date_totals):
+        """
+        Sets the quantity and weight of cattle for the group from the totals of its active cattle, e.g. the totals of
+        my_farm.aggregates.group_totals, without loading the cattle.
+
+        :param start_date_totals: A dictionary with the 'count' and 'weight' of the group on the start date.
+        :param end_date_totals: A dictionary with the 'count' and 'weight' of the group on the end date.
+        """
+        self.start_date_count = start_date_totals['count']
+        self.end_date_count = end_date_totals['count']
 
         self.count_difference = self.end_date_count - self.start_date_count
 
-        self.start_date_group_weight = round(sum(cattle_dict['weight'] for cattle_dict in start_date_filtered))
-        self.end_date_group_weight = round(sum(cattle_dict['weight'] for cattle_dict in end_date_filtered))
+        self.start_date_group_weight = round(start_date_totals['weight'])
+        self.end_date_group_weight = round(end_date_totals['weight'])
 
         self.weight_difference = round((self.end_date_group_weight - self.start_date_group_weight))
 
@@ -83,28 +99,33 @@ class GroupNumbers:
         """
         Calculates the acquisition and loss statistics of the group based on the provided start and end dates.
 
-        The weight in the acquisition or loss column will be estimated based on the acquisition date for the acquisition
-        methods and the end date for the loss methods.
+        Every cattle that entered or left within the dates is counted in its acquisition column and, if it has a loss
+        method, in its loss column. The weight in the acquisition or loss column will be estimated based on the
+        acquisition date for the acquisition methods and the end date for the loss methods.
 
         :param start_date: The start date for the acquisition/loss calculation.
         :param end_date: The end date for the acquisition/loss calculation.
         """
-        self.filter_acquisition_loss_dates = [
-            cattle for cattle in self.group_data
-            if (
-                    ('entry_date' in cattle['cattle'] and cattle['cattle']['entry_date'] is not None and start_date <=
-                     cattle['cattle']['entry_date'] <= end_date)
-                    or ('end_date' in cattle['cattle'] and cattle['cattle']['end_date'] is not None and start_date <=
-                        cattle['cattle']['end_date'] <= end_date)
-            )
+        group = SnapshotGroup.from_group_data(self.group_data)
+        snapshot = group.snapshot
+        start_ordinal = start_date.toordinal()
+        end_ordinal = end_date.toordinal()
+
+        positions = [
+            position for position, index in enumerate(group.indexes)
+            if start_ordinal <= snapshot.entry_ordinals[index] <= end_ordinal
+            or start_ordinal <= snapshot.end_ordinals[index] <= end_ordinal
         ]
+        indexes = [group.indexes[position] for position in positions]
+        self.acquisition_loss_ids = {snapshot.ids[index] for index in indexes}
 
-        for item in self.filter_acquisition_loss_dates:
-            cattle = item['cattle']
+        entry_weights = snapshot.estimate_weights(indexes, [snapshot.entry_ordinals[index] for index in indexes])
+        end_weights = snapshot.estimate_weights(indexes, [snapshot.end_ordinals[index] for index in indexes])
 
-            entry_weight = round(GroupsManagement().estimate_cattle_weight(cattle['id'], cattle['entry_date']))
-            end_weight = round(GroupsManagement().estimate_cattle_weight(cattle['id'], cattle['end_date'])) if \
-                cattle['end_date'] is not None else 0
+        for position, index in enumerate(indexes):
+            cattle = snapshot.cattle(index)
+            entry_weight = round(entry_weights[position])
+            end_weight = round(end_weights[position]) if snapshot.end_ordinals[index] != MISSING_DATE_ORDINAL else 0
 
             if 'acquisition_method' in cattle:
                 if cattle['acquisition_method'] == 'Birth':
@@ -131,29 +152,100 @@ class GroupNumbers:
                     self.gifted_count += 1
                     self.gifted_weight += end_weight
 
-    def check_movement(self, start_date_groups, end_date_groups):
+    def check_movement(self, start_date_groups, end_date_groups, movements=None):
         """
         Checks the movement of the group by comparing the start and end date groups.
 
+        Cattle acquired or lost within the dates, see acquisition_loss(), are not counted as moved.
+
         :param start_date_groups: The dictionary of start date groups.
         :param end_date_groups: The dictionary of end date groups.
+        :param movements: The movements of all groups calculated by diff_movements(), calculated for this group only
+            if not provided.
         """
-        start_date_list = start_date_groups.get(self.group_name, [])
-        end_date_list = end_date_groups.get(self.group_name, [])
+        if movements is None:
+            movements = self.diff_movements({self.group_name: start_date_groups.get(self.group_name, [])},
+                                            {self.group_name: end_date_groups.get(self.group_name, [])},
+                                            {self.group_name: self.acquisition_loss_ids})
+
+        movement = movements.get(self.group_name, {})
+        self.moved_in = movement.get('moved_in', 0)
+        self.moved_out = movement.get('moved_out', 0)
+        self.weight_moved_in = movement.get('weight_moved_in', 0)
+        self.weight_moved_out = movement.get('weight_moved_out', 0)
+
+    @staticmethod
+    def diff_movements(start_date_groups, end_date_groups, excluded_ids=None):
+        """
+        Finds the cattle that moved into or out of each group between the start and end date groups.
 
-        moved_out = [item for item in start_date_list if
-                     item['cattle']['id'] not in [cattle['cattle']['id'] for cattle in end_date_list] and
-                     item not in self.filter_acquisition_loss_dates]
+        The group of every cattle id on each date is indexed once, so all groups are compared in time linear in the
+        number of cattle. A cattle moved out of a group if it is no longer in it on the end date and moved in if it
+        was not in it on the start date, unless its id is excluded for the group.
 
-        moved_in = [item for item in end_date_list if
-                    item['cattle']['id'] not in [cattle['cattle']['id'] for cattle in start_date_list] and
-                    item not in self.filter_acquisition_loss_dates]
-        print(self.filter_acquisition_loss_dates)
-        self.moved_in = len(moved_in)
-        self.moved_out = len(moved_out)
+        :param start_date_groups: The dictionary of start date groups.
+        :param end_date_groups: The dictionary of end date groups.
+        :param excluded_ids: A dictionary mapping group names to the cattle ids not counted as moved, e.g. the
+            GroupNumbers.acquisition_loss_ids of each group.
+        :return: A dictionary mapping each group name to its 'moved_in', 'moved_out', 'weight_moved_in' and
+            'weight_moved_out' numbers.
+        """
+        excluded_ids = excluded_ids or {}
+        start_groups = {group_name: SnapshotGroup.from_group_data(group_data)
+                        for group_name, group_data in start_date_groups.items()}
+        end_groups = {group_name: SnapshotGroup.from_group_data(group_data)
+                      for group_name, group_data in end_date_groups.items()}
+        start_ids = {group_name: group.cattle_ids() for group_name, group in start_groups.items()}
+        end_ids = {group_name: group.cattle_ids() for group_name, group in end_groups.items()}
+
+        start_membership = {cattle_id: group_name for group_name, ids in start_ids.items() for cattle_id in ids}
+        end_membership = {cattle_id: group_name for group_name, ids in end_ids.items() for cattle_id in ids}
+
+        movements = {}
+        for group_name in {**start_groups, **end_groups}:
+            excluded = excluded_ids.get(group_name, set())
+            moved_out = [position for position, cattle_id in enumerate(start_ids.get(group_name, []))
+                         if end_membership.get(cattle_id) != group_name and cattle_id not in excluded]
+            moved_in = [position for position, cattle_id in enumerate(end_ids.get(group_name, []))
+                        if start_membership.get(cattle_id) != group_name and cattle_id not in excluded]
+
+            movements[group_name] = {
+                'moved_in': len(moved_in),
+                'moved_out': len(moved_out),
+                'weight_moved_in': round(end_groups[group_name].total_weight(moved_in)) if moved_in else 0,
+                'weight_moved_out': round(start_groups[group_name].total_weight(moved_out)) if moved_out else 0,
+            }
+
+        return movements
+
+    @classmethod
+    def combine(cls, period_groups):
+        """
+        Combines the numbers of the same group over consecutive periods into the numbers for the whole range.
 
-        self.weight_moved_in = round(sum(item.get('weight', 0) for item in moved_in))
-        self.weight_moved_out = round(sum(item.get('weight', 0) for item in moved_out))
+        The beginning of the range is taken from the first period and the end from the last one, while the
+        acquisitions, losses and movements are summed over all periods.
+
+        :param period_groups: The GroupNumbers instances of one group, in chronological order.
+        :return: A GroupNumbers instance with the totals of the group.
+        """
+        first, last = period_groups[0], period_groups[-1]
+        totals = cls(last.group_name, last.group_data)
+
+        totals.start_date_count = first.start_date_count
+        totals.start_date_group_weight = first.start_date_group_weight
+        totals.end_date_count = last.end_date_count
+        totals.end_date_group_weight = last.end_date_group_weight
+        totals.count_difference = totals.end_date_count - totals.start_date_count
+        totals.weight_difference = totals.end_date_group_weight - totals.start_date_group_weight
+
+        for attribute in ['birth_count', 'birth_weight', 'purchase_count', 'purchase_weight', 'gift_count',
+                          'gift_weight', 'death_count', 'death_weight', 'sold_count', 'sold_weight',
+                          'consumed_count', 'consumed_weight', 'gifted_count', 'gifted_weight', 'moved_in',
+                          'moved_out', 'weight_moved_in', 'weight_moved_out']:
+            setattr(totals, attribute, sum(getattr(group, attribute) for group in period_groups))
+
+        return totals
 
     def to_dict(self, start_date=None, end_date=None):
         """
@@ -199,6 +291,23 @@ class GroupNumbers:
 
         return data
 
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates a GroupNumbers instance from its dictionary representation, e.g. a group of a saved report.
+
+        :param data: The dictionary representation, see to_dict().
+        :return: The GroupNumbers instance, with the numbers converted back from strings.
+        """
+        group = cls(data['group_name'], data.get('group_data', []))
+        for attribute, value in data.items():
+            if attribute in ('group_name', 'group_data', 'start_date', 'end_date'):
+                continue
+            if isinstance(value, str):
+                value = float(value) if '.' in value or 'e' in value else int(value)
+            setattr(group, attribute, value)
+        return group
+
 
 class CattleGroupData:
     """
@@ -243,8 +352,7 @@ class CattleGroupData:
 
         The active cattle are those whose 'end_date' is None in the group data.
         """
-        self.active_cattle = sum(
-            1 for cattle_data in self.group_data if cattle_data['cattle']['end_date'] is None)
+        self.active_cattle = len(SnapshotGroup.from_group_data(self.group_data).active_positions())
 
 
 class GroupsManagement:
@@ -262,48 +370,103 @@ class GroupsManagement:
         """
         Calculates the groups of cattle based on the provided estimation date.
 
+        Results are cached until the farm data changes, see my_farm.cache, and read from the cache once per request,
+        see my_farm.memo.
+
+        :param estimation_date: The estimation date for the calculation.
+        :return: A dictionary containing the calculated groups of cattle.
+        """
+        return memoize('groups', [estimation_date], lambda: result_cache.get_or_calculate(
+            'groups', [estimation_date], lambda: self._calculate_groups(estimation_date)))
+
+    def _calculate_groups(self, estimation_date):
+        """
+        Calculates the groups of cattle without the cache, see calculate_groups().
+
         :param estimation_date: The estimation date for the calculation.
         :return: A dictionary containing the calculated groups of cattle.
         """
         cattle_list = list(Cattle.objects.filter(deleted=False).values())
-        groups = {
-            'Cows': [{'cattle': cattle, 'weight': round(self.estimate_cattle_weight(cattle['id'], estimation_date), 2)}
-                     for cattle in cattle_list if cattle['gender'] == 'Cow'
-                     and cattle['entry_date'] <= estimation_date],
-
-            'Calves': [{'cattle': cattle, 'weight': round(self.estimate_cattle_weight(cattle['id'],
-                                                                                      estimation_date), 2)} for cattle
-                       in cattle_list if cattle['gender'] in ['Heifer', 'Bull']
-                       and 0 <= self.calculate_age(cattle['birth_date'], estimation_date) < 12
-                       and cattle['entry_date'] <= estimation_date],
-
-            'Young_Heifer': [
-                {'cattle': cattle, 'weight': round(self.estimate_cattle_weight(cattle['id'], estimation_date), 2)}
-                for cattle in cattle_list if cattle['gender'] == 'Heifer'
-                and 12 <= self.calculate_age(cattle['birth_date'], estimation_date) < 24
-                and cattle['entry_date'] <= estimation_date],
-
-            'Adult_Heifer': [
-                {'cattle': cattle, 'weight': round(self.estimate_cattle_weight(cattle['id'], estimation_date), 2)}
-                for cattle in cattle_list if cattle['gender'] == 'Heifer'
-                and self.calculate_age(cattle['birth_date'], estimation_date) >= 24
-                and cattle['entry_date'] <= estimation_date],
-
-            'Young_Bull': [
-                {'cattle': cattle, 'weight': round(self.estimate_cattle_weight(cattle['id'], estimation_date), 2)}
-                for cattle in cattle_list if cattle['gender'] == 'Bull'
-                and 12 <= self.calculate_age(cattle['birth_date'], estimation_date) < 24
-                and cattle['entry_date'] <= estimation_date],
-
-            'Adult_Bull': [
-                {'cattle': cattle, 'weight': round(self.estimate_cattle_weight(cattle['id'], estimation_date), 2)}
-                for cattle in cattle_list if cattle['gender'] == 'Bull'
-                and self.calculate_age(cattle['birth_date'], estimation_date) >= 24
-                and cattle['entry_date'] <= estimation_date],
-        }
+
+        groups = {}
+        for group_name, indexes in self.classify_cattle(cattle_list, estimation_date).items():
+            group_cattle = [cattle_list[index] for index in indexes]
+            weights = self.estimate_cattle_list_weights(group_cattle, estimation_date)
+            groups[group_name] = [{'cattle': cattle, 'weight': round(weight, 2)}
+                                  for cattle, weight in zip(group_cattle, weights)]
 
         return groups
 
+    def calculate_snapshot_groups(self, estimation_date, snapshot=None):
+        """
+        Calculates the groups of cattle on a compact HerdSnapshot instead of full cattle dictionaries.
+
+        The groups can be read by GroupNumbers and CattleGroupData like the groups of calculate_groups. Passing the
+        same snapshot for several estimation dates loads the cattle only once.
+
+        :param estimation_date: The estimation date for the calculation.
+        :param snapshot: The HerdSnapshot to classify, by default the snapshot of the request, see load_snapshot().
+        :return: A dictionary mapping each group name to its SnapshotGroup.
+        """
+        if snapshot is None:
+            snapshot = self.load_snapshot()
+            return memoize('snapshot_groups', [estimation_date], lambda: snapshot.groups(estimation_date))
+        return snapshot.groups(estimation_date)
+
+    @staticmethod
+    def load_snapshot():
+        """
+        Loads the HerdSnapshot of all cattle that are not deleted, once per request, see my_farm.memo.
+
+        :return: The HerdSnapshot instance.
+        """
+        return memoize('herd_snapshot', [], HerdSnapshot.load)
+
+    def classify_cattle(self, cattle_list, estimation_date):
+        """
+        Sorts the cattle into the age groups in a single pass, see my_farm.ages.classify_ordinals.
+
+        :param cattle_list: The cattle dictionaries, each containing 'gender', 'birth_date' and 'entry_date'.
+        :param estimation_date: The estimation date for the classification.
+        :return: A dictionary mapping each group name to the indexes of its cattle in cattle_list.
+        """
+        return classify_ordinals([cattle['gender'] for cattle in cattle_list],
+                                 [date_ordinal(cattle['birth_date']) for cattle in cattle_list],
+                                 [date_ordinal(cattle['entry_date']) for cattle in cattle_list],
+                                 estimation_date)
+
+    def period_boundaries(self, start_date, end_date, granularity):
+        """
+        Splits a date range into consecutive calendar periods.
+
+        The boundaries are the start date, the last day of every month, quarter or year inside the range and the end
+        date, so the closing date of one period is the opening date of the next one.
+
+        :param start_date: The start date of the range.
+        :param end_date: The end date of the range.
+        :param granularity: The period length, one of 'month', 'quarter' or 'year'.
+        :return: The sorted list of boundary dates.
+        :raises ValueError: If the granularity is unknown.
+        """
+        if granularity not in PERIOD_GRANULARITIES:
+            raise ValueError(f"Invalid granularity. Must be one of {', '.join(PERIOD_GRANULARITIES)}.")
+
+        months = PERIOD_GRANULARITIES[granularity]
+        first_month = (start_date.month - 1) // months * months + 1
+        period_start = date(start_date.year, first_month, 1)
+
+        boundaries = [start_date]
+        while True:
+            period_start = add_months(period_start, months)
+            period_end = date.fromordinal(period_start.toordinal() - 1)
+            if period_end >= end_date:
+                break
+            if period_end > start_date:
+                boundaries.append(period_end)
+        boundaries.append(end_date)
+
+        return boundaries
+
     def add_group(self, group_name, estimation_date):
         """
         Adds a group with the provided group name to the groups list based on the estimation date.
@@ -326,32 +489,113 @@ class GroupsManagement:
         if estimation_date < birth_date:
             return -1
         else:
-            age = relativedelta(estimation_date, birth_date)
-            age_in_months = age.years * 12 + age.months
-            return age_in_months
+            return age_in_months(birth_date, estimation_date)
 
     def estimate_cattle_weight(self, cattle_id, estimation_date):
         """
         Estimates the weight of cattle based on its ID and the estimation date.
 
+        This loads a single cattle row; use estimate_weights or estimate_cattle_list_weights for whole cohorts.
+
         :param cattle_id: The ID of the cattle.
         :param estimation_date: The estimation date for the weight calculation.
         :return: The estimated weight of the cattle.
         """
-        cattle = Cattle.objects.get(id=cattle_id)
-        birth_date = cattle.birth_date
+        def estimate():
+            cattle = Cattle.objects.values('birth_date', 'gender', 'breed').get(id=cattle_id)
+            return self.estimate_weights([cattle['birth_date']], [cattle['gender']], estimation_date,
+                                         [cattle['breed']])[0]
 
-        days_passed = (estimation_date - birth_date).days if estimation_date > birth_date else 0
+        return memoize('cattle_weight', [cattle_id, estimation_date], estimate)
 
-        gender = cattle.gender
+    def estimate_cattle_list_weights(self, cattle_list, estimation_dates):
+        """
+        Estimates the weights of cattle loaded with a single query, e.g. Cattle.objects.values().
+
+        :param cattle_list: The cattle dictionaries, each containing at least 'birth_date' and 'gender', and
+            optionally 'breed'.
+        :param estimation_dates: A single estimation date, or one estimation date per cattle.
+        :return: An array with the estimated weight of each cattle, in the order of cattle_list.
+        """
+        birth_dates = [cattle['birth_date'] for cattle in cattle_list]
+        genders = [cattle['gender'] for cattle in cattle_list]
+        breeds = [cattle.get('breed') for cattle in cattle_list]
+        return self.estimate_weights(birth_dates, genders, estimation_dates, breeds)
+
+    def estimate_weights_at_dates(self, birth_dates, genders, estimation_dates, breeds=None):
+        """
+        Estimates the weights of a cohort of cattle at several estimation dates.
 
-        if gender in ['Heifer', 'Cow']:
-            weight = FEMALE_BIRTH_WEIGHT + (days_passed * DAILY_WEIGHT_GAIN)
-            weight = min(weight, FEMALE_MAX_WEIGHT)
-        elif gender == 'Bull':
-            weight = MALE_BIRTH_WEIGHT + (days_passed * DAILY_WEIGHT_GAIN)
-            weight = min(weight, MALE_MAX_WEIGHT)
+        :param birth_dates: The birthdates of the cattle.
+        :param genders: The genders of the cattle, in the order of birth_dates.
+        :param estimation_dates: The estimation dates for the weight calculation.
+        :param breeds: The breeds of the cattle, in the order of birth_dates, or None for the default growth curves.
+        :return: A dictionary mapping each estimation date to an array of weights.
+        """
+        birth_ordinals = self._birth_ordinals(birth_dates)
+        tables = self._growth_tables(genders, breeds)
+        return {estimation_date: self._estimate(birth_ordinals, tables, estimation_date)
+                for estimation_date in estimation_dates}
+
+    def estimate_weights(self, birth_dates, genders, estimation_dates, breeds=None):
+        """
+        Estimates the weights of a cohort of cattle in a single pass, without querying the database.
+
+        The weight is looked up by age in days in the growth table of each breed and gender, see
+        my_farm.growth.growth_registry.
+
+        :param birth_dates: The birthdates of the cattle.
+        :param genders: The genders of the cattle, in the order of birth_dates.
+        :param estimation_dates: A single estimation date, or one estimation date per cattle.
+        :param breeds: The breeds of the cattle, in the order of birth_dates, or None for the default growth curves.
+        :return: An array with the estimated weight of each cattle, in the order of birth_dates.
+        :raises ValueError: If any gender is not 'Heifer', 'Cow', or 'Bull'.
+        """
+        birth_ordinals = self._birth_ordinals(birth_dates)
+        tables = self._growth_tables(genders, breeds)
+        return self._estimate(birth_ordinals, tables, estimation_dates)
+
+    @staticmethod
+    def _birth_ordinals(birth_dates):
+        """
+        Converts the birthdates to an array of day ordinals.
+
+        :param birth_dates: The birthdates of the cattle.
+        :return: An array of day ordinals, missing birthdates are stored as MISSING_DATE_ORDINAL.
+        """
+        return array('l', (date_ordinal(birth_date) for birth_date in birth_dates))
+
+    @staticmethod
+    def _growth_tables(genders, breeds):
+        """
+        Looks up the growth table of each cattle.
+
+        :param genders: The genders of the cattle.
+        :param breeds: The breeds of the cattle, or None for the default growth curves.
+        :return: A list with the GrowthTable of each cattle.
+        :raises ValueError: If any gender is not 'Heifer', 'Cow', or 'Bull'.
+        """
+        if breeds is None:
+            breeds = [None] * len(genders)
+        return [growth_registry.table(gender, breed) for gender, breed in zip(genders, breeds)]
+
+    @staticmethod
+    def _estimate(birth_ordinals, tables, estimation_dates):
+        """
+        Estimates the weights from precomputed birth ordinals and growth tables.
+
+        :param birth_ordinals: The birthdates as day ordinals.
+        :param tables: The GrowthTable of each cattle.
+        :param estimation_dates: A single estimation date, or one estimation date per cattle.
+        :return: An array with the estimated weight of each cattle.
+        """
+        if isinstance(estimation_dates, date):
+            estimation_ordinals = [estimation_dates.toordinal()] * len(birth_ordinals)
         else:
-            raise ValueError("Invalid gender. Must be 'Heifer', 'Cow', or 'Bull'.")
+            estimation_ordinals = [estimation_date.toordinal() if estimation_date is not None else 0
+                                   for estimation_date in estimation_dates]
 
-        return weight
+        return array('d', (
+            table.weights[min(max(estimation_ordinal - birth_ordinal, 0), table.last_age)]
+            for birth_ordinal, estimation_ordinal, table in zip(birth_ordinals, estimation_ordinals, tables)
+        ))
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import math
+from array import array
+from .constants import FEMALE_BIRTH_WEIGHT, MALE_BIRTH_WEIGHT, FEMALE_MAX_WEIGHT, MALE_MAX_WEIGHT, DAILY_WEIGHT_GAIN, \
+    GROWTH_TABLE_DAYS, GROWTH_PHASE_TOLERANCE, CROSSBREED_FEMALE_BIRTH_WEIGHT, CROSSBREED_FEMALE_MATURE_WEIGHT, \
+    CROSSBREED_FEMALE_GROWTH_RATE, CROSSBREED_MALE_GROWTH_POINTS
+
+
+class GrowthModel:
+    """
+    Base class of the growth curves used to estimate the weight of cattle from their age.
+    """
+
+    name = None
+
+    def weight_at(self, age_days):
+        """
+        Calculates the weight at the provided age.
+
+        :param age_days: The age in days, not negative.
+        :return: The weight in kilograms.
+        """
+        raise NotImplementedError
+
+    def parameters(self):
+        """
+        Returns the parameters of the curve, used to version the compiled growth table.
+
+        :return: A JSON serializable dictionary of the parameters.
+        """
+        raise NotImplementedError
+
+    def compile(self, days=GROWTH_TABLE_DAYS):
+        """
+        Precomputes the weight for every age in days, so an estimation becomes an array index.
+
+        :param days: The number of days in the table. Older cattle keep the weight of the last day.
+        :return: The compiled GrowthTable.
+        """
+        weights = array('d', (self.weight_at(age_days) for age_days in range(days)))
+        return GrowthTable(weights, self.version(), self.phases(weights))
+
+    def phases(self, weights):
+        """
+        Describes the compiled table as consecutive linear phases, used to sweep weights over many days at once.
+
+        Days are merged while the daily gain of the phase stays within GROWTH_PHASE_TOLERANCE kilograms of the table,
+        so smooth curves are described by a limited number of phases.
+
+        :param weights: The compiled weight for every age in days.
+        :return: A list of (first age, age after the last one, weight at the first age, daily gain) tuples. The last
+            phase is open ended, with None as its end.
+        """
+        last_age = len(weights) - 1
+        phases = []
+        start = 0
+        while start < last_age:
+            daily_gain = weights[start + 1] - weights[start]
+            end = start + 1
+            while end < last_age and \
+                    abs(weights[start] + daily_gain * (end + 1 - start) - weights[end + 1]) <= GROWTH_PHASE_TOLERANCE:
+                end += 1
+            phases.append((start, end, weights[start], daily_gain))
+            start = end
+        phases.append((last_age, None, weights[last_age], 0.0))
+        return phases
+
+    def version(self):
+        """
+        Builds a version string that changes whenever the curve or its parameters change.
+
+        :return: The version string.
+        """
+        parameters = json.dumps({'name': self.name, 'parameters': self.parameters()}, sort_keys=True)
+        return f'{self.name}-{hashlib.sha1(parameters.encode()).hexdigest()[:12]}'
+
+
+class LinearGrowth(GrowthModel):
+    """
+    Grows from the birth weight by a constant daily gain until the maximum weight is reached.
+    """
+
+    name = 'linear'
+
+    def __init__(self, birth_weight, daily_gain, max_weight):
+        self.birth_weight = birth_weight
+        self.daily_gain = daily_gain
+        self.max_weight = max_weight
+
+    def weight_at(self, age_days):
+        return min(self.birth_weight + (age_days * self.daily_gain), self.max_weight)
+
+    def parameters(self):
+        return {'birth_weight': self.birth_weight, 'daily_gain': self.daily_gain, 'max_weight': self.max_weight}
+
+    def phases(self, weights):
+        days_to_max = 0
+        while self.birth_weight + (days_to_max * self.daily_gain) < self.max_weight and days_to_max < len(weights):
+            days_to_max += 1
+        return [(0, days_to_max, self.birth_weight, self.daily_gain), (days_to_max, None, self.max_weight, 0.0)]
+
+
+class GompertzGrowth(GrowthModel):
+    """
+    Follows the Gompertz curve W(t) = A * exp(-b * exp(-k * t)), starting at the birth weight and approaching the
+    mature weight A at the daily rate k.
+    """
+
+    name = 'gompertz'
+
+    def __init__(self, birth_weight, mature_weight, rate):
+        self.birth_weight = birth_weight
+        self.mature_weight = mature_weight
+        self.rate = rate
+
+    def weight_at(self, age_days):
+        shape = math.log(self.mature_weight / self.birth_weight)
+        return self.mature_weight * math.exp(-shape * math.exp(-self.rate * age_days))
+
+    def parameters(self):
+        return {'birth_weight': self.birth_weight, 'mature_weight': self.mature_weight, 'rate': self.rate}
+
+
+class PiecewiseGrowth(GrowthModel):
+    """
+    Interpolates linearly between (age in days, weight) points and keeps the last weight afterwards.
+    """
+
+    name = 'piecewise'
+
+    def __init__(self, points):
+        """
+        :param points: The (age in days, weight) points, the first one at age 0.
+        :raises ValueError: If there are no points, the first one is not at age 0 or the ages do not increase.
+        """
+        points = [(int(age_days), weight) for age_days, weight in points]
+        if not points or points[0][0] != 0:
+            raise ValueError('The growth curve must start at age 0.')
+        if any(later[0] <= earlier[0] for earlier, later in zip(points, points[1:])):
+            raise ValueError('The ages of the growth curve must increase.')
+        self.points = points
+
+    def weight_at(self, age_days):
+        for (start_age, start_weight), (end_age, end_weight) in zip(self.points, self.points[1:]):
+            if age_days < end_age:
+                return start_weight + (end_weight - start_weight) * (age_days - start_age) / (end_age - start_age)
+        return self.points[-1][1]
+
+    def parameters(self):
+        return {'points': self.points}
+
+    def phases(self, weights):
+        phases = [(start_age, end_age, start_weight, (end_weight - start_weight) / (end_age - start_age))
+                  for (start_age, start_weight), (end_age, end_weight) in zip(self.points, self.points[1:])]
+        phases.append((self.points[-1][0], None, self.points[-1][1], 0.0))
+        return phases
+
+
+class GrowthTable:
+    """
+    A growth curve compiled into the weight for every age in days.
+    """
+
+    def __init__(self, weights, version, phases):
+        """
+        :param weights: The weight for each age in days, starting at birth.
+        :param version: The version of the curve and parameters the table was compiled from.
+        :param phases: The linear phases describing the table, see GrowthModel.phases().
+        """
+        self.weights = weights
+        self.version = version
+        self.phases = phases
+        self.last_age = len(weights) - 1
+
+    def weight(self, age_days):
+        """
+        Looks up the weight at the provided age. Unborn cattle have the birth weight and cattle older than the table
+        keep its last weight.
+
+        :param age_days: The age in days.
+        :return: The weight in kilograms.
+        """
+        return self.weights[min(max(age_days, 0), self.last_age)]
+
+
+class GrowthRegistry:
+    """
+    Holds the growth model of each breed and gender and their compiled growth tables.
+    """
+
+    def __init__(self):
+        self.models = {}
+        self.tables = {}
+
+    def register(self, gender, model, breed=None):
+        """
+        Registers the growth model for a gender, either for a single breed or as the default for all breeds.
+
+        :param gender: The gender of the cattle.
+        :param model: The GrowthModel instance.
+        :param breed: The breed of the cattle, or None for the default of the gender.
+        """
+        self.models[(breed, gender)] = model
+        self.tables.pop((breed, gender), None)
+
+    def unregister(self, gender, breed=None):
+        """
+        Removes the growth model registered for a gender and breed.
+
+        :param gender: The gender of the cattle.
+        :param breed: The breed of the cattle, or None for the default of the gender.
+        """
+        self.models.pop((breed, gender), None)
+        self.tables.pop((breed, gender), None)
+
+    def table(self, gender, breed=None):
+        """
+        Returns the compiled growth table for a gender and breed, falling back to the default of the gender.
+
+        :param gender: The gender of the cattle.
+        :param breed: The breed of the cattle.
+        :return: The GrowthTable.
+        :raises ValueError: If no growth model is registered for the gender.
+        """
+        key = (breed, gender) if (breed, gender) in self.models else (None, gender)
+        if key not in self.models:
+            raise ValueError("Invalid gender. Must be 'Heifer', 'Cow', or 'Bull'.")
+        if key not in self.tables:
+            self.tables[key] = self.models[key].compile()
+        return self.tables[key]
+
+    def version(self):
+        """
+        Builds a version string covering every registered growth model.
+
+        :return: The version string.
+        """
+        versions = sorted(f'{breed}:{gender}:{model.version()}' for (breed, gender), model in self.models.items())
+        return hashlib.sha1('|'.join(versions).encode()).hexdigest()[:12]
+
+
+growth_registry = GrowthRegistry()
+growth_registry.register('Heifer', LinearGrowth(FEMALE_BIRTH_WEIGHT, DAILY_WEIGHT_GAIN, FEMALE_MAX_WEIGHT))
+growth_registry.register('Cow', LinearGrowth(FEMALE_BIRTH_WEIGHT, DAILY_WEIGHT_GAIN, FEMALE_MAX_WEIGHT))
+growth_registry.register('Bull', LinearGrowth(MALE_BIRTH_WEIGHT, DAILY_WEIGHT_GAIN, MALE_MAX_WEIGHT))
+growth_registry.register('Heifer', GompertzGrowth(CROSSBREED_FEMALE_BIRTH_WEIGHT, CROSSBREED_FEMALE_MATURE_WEIGHT,
+                                                  CROSSBREED_FEMALE_GROWTH_RATE), breed='Crossbreed')
+growth_registry.register('Cow', GompertzGrowth(CROSSBREED_FEMALE_BIRTH_WEIGHT, CROSSBREED_FEMALE_MATURE_WEIGHT,
+                                               CROSSBREED_FEMALE_GROWTH_RATE), breed='Crossbreed')
+growth_registry.register('Bull', PiecewiseGrowth(CROSSBREED_MALE_GROWTH_POINTS), breed='Crossbreed')
@@ -0,0 +1,172 @@
+import csv
+import time
+from datetime import date
+from django.db import transaction
+from .constants import IMPORT_BATCH_SIZE
+from .counters import FarmCounters
+from .ledger import record_new_cattle_events
+from .models import Cattle, Herd
+
+# The CSV columns read by the import. 'number', 'gender' and 'breed' are required.
+IMPORT_COLUMNS = ['type', 'number', 'name', 'gender', 'breed', 'birth_date', 'acquisition_method', 'entry_date',
+                  'herd', 'loss_method', 'end_date', 'comments']
+REQUIRED_COLUMNS = ['number', 'gender', 'breed']
+CHOICE_COLUMNS = {
+    'gender': Cattle.GENDER,
+    'breed': Cattle.BREED,
+    'acquisition_method': Cattle.ACQUISITION_METHOD,
+    'loss_method': Cattle.LOSS_METHOD,
+}
+DATE_COLUMNS = ['birth_date', 'entry_date', 'end_date']
+
+
+class CattleImport:
+    """
+    Imports cattle from a CSV file in batches.
+
+    Each batch is validated against the Cattle choices, checked for numbers already used with a single query and
+    inserted with bulk_create in a transaction, together with the movement ledger events of the new cattle and the
+    recount of their herds. Herds are resolved by id or name from a map loaded once. Invalid rows are skipped and
+    reported with their line number.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Initializes a CattleImport instance.
+
+        :param batch_size: The number of rows validated and inserted at once.
+        """
+        self.batch_size = batch_size
+        self.herds = {}
+        for herd_id, name in Herd.objects.values_list('id', 'name'):
+            self.herds[str(herd_id)] = herd_id
+            self.herds.setdefault(name.strip().lower(), herd_id)
+        self.choices = {column: {value.lower(): value for value, label in choices}
+                        for column, choices in CHOICE_COLUMNS.items()}
+        self.seen_numbers = set()
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+        self.seconds = 0
+
+    def import_csv(self, csv_file):
+        """
+        Streams the rows of a CSV file with a header line into the database.
+
+        :param csv_file: The text file object of the CSV.
+        :return: The statistics of the import, see stats().
+        :raises ValueError: If the header misses a required column.
+        """
+        started = time.perf_counter()
+        reader = csv.DictReader(csv_file)
+        columns = [column.strip().lower() for column in reader.fieldnames or []]
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise ValueError(f"The CSV misses the required columns: {', '.join(missing)}.")
+        reader.fieldnames = columns
+
+        batch = []
+        for row in reader:
+            batch.append((reader.line_num, row))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+
+        self.seconds += time.perf_counter() - started
+        return self.stats()
+
+    def import_batch(self, batch):
+        """
+        Validates a batch of rows and inserts the valid ones.
+
+        :param batch: The (line number, row dictionary) tuples of the batch.
+        :return: The list of created Cattle instances.
+        """
+        self.rows += len(batch)
+        cattle_list = []
+        for line_num, row in batch:
+            try:
+                cattle_list.append((line_num, self.build_cattle(row)))
+            except ValueError as error:
+                self.errors.append((line_num, str(error)))
+
+        numbers = [cattle.number for line_num, cattle in cattle_list]
+        used_numbers = set(Cattle.objects.filter(number__in=numbers).order_by().values_list('number', flat=True))
+        new_cattle = []
+        for line_num, cattle in cattle_list:
+            if cattle.number in used_numbers or cattle.number in self.seen_numbers:
+                self.errors.append((line_num, f'The number {cattle.number} is already used.'))
+                continue
+            self.seen_numbers.add(cattle.number)
+            new_cattle.append(cattle)
+
+        with transaction.atomic():
+            created = Cattle.objects.bulk_create(new_cattle)
+            record_new_cattle_events(created)
+            FarmCounters().recount(herd_ids={cattle.herd_id for cattle in created})
+        self.created += len(created)
+        return created
+
+    def build_cattle(self, row):
+        """
+        Validates a CSV row and builds its unsaved Cattle instance.
+
+        :param row: The row dictionary, with lower case column names.
+        :return: The Cattle instance.
+        :raises ValueError: If a value is missing or not valid.
+        """
+        values = {column: (row.get(column) or '').strip() for column in IMPORT_COLUMNS}
+        for column in REQUIRED_COLUMNS:
+            if not values[column]:
+                raise ValueError(f'The {column} is required.')
+
+        for column, choices in self.choices.items():
+            if values[column]:
+                if values[column].lower() not in choices:
+                    raise ValueError(f'Invalid {column} {values[column]}. Must be one of '
+                                     f"{', '.join(choices.values())}.")
+                values[column] = choices[values[column].lower()]
+
+        for column in DATE_COLUMNS:
+            if values[column]:
+                try:
+                    values[column] = date.fromisoformat(values[column])
+                except ValueError:
+                    raise ValueError(f'Invalid {column} {values[column]}. Must be in YYYY-MM-DD format.')
+        if values['entry_date'] and values['end_date'] and values['end_date'] < values['entry_date']:
+            raise ValueError('The end date must not be earlier than the entry date.')
+
+        herd_id = None
+        if values['herd']:
+            herd_id = self.herds.get(values['herd'].lower())
+            if herd_id is None:
+                raise ValueError(f"Unknown herd {values['herd']}.")
+
+        for column in ['number', 'name', 'type']:
+            if len(values[column]) > Cattle._meta.get_field(column).max_length:
+                raise ValueError(f'The {column} is too long.')
+
+        return Cattle(type=values['type'] or 'Cattle', number=values['number'], name=values['name'] or None,
+                      gender=values['gender'], breed=values['breed'], birth_date=values['birth_date'] or None,
+                      acquisition_method=values['acquisition_method'] or None,
+                      entry_date=values['entry_date'] or None, herd_id=herd_id,
+                      loss_method=values['loss_method'] or None, end_date=values['end_date'] or None,
+                      comments=values['comments'])
+
+    def stats(self):
+        """
+        Returns the statistics of the import.
+
+        :return: A dictionary with the number of 'rows' read, cattle 'created' and rows 'failed', the per row
+            'errors' as (line number, message) tuples, the 'seconds' taken and the 'rows_per_second'.
+        """
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'failed': len(self.errors),
+            'errors': sorted(self.errors),
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.rows / self.seconds) if self.seconds else 0,
+        }
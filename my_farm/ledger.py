@@ -0,0 +1,580 @@
+from collections import Counter, namedtuple
+from datetime import date, timedelta
+from django.db import transaction
+from django.db.models import Max, Min
+from .cache import result_cache
+from .ages import AGE_GROUPS, YOUNG_AGE_MONTHS, ADULT_AGE_MONTHS, add_months, age_group
+from .groups import GroupNumbers, GroupsManagement
+from .growth import growth_registry
+from .models import MovementEvent, MovementCheckpoint
+
+EVENT_FIELDS = ['event_type', 'date', 'group_name', 'from_group_name', 'method', 'gender', 'from_gender', 'breed',
+                'birth_date', 'herd_id', 'from_herd_id']
+
+LedgerEvent = namedtuple('LedgerEvent', EVENT_FIELDS)
+
+ACQUISITION_NUMBERS = {
+    'Birth': ('birth_count', 'birth_weight'),
+    'Purchase': ('purchase_count', 'purchase_weight'),
+    'Gift': ('gift_count', 'gift_weight'),
+}
+
+LOSS_NUMBERS = {
+    'Death': ('death_count', 'death_weight'),
+    'Sold': ('sold_count', 'sold_weight'),
+    'Consumed': ('consumed_count', 'consumed_weight'),
+    'Gifted': ('gifted_count', 'gifted_weight'),
+}
+
+
+def cattle_events(cattle, gender_changes, herd_changes):
+    """
+    Derives the ledger events of a cattle from its current data and the history of its gender and herd changes.
+
+    The cattle enters its group on the entry date, crosses into the next age group on its birthday and at 12 and 24
+    months, moves between groups when its gender changes and leaves on the end date. Deleted cattle have no events.
+
+    :param cattle: The Cattle instance.
+    :param gender_changes: The (date, from gender, gender) tuples of the gender changes, in the order they were made.
+    :param herd_changes: The (date, from herd id, herd id) tuples of the herd changes, in the order they were made.
+    :return: The list of LedgerEvent tuples.
+    """
+    entry_date = cattle.entry_date
+    end_date = cattle.end_date
+    birth_date = cattle.birth_date
+    if cattle.deleted or entry_date is None or (end_date is not None and end_date < entry_date):
+        return []
+
+    initial_gender = gender_changes[0][1] if gender_changes else cattle.gender
+
+    def gender_before(on_date):
+        gender = initial_gender
+        for change_date, from_gender, to_gender in gender_changes:
+            if change_date < on_date:
+                gender = to_gender
+        return gender
+
+    def present(on_date):
+        return entry_date <= on_date and (end_date is None or on_date <= end_date)
+
+    def event(event_type, on_date, group_name, from_group_name=None, method=None, gender=None, from_gender=None,
+              herd_id=None, from_herd_id=None):
+        return LedgerEvent(event_type, on_date, group_name, from_group_name, method, gender, from_gender,
+                           cattle.breed, birth_date, herd_id, from_herd_id)
+
+    gender = gender_before(entry_date)
+    events = [event(MovementEvent.ENTERED, entry_date, age_group(gender, birth_date, entry_date),
+                    method=cattle.acquisition_method, gender=gender)]
+
+    if birth_date is not None:
+        crossing_dates = {birth_date, add_months(birth_date, YOUNG_AGE_MONTHS),
+                          add_months(birth_date, ADULT_AGE_MONTHS)}
+        for crossing_date in sorted(crossing_dates):
+            if crossing_date <= entry_date or not present(crossing_date):
+                continue
+            gender = gender_before(crossing_date)
+            from_group_name = age_group(gender, birth_date, crossing_date - timedelta(days=1))
+            group_name = age_group(gender, birth_date, crossing_date)
+            if from_group_name != group_name:
+                events.append(event(MovementEvent.AGE_CLASS_CROSSED, crossing_date, group_name, from_group_name,
+                                    gender=gender))
+
+    for change_date, from_gender, to_gender in gender_changes:
+        if present(change_date):
+            from_group_name = age_group(from_gender, birth_date, change_date)
+            group_name = age_group(to_gender, birth_date, change_date)
+        else:
+            from_group_name = group_name = None
+        events.append(event(MovementEvent.GENDER_CHANGED, change_date, group_name, from_group_name, gender=to_gender,
+                            from_gender=from_gender))
+
+    for change_date, from_herd_id, herd_id in herd_changes:
+        gender = gender_before(change_date + timedelta(days=1))
+        group_name = age_group(gender, birth_date, change_date) if present(change_date) else None
+        events.append(event(MovementEvent.HERD_CHANGED, change_date, group_name, group_name, gender=gender,
+                            herd_id=herd_id, from_herd_id=from_herd_id))
+
+    if end_date is not None:
+        gender = gender_before(end_date + timedelta(days=1))
+        events.append(event(MovementEvent.LEFT, end_date, age_group(gender, birth_date, end_date),
+                            method=cattle.loss_method, gender=gender))
+
+    return events
+
+
+def record_cattle_events(cattle, previous=None, on_date=None):
+    """
+    Brings the ledger events of a cattle up to date with its current data.
+
+    The events derived from the cattle are compared with the events already recorded for it. Events that no longer
+    apply are cancelled with a delta of -1 and missing events are appended, so the ledger is never rewritten. Gender
+    and herd changes are recorded on the day they are made. Checkpoints on or after the earliest appended event are
+    deleted.
+
+    :param cattle: The Cattle instance, already saved.
+    :param previous: A dictionary with the 'gender' and 'herd_id' stored before the change, or None for new cattle.
+    :param on_date: The date of the change, today by default.
+    :return: The list of appended MovementEvent instances.
+    """
+    return record_cattle_list_events([cattle], {cattle.pk: previous} if previous else None, on_date)
+
+
+def record_cattle_list_events(cattle_list, previous=None, on_date=None):
+    """
+    Brings the ledger events of several cattle up to date, see record_cattle_events(), with a single query for their
+    recorded events and a single insert for the appended ones.
+
+    :param cattle_list: The Cattle instances, already saved.
+    :param previous: A dictionary mapping cattle ids to a dictionary with the 'gender' and 'herd_id' stored before
+        the change, or None for new cattle.
+    :param on_date: The date of the change, today by default.
+    :return: The list of appended MovementEvent instances.
+    """
+    on_date = on_date or date.today()
+    previous = previous or {}
+
+    with transaction.atomic():
+        rows_by_cattle = {cattle.pk: [] for cattle in cattle_list}
+        rows = MovementEvent.objects.filter(cattle_id__in=list(rows_by_cattle)).order_by('id').values_list(
+            'cattle_id', 'delta', *EVENT_FIELDS)
+        for cattle_id, delta, *fields in rows:
+            rows_by_cattle[cattle_id].append((delta, LedgerEvent(*fields)))
+
+        appended = []
+        for cattle in cattle_list:
+            appended += _appended_events(cattle, rows_by_cattle[cattle.pk], previous.get(cattle.pk), on_date)
+        if appended:
+            MovementEvent.objects.bulk_create(appended)
+            MovementCheckpoint.objects.filter(date__gte=min(event.date for event in appended)).delete()
+
+    return appended
+
+
+def _appended_events(cattle, rows, previous, on_date):
+    """
+    Compares the events derived from a cattle with its recorded events, see record_cattle_events().
+
+    :param cattle: The Cattle instance.
+    :param rows: The (delta, LedgerEvent) tuples recorded for the cattle, in the order they were recorded.
+    :param previous: A dictionary with the 'gender' and 'herd_id' stored before the change, or None.
+    :param on_date: The date of the change.
+    :return: The list of unsaved MovementEvent instances to append.
+    """
+    recorded = Counter()
+    gender_changes = []
+    herd_changes = []
+    entered_gender = None
+    for delta, event in rows:
+        recorded[event] += delta
+        if delta <= 0:
+            continue
+        if event.event_type == MovementEvent.ENTERED:
+            entered_gender = event.gender
+        elif event.event_type == MovementEvent.GENDER_CHANGED:
+            change = (event.date, event.from_gender, event.gender)
+            if change not in gender_changes:
+                gender_changes.append(change)
+        elif event.event_type == MovementEvent.HERD_CHANGED:
+            change = (event.date, event.from_herd_id, event.herd_id)
+            if change not in herd_changes:
+                herd_changes.append(change)
+
+    if gender_changes:
+        known_gender = gender_changes[-1][2]
+    else:
+        known_gender = entered_gender or (previous or {}).get('gender') or cattle.gender
+    if known_gender != cattle.gender:
+        gender_changes.append((on_date, known_gender, cattle.gender))
+
+    if herd_changes:
+        known_herd_id = herd_changes[-1][2]
+    else:
+        known_herd_id = previous['herd_id'] if previous else cattle.herd_id
+    if known_herd_id != cattle.herd_id:
+        herd_changes.append((on_date, known_herd_id, cattle.herd_id))
+
+    gender_changes.sort(key=lambda change: change[0])
+    herd_changes.sort(key=lambda change: change[0])
+    derived = Counter(cattle_events(cattle, gender_changes, herd_changes))
+
+    appended = [MovementEvent(cattle_id=cattle.pk, delta=-count, **event._asdict())
+                for event, count in (recorded - derived).items()]
+    appended += [MovementEvent(cattle_id=cattle.pk, delta=count, **event._asdict())
+                 for event, count in (derived - recorded).items()]
+    return appended
+
+
+def record_new_cattle_events(cattle_list):
+    """
+    Records the ledger events of cattle created with bulk_create, which does not send the post_save signal.
+
+    The cattle have no recorded events and no gender or herd changes yet, so their events are appended with a single
+    bulk insert.
+
+    :param cattle_list: The new Cattle instances, already saved.
+    :return: The list of appended MovementEvent instances.
+    """
+    appended = [MovementEvent(cattle_id=cattle.pk, delta=1, **event._asdict())
+                for cattle in cattle_list for event in cattle_events(cattle, [], [])]
+    if appended:
+        with transaction.atomic():
+            MovementEvent.objects.bulk_create(appended)
+            MovementCheckpoint.objects.filter(date__gte=min(event.date for event in appended)).delete()
+    return appended
+
+
+class LedgerBalance:
+    """
+    The cattle of every group at the end of a day, built by replaying ledger events.
+
+    Membership is kept as a signed count per cattle and group, so cancelled events simply subtract again. The
+    attributes used for weight estimation are taken from the most recently recorded event of each cattle.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty LedgerBalance instance.
+        """
+        self.members = Counter()
+        self.attributes = {}
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint):
+        """
+        Loads the balance stored in a checkpoint.
+
+        :param checkpoint: The MovementCheckpoint instance.
+        :return: The LedgerBalance instance.
+        """
+        balance = cls()
+        for cattle_id, group_name, count in checkpoint.balance['members']:
+            balance.members[(cattle_id, group_name)] = count
+        for cattle_id, event_id, gender, breed, birth_date in checkpoint.balance['attributes']:
+            balance.attributes[cattle_id] = (event_id, gender, breed,
+                                             date.fromisoformat(birth_date) if birth_date else None)
+        return balance
+
+    def to_checkpoint(self, on_date, last_event_id):
+        """
+        Builds a checkpoint of the balance.
+
+        :param on_date: The date of the balance.
+        :param last_event_id: The id of the last event recorded when the balance was calculated.
+        :return: The unsaved MovementCheckpoint instance.
+        """
+        cattle_ids = {cattle_id for cattle_id, group_name in self.members}
+        return MovementCheckpoint(date=on_date, last_event_id=last_event_id or 0, balance={
+            'members': [[cattle_id, group_name, count] for (cattle_id, group_name), count in self.members.items()],
+            'attributes': [[cattle_id, event_id, gender, breed, birth_date.isoformat() if birth_date else None]
+                           for cattle_id, (event_id, gender, breed, birth_date) in self.attributes.items()
+                           if cattle_id in cattle_ids],
+        })
+
+    def apply(self, event_id, cattle_id, delta, event):
+        """
+        Applies a ledger event to the balance.
+
+        :param event_id: The id of the event.
+        :param cattle_id: The id of the cattle.
+        :param delta: The delta of the event, -1 for a cancelled event.
+        :param event: The LedgerEvent tuple.
+        """
+        if event.event_type == MovementEvent.ENTERED:
+            self._add(cattle_id, event.group_name, delta)
+        elif event.event_type == MovementEvent.LEFT:
+            self._add(cattle_id, event.group_name, -delta)
+        else:
+            self._add(cattle_id, event.from_group_name, -delta)
+            self._add(cattle_id, event.group_name, delta)
+
+        if event_id > self.attributes.get(cattle_id, (0,))[0]:
+            self.attributes[cattle_id] = (event_id, event.gender, event.breed, event.birth_date)
+
+    def groups(self):
+        """
+        Lists the cattle of every group.
+
+        :return: A dictionary mapping each group name to the list of its cattle ids.
+        """
+        groups = {group_name: [] for group_name in AGE_GROUPS}
+        for (cattle_id, group_name), count in self.members.items():
+            if count > 0 and group_name in groups:
+                groups[group_name].append(cattle_id)
+        return groups
+
+    def _add(self, cattle_id, group_name, delta):
+        """
+        Changes the membership count of a cattle in a group.
+
+        :param cattle_id: The id of the cattle.
+        :param group_name: The name of the group, or None.
+        :param delta: The change of the count.
+        """
+        if group_name is None:
+            return
+        key = (cattle_id, group_name)
+        self.members[key] += delta
+        if not self.members[key]:
+            del self.members[key]
+
+
+class MovementLedger:
+    """
+    Calculates livestock movement reports from the MovementEvent ledger.
+
+    The opening balance of a report is read from the latest checkpoint before it and the events recorded since, and
+    only the events inside the report window are read afterwards. Each period is balanced: the end count equals the
+    beginning count plus acquisitions and cattle moved in, minus losses and cattle moved out.
+    """
+
+    def __init__(self):
+        """
+        Initializes a MovementLedger instance.
+        """
+        self.growth_tables = {}
+
+    def balance(self, on_date):
+        """
+        Calculates the cattle of every group at the end of a day. The balance is read from the latest checkpoint on or
+        before the day and the events recorded since, nothing is written.
+
+        :param on_date: The date of the balance.
+        :return: The LedgerBalance instance.
+        """
+        checkpoint = MovementCheckpoint.objects.filter(date__lte=on_date).order_by('-date').first()
+        if checkpoint is not None:
+            balance = LedgerBalance.from_checkpoint(checkpoint)
+            events = self.events(date__gt=checkpoint.date, date__lte=on_date)
+        else:
+            balance = LedgerBalance()
+            events = self.events(date__lte=on_date)
+
+        for event_id, cattle_id, delta, event in events:
+            balance.apply(event_id, cattle_id, delta, event)
+
+        return balance
+
+    def save_checkpoints(self, until):
+        """
+        Saves a checkpoint at the end of every month before a date that has none yet, so reports starting on the first
+        day of a month read their opening balance from a single checkpoint. Called by the backfill_movement_events and
+        rollup_daily_groups commands, reports never write checkpoints.
+
+        :param until: The date, only the months ending before it get a checkpoint.
+        :return: The number of checkpoints saved.
+        """
+        last_event_id = MovementEvent.objects.aggregate(last_event_id=Max('id'))['last_event_id']
+        first_date = MovementEvent.objects.aggregate(first_date=Min('date'))['first_date']
+        if first_date is None:
+            return 0
+
+        month_ends = []
+        month_end = add_months(first_date.replace(day=1), 1) - timedelta(days=1)
+        while month_end < until:
+            month_ends.append(month_end)
+            month_end = add_months(month_end + timedelta(days=1), 1) - timedelta(days=1)
+        saved_dates = set(MovementCheckpoint.objects.filter(date__in=month_ends).values_list('date', flat=True))
+        missing_dates = [month_end for month_end in month_ends if month_end not in saved_dates]
+        if not missing_dates:
+            return 0
+
+        balance = self.balance(missing_dates[0])
+        events = self.events(date__gt=missing_dates[0], date__lte=missing_dates[-1])
+        checkpoints = [balance.to_checkpoint(missing_dates[0], last_event_id)]
+        position = 0
+        for on_date in missing_dates[1:]:
+            while position < len(events) and events[position][3].date <= on_date:
+                balance.apply(*events[position])
+                position += 1
+            checkpoints.append(balance.to_checkpoint(on_date, last_event_id))
+
+        with transaction.atomic():
+            # Skip the checkpoints on or after an event recorded in the meantime
+            edited_from = MovementEvent.objects.filter(id__gt=last_event_id or 0).aggregate(
+                first_date=Min('date'))['first_date']
+            if edited_from is not None:
+                checkpoints = [checkpoint for checkpoint in checkpoints if checkpoint.date < edited_from]
+            MovementCheckpoint.objects.filter(date__in=[checkpoint.date for checkpoint in checkpoints]).delete()
+            MovementCheckpoint.objects.bulk_create(checkpoints)
+        return len(checkpoints)
+
+    def calculate(self, start_date, end_date):
+        """
+        Calculates the movement numbers of every group between the dates.
+
+        The beginning count is the balance at the end of the day before the start date and the end count the balance
+        at the end of the end date, so every day of the report is counted once. Cattle entering on the start date are
+        acquisitions only and cattle leaving on the end date are losses only. GroupNumbers.quantity counts both in the
+        beginning or end count as well, so its periods are not balanced. The saved reports record which rules they were
+        counted with and only reports counted alike are compared, see my_farm.reports.report_semantics.
+
+        :param start_date: The first day of the report.
+        :param end_date: The last day of the report, inclusive.
+        :return: The list of GroupNumbers instances.
+        """
+        periods = self.calculate_ranges([(start_date, end_date)])
+        return periods[0]['groups']
+
+    def calculate_periods(self, start_date, end_date, granularity):
+        """
+        Calculates the movement numbers of every group for each calendar period of a date range.
+
+        :param start_date: The start date of the range.
+        :param end_date: The end date of the range.
+        :param granularity: The period length, one of 'month', 'quarter' or 'year'.
+        :return: A tuple of the periods, as dictionaries with 'start_date', 'end_date' and 'groups', and the list of
+            GroupNumbers totals for the whole range.
+        :raises ValueError: If the granularity is unknown.
+        """
+        periods = self.calculate_ranges(self.period_ranges(start_date, end_date, granularity))
+
+        totals = [GroupNumbers.combine([period['groups'][index] for period in periods])
+                  for index in range(len(AGE_GROUPS))]
+
+        return periods, totals
+
+    @staticmethod
+    def period_ranges(start_date, end_date, granularity):
+        """
+        Splits a date range into the consecutive ranges of its calendar periods.
+
+        :param start_date: The start date of the range.
+        :param end_date: The end date of the range.
+        :param granularity: The period length, one of 'month', 'quarter' or 'year'.
+        :return: The (first day, last day) tuples of the periods.
+        :raises ValueError: If the granularity is unknown.
+        """
+        boundaries = GroupsManagement().period_boundaries(start_date, end_date, granularity)
+        ranges = [(start_date, boundaries[1])]
+        ranges += [(opening_date + timedelta(days=1), closing_date)
+                   for opening_date, closing_date in zip(boundaries[1:], boundaries[2:])]
+        return ranges
+
+    def calculate_ranges(self, ranges):
+        """
+        Calculates the movement numbers of every group for consecutive date ranges.
+
+        Finished periods are cached until the farm data changes, see my_farm.cache.
+
+        :param ranges: The (first day, last day) tuples of the ranges, each starting the day after the previous one.
+        :return: The list of periods, as dictionaries with 'start_date', 'end_date' and 'groups'.
+        """
+        return result_cache.get_or_calculate('movement_report', ranges, lambda: self._calculate_ranges(ranges))
+
+    def _calculate_ranges(self, ranges):
+        """
+        Calculates the movement numbers of consecutive date ranges without the cache, see calculate_ranges().
+
+        :param ranges: The (first day, last day) tuples of the ranges.
+        :return: The list of periods, as dictionaries with 'start_date', 'end_date' and 'groups'.
+        """
+        opening_date = ranges[0][0] - timedelta(days=1)
+        balance = self.balance(opening_date)
+        events = self.events(date__gt=opening_date, date__lte=ranges[-1][1])
+
+        periods = []
+        position = 0
+        for first_day, last_day in ranges:
+            groups = {group_name: GroupNumbers(group_name, []) for group_name in AGE_GROUPS}
+            self._set_balance(groups, balance, first_day - timedelta(days=1), 'start_date_count',
+                              'start_date_group_weight')
+
+            moved_weights = Counter()
+            while position < len(events) and events[position][3].date <= last_day:
+                event_id, cattle_id, delta, event = events[position]
+                balance.apply(event_id, cattle_id, delta, event)
+                self.add_flows(groups, moved_weights, delta, event)
+                position += 1
+
+            for group in groups.values():
+                group.weight_moved_in = round(moved_weights[(group.group_name, 'in')])
+                group.weight_moved_out = round(moved_weights[(group.group_name, 'out')])
+
+            self._set_balance(groups, balance, last_day, 'end_date_count', 'end_date_group_weight')
+            for group in groups.values():
+                group.count_difference = group.end_date_count - group.start_date_count
+                group.weight_difference = group.end_date_group_weight - group.start_date_group_weight
+
+            periods.append({'start_date': first_day, 'end_date': last_day, 'groups': list(groups.values())})
+
+        return periods
+
+    def events(self, **filters):
+        """
+        Reads ledger events in the order they are applied.
+
+        :param filters: The filters of the events, e.g. date__gt and date__lte.
+        :return: A list of (event id, cattle id, delta, LedgerEvent) tuples.
+        """
+        rows = MovementEvent.objects.filter(**filters).order_by('date', 'id').values_list(
+            'id', 'cattle_id', 'delta', *EVENT_FIELDS)
+        return [(event_id, cattle_id, delta, LedgerEvent(*fields)) for event_id, cattle_id, delta, *fields in rows]
+
+    def weight(self, gender, breed, birth_date, on_date):
+        """
+        Estimates the weight of a cattle from the growth table of its breed and gender.
+
+        :param gender: The gender of the cattle.
+        :param breed: The breed of the cattle.
+        :param birth_date: The birthdate of the cattle, or None for the birth weight.
+        :param on_date: The estimation date.
+        :return: The weight rounded to two decimals.
+        """
+        key = (gender, breed)
+        if key not in self.growth_tables:
+            self.growth_tables[key] = growth_registry.table(gender, breed)
+        age_days = (on_date - birth_date).days if birth_date is not None else 0
+        return round(self.growth_tables[key].weight(age_days), 2)
+
+    def _set_balance(self, groups, balance, on_date, count_attribute, weight_attribute):
+        """
+        Sets the count and weight of every group from a balance.
+
+        :param groups: The dictionary of GroupNumbers by group name.
+        :param balance: The LedgerBalance at the end of on_date.
+        :param on_date: The date of the balance, used to estimate the weights.
+        :param count_attribute: The GroupNumbers attribute for the count.
+        :param weight_attribute: The GroupNumbers attribute for the weight.
+        """
+        for group_name, cattle_ids in balance.groups().items():
+            group_data = []
+            for cattle_id in cattle_ids:
+                event_id, gender, breed, birth_date = balance.attributes[cattle_id]
+                group_data.append({
+                    'cattle': {'id': cattle_id, 'gender': gender, 'breed': breed, 'birth_date': birth_date},
+                    'weight': self.weight(gender, breed, birth_date, on_date),
+                })
+            group = groups[group_name]
+            group.group_data = group_data
+            setattr(group, count_attribute, len(group_data))
+            setattr(group, weight_attribute, round(sum(item['weight'] for item in group_data)))
+
+    def add_flows(self, groups, moved_weights, delta, event):
+        """
+        Adds an event to the acquisition, loss and movement numbers of its groups.
+
+        :param groups: The dictionary of GroupNumbers by group name.
+        :param moved_weights: The Counter of moved weights by (group name, 'in' or 'out').
+        :param delta: The delta of the event.
+        :param event: The LedgerEvent tuple.
+        """
+        if event.event_type in (MovementEvent.ENTERED, MovementEvent.LEFT):
+            numbers = ACQUISITION_NUMBERS if event.event_type == MovementEvent.ENTERED else LOSS_NUMBERS
+            if event.group_name not in groups or event.method not in numbers:
+                return
+            count_attribute, weight_attribute = numbers[event.method]
+            group = groups[event.group_name]
+            weight = self.weight(event.gender, event.breed, event.birth_date, event.date)
+            setattr(group, count_attribute, getattr(group, count_attribute) + delta)
+            setattr(group, weight_attribute, getattr(group, weight_attribute) + delta * round(weight))
+            return
+
+        if event.from_group_name == event.group_name:
+            return
+        weight = self.weight(event.gender, event.breed, event.birth_date, event.date)
+        if event.from_group_name in groups:
+            groups[event.from_group_name].moved_out += delta
+            moved_weights[(event.from_group_name, 'out')] += delta * weight
+        if event.group_name in groups:
+            groups[event.group_name].moved_in += delta
+            moved_weights[(event.group_name, 'in')] += delta * weight
@@ -0,0 +1,27 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from my_farm.cache import result_cache
+from my_farm.ledger import MovementLedger, record_cattle_events
+from my_farm.models import Cattle
+
+
+class Command(BaseCommand):
+    help = 'Records the movement ledger events of existing cattle. Cattle already in the ledger are only corrected.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Cattle loaded per database round trip.')
+
+    def handle(self, *args, **options):
+        cattle_count = 0
+        event_count = 0
+        for cattle in Cattle.objects.order_by('id').iterator(chunk_size=options['chunk_size']):
+            event_count += len(record_cattle_events(cattle))
+            cattle_count += 1
+
+        if event_count:
+            result_cache.bump_version()
+        checkpoint_count = MovementLedger().save_checkpoints(date.today())
+        self.stdout.write(f'Recorded {event_count} events for {cattle_count} cattle and saved {checkpoint_count} '
+                          f'checkpoints.')
@@ -0,0 +1,106 @@
+import random
+import time
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand
+
+from my_farm.groups import GroupsManagement
+
+
+def legacy_age(birth_date, estimation_date):
+    """
+    Calculates the age in months the way calculate_groups did before the single-pass classifier.
+
+    :param birth_date: The birthdate of the cattle.
+    :param estimation_date: The estimation date for the calculation.
+    :return: The age in months, or -1 if the cattle is not born yet.
+    """
+    if estimation_date < birth_date:
+        return -1
+    age = relativedelta(estimation_date, birth_date)
+    return age.years * 12 + age.months
+
+
+def legacy_classify(cattle_list, estimation_date):
+    """
+    Sorts the cattle into the age groups with one list comprehension per group, as calculate_groups used to.
+
+    :param cattle_list: The cattle dictionaries.
+    :param estimation_date: The estimation date for the classification.
+    :return: A dictionary mapping each group name to the indexes of its cattle.
+    """
+    indexed = list(enumerate(cattle_list))
+    return {
+        'Cows': [index for index, cattle in indexed if cattle['gender'] == 'Cow'
+                 and cattle['entry_date'] <= estimation_date],
+        'Calves': [index for index, cattle in indexed if cattle['gender'] in ['Heifer', 'Bull']
+                   and 0 <= legacy_age(cattle['birth_date'], estimation_date) < 12
+                   and cattle['entry_date'] <= estimation_date],
+        'Young_Heifer': [index for index, cattle in indexed if cattle['gender'] == 'Heifer'
+                         and 12 <= legacy_age(cattle['birth_date'], estimation_date) < 24
+                         and cattle['entry_date'] <= estimation_date],
+        'Adult_Heifer': [index for index, cattle in indexed if cattle['gender'] == 'Heifer'
+                         and legacy_age(cattle['birth_date'], estimation_date) >= 24
+                         and cattle['entry_date'] <= estimation_date],
+        'Young_Bull': [index for index, cattle in indexed if cattle['gender'] == 'Bull'
+                       and 12 <= legacy_age(cattle['birth_date'], estimation_date) < 24
+                       and cattle['entry_date'] <= estimation_date],
+        'Adult_Bull': [index for index, cattle in indexed if cattle['gender'] == 'Bull'
+                       and legacy_age(cattle['birth_date'], estimation_date) >= 24
+                       and cattle['entry_date'] <= estimation_date],
+    }
+
+
+def synthetic_cattle(count, estimation_date, seed=0):
+    """
+    Generates cattle dictionaries with random genders, birthdates and entry dates.
+
+    :param count: The number of cattle to generate.
+    :param estimation_date: The date the herd is generated around.
+    :param seed: The random seed, so that runs are repeatable.
+    :return: A list of cattle dictionaries.
+    """
+    generator = random.Random(seed)
+    # Dates are shared between rows to keep the memory of large herds down.
+    days = [estimation_date - timedelta(days=offset) for offset in range(-30, 3650)]
+    genders = ['Heifer', 'Bull', 'Cow']
+    cattle_list = []
+    for _ in range(count):
+        birth_index = generator.randrange(30, len(days))
+        cattle_list.append({
+            'gender': genders[generator.randrange(3)],
+            'birth_date': days[birth_index],
+            'entry_date': days[generator.randrange(0, birth_index + 1)],
+        })
+    return cattle_list
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the single-pass age group classifier against the previous per-group classification.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000, 1000000],
+                            help='Herd sizes to benchmark.')
+
+    def handle(self, *args, **options):
+        estimation_date = date.today()
+        groups_manager = GroupsManagement()
+
+        self.stdout.write(f'{"cattle":>10} {"legacy (s)":>12} {"single pass (s)":>16} {"speedup":>9}')
+        for size in options['sizes']:
+            cattle_list = synthetic_cattle(size, estimation_date)
+
+            started = time.perf_counter()
+            legacy_groups = legacy_classify(cattle_list, estimation_date)
+            legacy_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            groups = groups_manager.classify_cattle(cattle_list, estimation_date)
+            single_pass_time = time.perf_counter() - started
+
+            if groups != legacy_groups:
+                self.stderr.write(f'Classification mismatch for {size} cattle.')
+
+            self.stdout.write(f'{size:>10} {legacy_time:>12.3f} {single_pass_time:>16.3f} '
+                              f'{legacy_time / single_pass_time:>8.1f}x')
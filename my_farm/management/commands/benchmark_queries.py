@@ -0,0 +1,160 @@
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from my_farm.models import Cattle, Herd
+
+SEED_BATCH_SIZE = 5000
+
+
+def benchmark_queries(herd_id, on_date):
+    """
+    Builds the Cattle queries of the views, with the partial index each one is expected to use.
+
+    :param herd_id: The id of a seeded herd.
+    :param on_date: The date the synthetic herd is generated around.
+    :return: A list of (name, expected index name or None, queryset) tuples.
+    """
+    active = Cattle.objects.filter(deleted=False, loss_method__isnull=True)
+    year_start = on_date - timedelta(days=365)
+    return [
+        ('cattle_info', None, Cattle.objects.filter(deleted=False).order_by('number')[:5]),
+        ('cattle_info active', 'cattle_active_number_idx', active.order_by('number')[:5]),
+        ('cattle_list_by_herd', 'cattle_active_herd_idx', active.filter(herd_id=herd_id).order_by('number')[:21]),
+        ('herd counters', None, Cattle.objects.filter(herd_id__in=[herd_id], deleted=False).order_by().values(
+            'herd_id', 'gender', 'breed', 'birth_date', 'loss_method')),
+        ('calves by gender', 'cattle_active_gender_idx', active.filter(
+            gender='Heifer', birth_date__gt=year_start).order_by().values_list('id', flat=True)),
+        ('entries in range', 'cattle_entry_date_idx', Cattle.objects.filter(
+            deleted=False, entry_date__range=(year_start, on_date)).order_by().values_list('id', flat=True)),
+        ('losses in range', 'cattle_end_date_idx', Cattle.objects.filter(
+            deleted=False, end_date__range=(year_start, on_date)).order_by().values_list('id', flat=True)),
+    ]
+
+
+def seed_cattle(size, on_date, seed=0):
+    """
+    Inserts a synthetic herd: random genders and dates over ten years, a fifth of the cattle lost and one in twenty
+    deleted, spread over one herd per 500 cattle.
+
+    :param size: The number of cattle.
+    :param on_date: The date the herd is generated around.
+    :param seed: The random seed, so that runs are repeatable.
+    :return: The list of herd ids.
+    """
+    generator = random.Random(seed)
+    herds = Herd.objects.bulk_create([Herd(name=f'Benchmark {index}', location='Benchmark')
+                                      for index in range(max(size // 500, 1))])
+    herd_ids = [herd.pk for herd in herds]
+    genders = [gender for gender, label in Cattle.GENDER]
+    loss_methods = [method for method, label in Cattle.LOSS_METHOD]
+
+    batch = []
+    for index in range(size):
+        birth_date = on_date - timedelta(days=generator.randrange(30, 3650))
+        entry_date = birth_date + timedelta(days=generator.randrange(0, (on_date - birth_date).days))
+        lost = generator.random() < 0.2
+        batch.append(Cattle(
+            number=f'BENCH{index:08}', gender=genders[generator.randrange(len(genders))], breed='Angus',
+            birth_date=birth_date, entry_date=entry_date, herd_id=generator.choice(herd_ids),
+            loss_method=generator.choice(loss_methods) if lost else None,
+            end_date=entry_date + timedelta(days=generator.randrange(0, (on_date - entry_date).days + 1))
+            if lost else None,
+            deleted=generator.random() < 0.05, comments=''))
+        if len(batch) == SEED_BATCH_SIZE:
+            Cattle.objects.bulk_create(batch)
+            batch = []
+    Cattle.objects.bulk_create(batch)
+    return herd_ids
+
+
+def explain(queryset, label):
+    """
+    Explains the plan of a query. The label is added to the statement as a comment, so the database prepares a new
+    plan instead of reusing one cached for the statement before the indexes changed.
+
+    :param queryset: The queryset.
+    :param label: The label of the measurement.
+    :return: The plan, one line per plan row.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql} -- {label}', params)
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+
+def measure(queries, repeat, label):
+    """
+    Explains and times the queries.
+
+    :param queries: The (name, expected index, queryset) tuples.
+    :param repeat: The number of runs of each query, the fastest one is kept.
+    :param label: The label of the measurement, see explain().
+    :return: A dictionary mapping each query name to a dictionary with the 'plan' and the best 'ms'.
+    """
+    results = {}
+    for name, index_name, queryset in queries:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append(time.perf_counter() - started)
+        results[name] = {'plan': explain(queryset, label), 'ms': round(min(timings) * 1000, 3)}
+    return results
+
+
+class Command(BaseCommand):
+    help = ('Seeds a synthetic herd in a transaction that is rolled back, then records the query plans and timings '
+            'of the Cattle queries of the views with and without the partial Cattle indexes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100000, help='The number of synthetic cattle.')
+        parser.add_argument('--repeat', type=int, default=5, help='The number of runs of each query.')
+        parser.add_argument('--output', help='A path to record the plans and timings as JSON.')
+        parser.add_argument('--check', action='store_true',
+                            help='Fail when a query does not use its expected index.')
+
+    def handle(self, *args, **options):
+        if options['size'] < 1 or options['repeat'] < 1:
+            raise CommandError('The size and the number of runs must be at least 1.')
+
+        on_date = date.today()
+        with transaction.atomic():
+            herd_ids = seed_cattle(options['size'], on_date)
+            queries = benchmark_queries(herd_ids[0], on_date)
+            after = measure(queries, options['repeat'], 'after')
+
+            schema_editor = connection.schema_editor()
+            with connection.cursor() as cursor:
+                for index in Cattle._meta.indexes:
+                    cursor.execute(str(index.remove_sql(Cattle, schema_editor)))
+            before = measure(queries, options['repeat'], 'before')
+            transaction.set_rollback(True)
+
+        report = []
+        self.stdout.write(f'{"query":<22} {"before (ms)":>12} {"after (ms)":>11} {"speedup":>9}')
+        for name, index_name, queryset in queries:
+            speedup = before[name]['ms'] / after[name]['ms'] if after[name]['ms'] else 0
+            self.stdout.write(f"{name:<22} {before[name]['ms']:>12.3f} {after[name]['ms']:>11.3f} "
+                              f"{speedup:>8.1f}x")
+            report.append({'query': name, 'index': index_name, 'sql': str(queryset.query),
+                           'before': before[name], 'after': after[name],
+                           'uses_index': index_name is None or index_name in after[name]['plan']})
+
+        for entry in report:
+            before_plan = entry['before']['plan'].replace('\n', '\n' + ' ' * 10)
+            after_plan = entry['after']['plan'].replace('\n', '\n' + ' ' * 10)
+            self.stdout.write(f"\n{entry['query']}:\n  before: {before_plan}\n  after:  {after_plan}")
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({'size': options['size'], 'date': on_date.isoformat(), 'queries': report}, output,
+                          indent=2)
+
+        missing = [entry['query'] for entry in report if not entry['uses_index']]
+        if options['check'] and missing:
+            raise CommandError(f"Queries not using their index: {', '.join(missing)}.")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from my_farm.constants import IMPORT_BATCH_SIZE
+from my_farm.imports import CattleImport
+
+
+class Command(BaseCommand):
+    help = 'Imports cattle from a CSV file with a header line, see my_farm.imports.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='The path of the CSV file.')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='The number of rows validated and inserted at once.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('The batch size must be at least 1.')
+
+        try:
+            with open(options['csv_path'], encoding='utf-8-sig', newline='') as csv_file:
+                stats = CattleImport(options['batch_size']).import_csv(csv_file)
+        except (OSError, ValueError, UnicodeDecodeError) as error:
+            raise CommandError(str(error))
+
+        for line_num, error in stats['errors']:
+            self.stderr.write(f'Line {line_num}: {error}')
+        self.stdout.write(f"Imported {stats['created']} of {stats['rows']} rows in {stats['seconds']} s "
+                          f"({stats['rows_per_second']} rows/s), {stats['failed']} rows failed.")
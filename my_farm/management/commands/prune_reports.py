@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_farm.constants import REPORT_RETENTION_BATCH_SIZE
+from my_farm.retention import ReportRetention
+
+
+class Command(BaseCommand):
+    help = 'Deletes the saved livestock movement reports that no retention policy keeps, see REPORT_RETENTION.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-last', type=int, help='The number of most recent reports to keep.')
+        parser.add_argument('--max-age-days', type=int, help='Keep the reports newer than this number of days.')
+        parser.add_argument('--keep-monthly', action='store_true', default=None,
+                            help='Keep the first report of each month.')
+        parser.add_argument('--batch-size', type=int, default=REPORT_RETENTION_BATCH_SIZE,
+                            help='The number of reports deleted at once.')
+        parser.add_argument('--interval', type=float,
+                            help='Keep running in the background, pruning every this many seconds.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('The batch size must be at least 1.')
+
+        retention = ReportRetention(options['keep_last'], options['max_age_days'], options['keep_monthly'],
+                                    options['batch_size'])
+        while True:
+            reclaimed = retention.prune(dry_run=options['dry_run'])
+            action = 'Would delete' if options['dry_run'] else 'Deleted'
+            self.stdout.write(f"{action} {reclaimed['reports']} reports, {reclaimed['bytes']} bytes.")
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,24 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_farm.counters import FarmCounters
+
+
+class Command(BaseCommand):
+    help = 'Recounts the cattle, herd and live weight counters of every herd and field, repairing any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='The date of the live weight estimates in YYYY-MM-DD format, today by '
+                                           'default.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report the counters that drifted.')
+
+    def handle(self, *args, **options):
+        try:
+            on_date = date.fromisoformat(options['date']) if options['date'] else None
+        except ValueError:
+            raise CommandError('The date must be in YYYY-MM-DD format.')
+
+        drifted = FarmCounters(on_date).reconcile(dry_run=options['dry_run'])
+        action = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(f"{action} drifted counters of {drifted['herds']} herds and {drifted['fields']} fields.")
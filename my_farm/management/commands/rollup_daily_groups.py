@@ -0,0 +1,24 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_farm.rollup import DailyRollup
+
+
+class Command(BaseCommand):
+    help = ('Rolls up the daily headcount, weight and movements of every group from the movement ledger and saves the '
+            'monthly ledger checkpoints.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--until', help='The last day to roll up in YYYY-MM-DD format, today by default.')
+
+    def handle(self, *args, **options):
+        try:
+            until = date.fromisoformat(options['until']) if options['until'] else date.today()
+        except ValueError:
+            raise CommandError('The date must be in YYYY-MM-DD format.')
+
+        rollup = DailyRollup()
+        days = rollup.update(until)
+        checkpoint_count = rollup.ledger.save_checkpoints(until)
+        self.stdout.write(f'Rolled up {days} days until {until.isoformat()} and saved {checkpoint_count} checkpoints.')
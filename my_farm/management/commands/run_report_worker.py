@@ -0,0 +1,38 @@
+from multiprocessing import Process
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from my_farm.constants import REPORT_JOB_POLL_INTERVAL
+from my_farm.reports import process_report_jobs
+
+
+class Command(BaseCommand):
+    help = 'Runs the queued livestock movement reports, polling the database for new jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help='The number of worker processes, e.g. one per spare core.')
+        parser.add_argument('--poll-interval', type=float, default=REPORT_JOB_POLL_INTERVAL,
+                            help='The number of seconds to wait before polling an empty queue again.')
+        parser.add_argument('--once', action='store_true',
+                            help='Run the pending jobs and exit instead of polling for new ones.')
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1:
+            raise CommandError('The number of processes must be at least 1.')
+
+        if options['processes'] == 1:
+            processed = process_report_jobs(options['poll_interval'], options['once'])
+            self.stdout.write(f'Ran {processed} report jobs.')
+            return
+
+        # Forked processes must open their own database connections
+        connections.close_all()
+        workers = [Process(target=process_report_jobs, args=(options['poll_interval'], options['once']))
+                   for _ in range(options['processes'])]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.stdout.write(f'{len(workers)} report workers finished.')
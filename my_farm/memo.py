@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_memo_store = ContextVar('my_farm_memo_store', default=None)
+
+
+class RequestMemo:
+    """
+    Holds the results calculated during one unit of work, e.g. one HTTP request or one report job.
+
+    The results live only as long as the unit of work, so the memory they take is released when it ends. Results
+    that are not calculated inside a memo_context are not stored.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty RequestMemo instance.
+        """
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_calculate(self, name, args, calculate):
+        """
+        Returns a result calculated earlier in the unit of work, calculating and storing it on a miss.
+
+        :param name: The name of the calculation.
+        :param args: The hashable arguments of the calculation.
+        :param calculate: The function calculating the result.
+        :return: The result.
+        """
+        key = (name, *args)
+        if key in self.results:
+            self.hits += 1
+            return self.results[key]
+
+        self.misses += 1
+        result = calculate()
+        self.results[key] = result
+        return result
+
+    def clear(self):
+        """
+        Removes every stored result, e.g. when the farm data changes during the unit of work.
+        """
+        self.results.clear()
+
+
+@contextmanager
+def memo_context():
+    """
+    Memoizes the calculations made inside the context and drops them when it exits.
+
+    Nested contexts share the memo of the outermost one.
+
+    :return: The active RequestMemo.
+    """
+    memo = _memo_store.get()
+    if memo is not None:
+        yield memo
+        return
+
+    memo = RequestMemo()
+    token = _memo_store.set(memo)
+    try:
+        yield memo
+    finally:
+        _memo_store.reset(token)
+        memo.clear()
+
+
+def current_memo():
+    """
+    Returns the memo of the active unit of work.
+
+    :return: The active RequestMemo, or None outside of a memo_context.
+    """
+    return _memo_store.get()
+
+
+def memoize(name, args, calculate):
+    """
+    Calculates a result once per unit of work, see memo_context().
+
+    :param name: The name of the calculation.
+    :param args: The hashable arguments of the calculation.
+    :param calculate: The function calculating the result.
+    :return: The result.
+    """
+    memo = _memo_store.get()
+    if memo is None:
+        return calculate()
+    return memo.get_or_calculate(name, args, calculate)
+
+
+def forget_memoized():
+    """
+    Drops the results of the active unit of work, so they are calculated again from the changed farm data.
+    """
+    memo = _memo_store.get()
+    if memo is not None:
+        memo.clear()
+
+
+class RequestMemoMiddleware:
+    """
+    Runs every request inside a memo_context, so the groups, snapshots and weights calculated while handling it are
+    shared by all the code handling the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with memo_context():
+            return self.get_response(request)
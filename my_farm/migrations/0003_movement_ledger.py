@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-18 14:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovementCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('balance', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MovementEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('Entered', 'Entered'), ('Left', 'Left'), ('Herd changed', 'Herd changed'), ('Gender changed', 'Gender changed'), ('Age class crossed', 'Age class crossed')], max_length=20)),
+                ('date', models.DateField()),
+                ('group_name', models.CharField(blank=True, max_length=20, null=True)),
+                ('from_group_name', models.CharField(blank=True, max_length=20, null=True)),
+                ('method', models.CharField(blank=True, max_length=80, null=True)),
+                ('gender', models.CharField(max_length=80)),
+                ('from_gender', models.CharField(blank=True, max_length=80, null=True)),
+                ('breed', models.CharField(blank=True, max_length=80, null=True)),
+                ('birth_date', models.DateField(blank=True, null=True)),
+                ('delta', models.SmallIntegerField(default=1)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+                ('cattle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movement_events', to='my_farm.cattle')),
+                ('from_herd', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='my_farm.herd')),
+                ('herd', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='my_farm.herd')),
+            ],
+            options={
+                'ordering': ['date', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='movementevent',
+            index=models.Index(fields=['date', 'group_name'], name='my_farm_mov_date_8f477c_idx'),
+        ),
+    ]
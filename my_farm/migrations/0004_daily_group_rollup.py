@@ -0,0 +1,50 @@
+# Generated by Django 4.2 on 2026-10-18 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0003_movement_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyGroupRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('group_name', models.CharField(max_length=20)),
+                ('headcount', models.IntegerField(default=0)),
+                ('total_weight', models.FloatField(default=0)),
+                ('birth_count', models.IntegerField(default=0)),
+                ('birth_weight', models.IntegerField(default=0)),
+                ('purchase_count', models.IntegerField(default=0)),
+                ('purchase_weight', models.IntegerField(default=0)),
+                ('gift_count', models.IntegerField(default=0)),
+                ('gift_weight', models.IntegerField(default=0)),
+                ('death_count', models.IntegerField(default=0)),
+                ('death_weight', models.IntegerField(default=0)),
+                ('sold_count', models.IntegerField(default=0)),
+                ('sold_weight', models.IntegerField(default=0)),
+                ('consumed_count', models.IntegerField(default=0)),
+                ('consumed_weight', models.IntegerField(default=0)),
+                ('gifted_count', models.IntegerField(default=0)),
+                ('gifted_weight', models.IntegerField(default=0)),
+                ('moved_in', models.IntegerField(default=0)),
+                ('moved_out', models.IntegerField(default=0)),
+                ('weight_moved_in', models.FloatField(default=0)),
+                ('weight_moved_out', models.FloatField(default=0)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('growth_version', models.CharField(max_length=40)),
+            ],
+            options={
+                'ordering': ['date', 'group_name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailygrouprollup',
+            constraint=models.UniqueConstraint(fields=('date', 'group_name'), name='unique_daily_group_rollup'),
+        ),
+    ]
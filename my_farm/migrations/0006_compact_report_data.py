@@ -0,0 +1,93 @@
+import base64
+import json
+import re
+import zlib
+from array import array
+
+from django.db import migrations
+
+# The report schema and fields of my_farm.reports at the time of this migration.
+REPORT_SCHEMA_VERSION = 2
+REPORT_FIELDS = ['start_date_count', 'start_date_group_weight', 'birth_count', 'birth_weight', 'purchase_count',
+                 'purchase_weight', 'gift_count', 'gift_weight', 'moved_in', 'weight_moved_in', 'moved_out',
+                 'weight_moved_out', 'death_count', 'death_weight', 'sold_count', 'sold_weight', 'consumed_count',
+                 'consumed_weight', 'gifted_count', 'gifted_weight', 'end_date_count', 'end_date_group_weight',
+                 'count_difference', 'weight_difference']
+TITLE_DATES = re.compile(r'\((\d{4}-\d{2}-\d{2}) - (\d{4}-\d{2}-\d{2})\)')
+
+
+def number(value):
+    if isinstance(value, str):
+        value = float(value)
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else round(value, 2)
+    return value
+
+
+def encode_cattle_ids(cattle_ids):
+    previous = 0
+    differences = array('q')
+    for cattle_id in sorted(cattle_ids):
+        differences.append(cattle_id - previous)
+        previous = cattle_id
+    return base64.b64encode(zlib.compress(differences.tobytes())).decode('ascii')
+
+
+def compact_report_data(apps, schema_editor):
+    """
+    Converts the reports stored as JSON strings of GroupNumbers.to_dict() dictionaries to the compact report schema,
+    keeping only the ids of the cattle in each group.
+    """
+    CattleMovementReport = apps.get_model('my_farm', 'CattleMovementReport')
+    for report in CattleMovementReport.objects.iterator():
+        report_data = report.report_data
+        if isinstance(report_data, str):
+            report_data = json.loads(report_data)
+        if not isinstance(report_data, list):
+            continue
+
+        dates = TITLE_DATES.search(report.title)
+        report.report_data = {
+            'version': REPORT_SCHEMA_VERSION,
+            'start_date': dates.group(1) if dates else None,
+            'end_date': dates.group(2) if dates else None,
+            'fields': REPORT_FIELDS,
+            'groups': [[group['group_name'], *(number(group.get(field, 0)) for field in REPORT_FIELDS)]
+                       for group in report_data],
+            'cattle_ids': {group['group_name']: encode_cattle_ids(item['cattle']['id']
+                                                                  for item in group.get('group_data') or [])
+                           for group in report_data},
+        }
+        report.save(update_fields=['report_data'])
+
+
+def expand_report_data(apps, schema_editor):
+    """
+    Converts the reports back to JSON strings of GroupNumbers.to_dict() dictionaries, without the cattle data.
+    """
+    CattleMovementReport = apps.get_model('my_farm', 'CattleMovementReport')
+    for report in CattleMovementReport.objects.iterator():
+        report_data = report.report_data
+        if not isinstance(report_data, dict):
+            continue
+
+        groups = []
+        for group_name, *values in report_data['groups']:
+            group = {'group_name': group_name, 'group_data': []}
+            for field, value in zip(report_data['fields'], values):
+                group[field] = value if field in ('moved_in', 'moved_out', 'weight_moved_in', 'weight_moved_out') \
+                    else str(value)
+            groups.append(group)
+        report.report_data = json.dumps(groups)
+        report.save(update_fields=['report_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0005_report_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_report_data, expand_report_data),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0006_compact_report_data'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cattlemovementreport',
+            name='generated_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
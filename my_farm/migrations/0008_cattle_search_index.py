@@ -0,0 +1,68 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# The indexed columns of my_farm.search at the time of this migration.
+SEARCH_COLUMNS = ['number', 'name', 'breed', 'gender', 'acquisition_method', 'loss_method', 'comments']
+COLUMNS = ', '.join(SEARCH_COLUMNS)
+NEW_VALUES = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+OLD_VALUES = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+
+CREATE_INDEX = [
+    f"CREATE VIRTUAL TABLE my_farm_cattle_fts USING fts5({COLUMNS}, content='my_farm_cattle', content_rowid='id')",
+    f"""CREATE TRIGGER my_farm_cattle_fts_insert AFTER INSERT ON my_farm_cattle BEGIN
+        INSERT INTO my_farm_cattle_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+    END""",
+    f"""CREATE TRIGGER my_farm_cattle_fts_delete AFTER DELETE ON my_farm_cattle BEGIN
+        INSERT INTO my_farm_cattle_fts(my_farm_cattle_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+    END""",
+    f"""CREATE TRIGGER my_farm_cattle_fts_update AFTER UPDATE OF {COLUMNS} ON my_farm_cattle BEGIN
+        INSERT INTO my_farm_cattle_fts(my_farm_cattle_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+        INSERT INTO my_farm_cattle_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+    END""",
+    "INSERT INTO my_farm_cattle_fts(my_farm_cattle_fts) VALUES ('rebuild')",
+]
+DROP_INDEX = [
+    'DROP TRIGGER IF EXISTS my_farm_cattle_fts_insert',
+    'DROP TRIGGER IF EXISTS my_farm_cattle_fts_delete',
+    'DROP TRIGGER IF EXISTS my_farm_cattle_fts_update',
+    'DROP TABLE IF EXISTS my_farm_cattle_fts',
+]
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Creates the FTS5 full-text index of the cattle and the triggers keeping it in sync, on SQLite builds with the
+    FTS5 extension. Other databases keep searching with LIKE.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute('CREATE VIRTUAL TABLE temp.my_farm_fts_check USING fts5(value)')
+        except OperationalError:
+            return
+        cursor.execute('DROP TABLE temp.my_farm_fts_check')
+        for statement in CREATE_INDEX:
+            cursor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    """
+    Drops the full-text index of the cattle and its triggers.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in DROP_INDEX:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0007_report_generated_date_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2 on 2026-10-18 14:22
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_herds_and_fields(apps, schema_editor):
+    """
+    Fills the cattle and herd counters of the existing herds and fields. The live weights are estimated by the
+    reconcile_counters command.
+    """
+    Herd = apps.get_model('my_farm', 'Herd')
+    Field = apps.get_model('my_farm', 'Field')
+    herds = Herd.objects.annotate(
+        active=Count('cattle', filter=Q(cattle__deleted=False, cattle__loss_method__isnull=True)),
+        total=Count('cattle', filter=Q(cattle__deleted=False)),
+    )
+    for herd in herds:
+        Herd.objects.filter(id=herd.id).update(active_cattle_count=herd.active, total_cattle_count=herd.total)
+
+    for field in Field.objects.all():
+        herds = Herd.objects.filter(field=field)
+        field.herd_count = herds.count()
+        field.active_cattle_count = sum(herds.values_list('active_cattle_count', flat=True))
+        field.total_cattle_count = sum(herds.values_list('total_cattle_count', flat=True))
+        field.save(update_fields=['herd_count', 'active_cattle_count', 'total_cattle_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0008_cattle_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='field',
+            name='active_cattle_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='counted_on',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='herd_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='live_weight',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='field',
+            name='total_cattle_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='herd',
+            name='active_cattle_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='herd',
+            name='counted_on',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='herd',
+            name='live_weight',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='herd',
+            name='total_cattle_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_herds_and_fields, migrations.RunPython.noop),
+    ]
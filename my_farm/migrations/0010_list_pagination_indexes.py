@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0009_farm_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='field',
+            index=models.Index(fields=['name', 'id'], name='field_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='herd',
+            index=models.Index(fields=['name', 'id'], name='herd_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0010_list_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(condition=models.Q(('deleted', False), ('loss_method__isnull', True)), fields=['herd', 'number'], name='cattle_active_herd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(condition=models.Q(('deleted', False), ('loss_method__isnull', True)), fields=['number'], name='cattle_active_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(condition=models.Q(('deleted', False), ('loss_method__isnull', True)), fields=['gender', 'birth_date'], name='cattle_active_gender_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['entry_date'], name='cattle_entry_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(condition=models.Q(('deleted', False), ('end_date__isnull', False)), fields=['end_date'], name='cattle_end_date_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0011_cattle_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FarmDataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=32)),
+            ],
+        ),
+    ]
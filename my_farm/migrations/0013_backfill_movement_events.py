@@ -0,0 +1,147 @@
+from calendar import monthrange
+from datetime import timedelta
+from uuid import uuid4
+
+from django.db import migrations
+from django.db.models import Count, Q
+
+BACKFILL_BATCH_SIZE = 2000
+
+# The age classes and event types of my_farm.ages and my_farm.models at the time of this migration.
+YOUNG_AGE_MONTHS = 12
+ADULT_AGE_MONTHS = 24
+ENTERED = 'Entered'
+LEFT = 'Left'
+AGE_CLASS_CROSSED = 'Age class crossed'
+
+# The events derived from the data of a cattle alone, see record_movement_events.
+DERIVED_EVENT_TYPES = [ENTERED, AGE_CLASS_CROSSED, LEFT]
+
+
+def age_in_months(birth_date, on_date):
+    months = (on_date.year - birth_date.year) * 12 + on_date.month - birth_date.month
+    if on_date.day < birth_date.day and on_date.day < monthrange(on_date.year, on_date.month)[1]:
+        months -= 1
+    return months
+
+
+def add_months(value, months):
+    year, month = divmod(value.month - 1 + months, 12)
+    year += value.year
+    return value.replace(year=year, month=month + 1, day=min(value.day, monthrange(year, month + 1)[1]))
+
+
+def age_group(gender, birth_date, on_date):
+    if gender == 'Cow':
+        return 'Cows'
+    if gender not in ('Heifer', 'Bull') or birth_date is None or birth_date > on_date:
+        return None
+
+    months = age_in_months(birth_date, on_date)
+    if months < YOUNG_AGE_MONTHS:
+        return 'Calves'
+    if months < ADULT_AGE_MONTHS:
+        return f'Young_{gender}'
+    return f'Adult_{gender}'
+
+
+def cattle_events(cattle):
+    """
+    Derives the ledger events of a cattle without gender or herd changes, like my_farm.ledger.cattle_events: it enters
+    its group on the entry date, crosses into the next age group on its birthday and at 12 and 24 months and leaves on
+    the end date. Deleted cattle have no events.
+
+    :param cattle: The historical Cattle instance.
+    :return: The list of MovementEvent field dictionaries.
+    """
+    entry_date = cattle.entry_date
+    end_date = cattle.end_date
+    birth_date = cattle.birth_date
+    if cattle.deleted or entry_date is None or (end_date is not None and end_date < entry_date):
+        return []
+
+    def event(event_type, on_date, group_name, from_group_name=None, method=None):
+        return {'event_type': event_type, 'date': on_date, 'group_name': group_name,
+                'from_group_name': from_group_name, 'method': method, 'gender': cattle.gender, 'from_gender': None,
+                'breed': cattle.breed, 'birth_date': birth_date, 'herd_id': None, 'from_herd_id': None}
+
+    events = [event(ENTERED, entry_date, age_group(cattle.gender, birth_date, entry_date),
+                    method=cattle.acquisition_method)]
+
+    if birth_date is not None:
+        crossing_dates = {birth_date, add_months(birth_date, YOUNG_AGE_MONTHS),
+                          add_months(birth_date, ADULT_AGE_MONTHS)}
+        for crossing_date in sorted(crossing_dates):
+            if crossing_date <= entry_date or (end_date is not None and crossing_date > end_date):
+                continue
+            from_group_name = age_group(cattle.gender, birth_date, crossing_date - timedelta(days=1))
+            group_name = age_group(cattle.gender, birth_date, crossing_date)
+            if from_group_name != group_name:
+                events.append(event(AGE_CLASS_CROSSED, crossing_date, group_name, from_group_name))
+
+    if end_date is not None:
+        events.append(event(LEFT, end_date, age_group(cattle.gender, birth_date, end_date),
+                            method=cattle.loss_method))
+
+    return events
+
+
+def record_movement_events(apps, schema_editor):
+    """
+    Records the ledger events of the cattle that have none yet, like the backfill_movement_events command, so the
+    movement reports include the cattle created before the ledger. The gender and herd changes made before the ledger
+    are unknown, so the events are derived from the current data of each cattle.
+    """
+    Cattle = apps.get_model('my_farm', 'Cattle')
+    MovementEvent = apps.get_model('my_farm', 'MovementEvent')
+    MovementCheckpoint = apps.get_model('my_farm', 'MovementCheckpoint')
+    FarmDataVersion = apps.get_model('my_farm', 'FarmDataVersion')
+
+    first_date = None
+    batch = []
+    for cattle in Cattle.objects.filter(movement_events__isnull=True).order_by('id').iterator(
+            chunk_size=BACKFILL_BATCH_SIZE):
+        for event in cattle_events(cattle):
+            batch.append(MovementEvent(cattle_id=cattle.pk, delta=1, **event))
+            first_date = min(first_date or event['date'], event['date'])
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            MovementEvent.objects.bulk_create(batch)
+            batch = []
+    MovementEvent.objects.bulk_create(batch)
+
+    if first_date is not None:
+        MovementCheckpoint.objects.filter(date__gte=first_date).delete()
+        FarmDataVersion.objects.update_or_create(pk=1, defaults={'version': uuid4().hex})
+
+
+def remove_movement_events(apps, schema_editor):
+    """
+    Removes the ledger events of the cattle whose events are all derived from their data, which
+    record_movement_events records again. The events of cattle with gender or herd changes or corrections are kept.
+    The checkpoints and the daily rollup are derived from the events, so they are removed to be rebuilt by the
+    rollup_daily_groups command.
+    """
+    Cattle = apps.get_model('my_farm', 'Cattle')
+    MovementEvent = apps.get_model('my_farm', 'MovementEvent')
+    MovementCheckpoint = apps.get_model('my_farm', 'MovementCheckpoint')
+    DailyGroupRollup = apps.get_model('my_farm', 'DailyGroupRollup')
+    FarmDataVersion = apps.get_model('my_farm', 'FarmDataVersion')
+
+    changed = Q(movement_events__delta__lt=1) | ~Q(movement_events__event_type__in=DERIVED_EVENT_TYPES)
+    cattle_ids = Cattle.objects.annotate(changes=Count('movement_events', filter=changed)).filter(
+        changes=0).values('id')
+    MovementEvent.objects.filter(cattle_id__in=cattle_ids).delete()
+    MovementCheckpoint.objects.all().delete()
+    DailyGroupRollup.objects.all().delete()
+    FarmDataVersion.objects.update_or_create(pk=1, defaults={'version': uuid4().hex})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_farm', '0012_farm_data_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(record_movement_events, remove_movement_events),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.utils.functional import cached_property
+from .cache import result_cache
 
 
 class BaseModel(models.Model):
@@ -25,6 +27,27 @@ class CattleManager(models.Manager):
         return super().get_queryset().filter(deleted=False)
 
 
+class FarmDataQuerySet(models.QuerySet):
+    """
+    A queryset that changes the farm data version after bulk changes, which do not send the model signals.
+    """
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        result_cache.bump_version()
+        return objs
+
+    def bulk_update(self, *args, **kwargs):
+        rows = super().bulk_update(*args, **kwargs)
+        result_cache.bump_version()
+        return rows
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        result_cache.bump_version()
+        return rows
+
+
 class Cattle(models.Model):
     """
     Represents information about cattle, including breed, gender, acquisition method, and loss method.
@@ -69,20 +92,34 @@ class Cattle(models.Model):
     deleted = models.BooleanField(default=False)
     picture = models.ImageField(upload_to='cattle_pictures', blank=True, null=True)
 
+    objects = FarmDataQuerySet.as_manager()
+
     def delete(self):
         """
-        Soft delete the cattle by setting the 'deleted' field to True and saving the object.
+        Soft delete the cattle by setting the 'deleted' field to True and saving only that field.
         """
         self.deleted = True
-        self.save()
+        self.save(update_fields=['deleted'])
 
     class Meta:
         """
-        Meta information for the Cattle model, including the human-readable names and default ordering.
+        Meta information for the Cattle model, including the human-readable names, default ordering and the partial
+        indexes of the active cattle queries, see the benchmark_queries command.
         """
         verbose_name = "Cattle Info"
         verbose_name_plural = "Cattle Info"
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['herd', 'number'], name='cattle_active_herd_idx',
+                         condition=models.Q(deleted=False, loss_method__isnull=True)),
+            models.Index(fields=['number'], name='cattle_active_number_idx',
+                         condition=models.Q(deleted=False, loss_method__isnull=True)),
+            models.Index(fields=['gender', 'birth_date'], name='cattle_active_gender_idx',
+                         condition=models.Q(deleted=False, loss_method__isnull=True)),
+            models.Index(fields=['entry_date'], name='cattle_entry_date_idx', condition=models.Q(deleted=False)),
+            models.Index(fields=['end_date'], name='cattle_end_date_idx',
+                         condition=models.Q(deleted=False, end_date__isnull=False)),
+        ]
 
     def __str__(self):
         """
@@ -109,6 +146,17 @@ class Field(models.Model):
     is_active = models.BooleanField(default=True)
     description = models.TextField(max_length=1200, blank=True)
     picture = models.ImageField(upload_to='field_pictures', blank=True, null=True)
+    herd_count = models.PositiveIntegerField(default=0, editable=False)
+    active_cattle_count = models.PositiveIntegerField(default=0, editable=False)
+    total_cattle_count = models.PositiveIntegerField(default=0, editable=False)
+    live_weight = models.FloatField(default=0, editable=False)
+    counted_on = models.DateField(blank=True, null=True, editable=False)
+
+    class Meta:
+        """
+        Meta information for the Field model, indexing the keyset pagination order of the field lists.
+        """
+        indexes = [models.Index(fields=['name', 'id'], name='field_name_id_idx')]
 
     def __str__(self):
         """
@@ -130,6 +178,18 @@ class Herd(models.Model):
     herd_leader = models.ForeignKey('Cattle', on_delete=models.SET_NULL, blank=True, null=True,
                                     related_name='herd_leader')
     picture = models.ImageField(upload_to='herd_pictures', blank=True, null=True)
+    active_cattle_count = models.PositiveIntegerField(default=0, editable=False)
+    total_cattle_count = models.PositiveIntegerField(default=0, editable=False)
+    live_weight = models.FloatField(default=0, editable=False)
+    counted_on = models.DateField(blank=True, null=True, editable=False)
+
+    objects = FarmDataQuerySet.as_manager()
+
+    class Meta:
+        """
+        Meta information for the Herd model, indexing the keyset pagination order of the herd lists.
+        """
+        indexes = [models.Index(fields=['name', 'id'], name='herd_name_id_idx')]
 
     def __str__(self):
         """
@@ -143,5 +203,178 @@ class CattleMovementReport(models.Model):
     Represents a report of cattle movement, including detailed data and its generation date.
     """
     title = models.CharField(max_length=100)
-    generated_date = models.DateTimeField(auto_now_add=True)
+    generated_date = models.DateTimeField(auto_now_add=True, db_index=True)
     report_data = models.JSONField()
+
+    @cached_property
+    def groups(self):
+        """
+        Decodes the groups of the report once, so templates can render them without parsing the report data.
+
+        :return: The list of GroupNumbers instances, see my_farm.reports.decode_report.
+        """
+        from .reports import decode_report
+        return decode_report(self.report_data)
+
+
+class MovementEvent(models.Model):
+    """
+    Represents an entry of the append-only cattle movement ledger.
+
+    Every change of a cattle that affects the livestock movement report is recorded as events. Events are never
+    updated or deleted: a correction appends the same event with a delta of -1 to cancel it, followed by the
+    corrected events.
+    """
+    ENTERED = 'Entered'
+    LEFT = 'Left'
+    HERD_CHANGED = 'Herd changed'
+    GENDER_CHANGED = 'Gender changed'
+    AGE_CLASS_CROSSED = 'Age class crossed'
+
+    EVENT_TYPE = [
+        (ENTERED, 'Entered'),
+        (LEFT, 'Left'),
+        (HERD_CHANGED, 'Herd changed'),
+        (GENDER_CHANGED, 'Gender changed'),
+        (AGE_CLASS_CROSSED, 'Age class crossed'),
+    ]
+
+    cattle = models.ForeignKey('Cattle', on_delete=models.CASCADE, related_name='movement_events')
+    event_type = models.CharField(choices=EVENT_TYPE, max_length=20)
+    date = models.DateField()
+    group_name = models.CharField(max_length=20, blank=True, null=True)
+    from_group_name = models.CharField(max_length=20, blank=True, null=True)
+    method = models.CharField(max_length=80, blank=True, null=True)
+    gender = models.CharField(max_length=80)
+    from_gender = models.CharField(max_length=80, blank=True, null=True)
+    breed = models.CharField(max_length=80, blank=True, null=True)
+    birth_date = models.DateField(blank=True, null=True)
+    herd = models.ForeignKey('Herd', on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    from_herd = models.ForeignKey('Herd', on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    delta = models.SmallIntegerField(default=1)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """
+        Meta information for the MovementEvent model, including the index used to read the events of a report window.
+        """
+        ordering = ['date', 'id']
+        indexes = [models.Index(fields=['date', 'group_name'])]
+
+    def __str__(self):
+        """
+        Returns a string representation of the event, showing its type, date and cattle.
+        """
+        return f'{self.event_type}, {self.date}, {self.cattle_id}'
+
+
+class MovementCheckpoint(models.Model):
+    """
+    Represents the cattle of every group at the end of a day, used as the opening balance of movement reports.
+
+    Checkpoints are derived from the MovementEvent ledger and are deleted whenever an event on or before their date
+    is recorded. The last_event_id is the last event recorded when the checkpoint was calculated.
+    """
+    date = models.DateField(unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    balance = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the checkpoint, showing its date.
+        """
+        return f'Checkpoint {self.date}'
+
+
+class DailyGroupRollup(models.Model):
+    """
+    Represents the headcount and estimated weight of an age group at the end of a day.
+
+    The acquisition, loss and movement numbers are running totals up to and including the day, so the numbers of any
+    date range are the difference between the rows of its last day and of the day before it.
+    """
+    date = models.DateField()
+    group_name = models.CharField(max_length=20)
+    headcount = models.IntegerField(default=0)
+    total_weight = models.FloatField(default=0)
+    birth_count = models.IntegerField(default=0)
+    birth_weight = models.IntegerField(default=0)
+    purchase_count = models.IntegerField(default=0)
+    purchase_weight = models.IntegerField(default=0)
+    gift_count = models.IntegerField(default=0)
+    gift_weight = models.IntegerField(default=0)
+    death_count = models.IntegerField(default=0)
+    death_weight = models.IntegerField(default=0)
+    sold_count = models.IntegerField(default=0)
+    sold_weight = models.IntegerField(default=0)
+    consumed_count = models.IntegerField(default=0)
+    consumed_weight = models.IntegerField(default=0)
+    gifted_count = models.IntegerField(default=0)
+    gifted_weight = models.IntegerField(default=0)
+    moved_in = models.IntegerField(default=0)
+    moved_out = models.IntegerField(default=0)
+    weight_moved_in = models.FloatField(default=0)
+    weight_moved_out = models.FloatField(default=0)
+    last_event_id = models.BigIntegerField(default=0)
+    growth_version = models.CharField(max_length=40)
+
+    class Meta:
+        """
+        Meta information for the DailyGroupRollup model, with one row per day and group.
+        """
+        ordering = ['date', 'group_name']
+        constraints = [models.UniqueConstraint(fields=['date', 'group_name'], name='unique_daily_group_rollup')]
+
+    def __str__(self):
+        """
+        Returns a string representation of the rollup, showing its date, group and headcount.
+        """
+        return f'{self.date}, {self.group_name}, {self.headcount}'
+
+
+class ReportJob(models.Model):
+    """
+    Represents a livestock movement report waiting for, or generated by, the report worker.
+    """
+    PENDING = 'Pending'
+    RUNNING = 'Running'
+    DONE = 'Done'
+    FAILED = 'Failed'
+
+    STATUS = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    start_date = models.DateField()
+    end_date = models.DateField()
+    status = models.CharField(choices=STATUS, max_length=20, default=PENDING, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    report = models.ForeignKey('CattleMovementReport', on_delete=models.SET_NULL, blank=True, null=True,
+                               related_name='jobs')
+
+    def __str__(self):
+        """
+        Returns a string representation of the job, showing its dates and status.
+        """
+        return f'Report {self.start_date} - {self.end_date}, {self.status}'
+
+
+class FarmDataVersion(models.Model):
+    """
+    Represents the farm data version shared by every process, a single row changed in the transaction of every write
+    of the farm data, see my_farm.cache.ResultCache.
+    """
+    version = models.CharField(max_length=32)
+
+    def __str__(self):
+        """
+        Returns a string representation of the farm data version.
+        """
+        return self.version
@@ -0,0 +1,192 @@
+import base64
+import binascii
+import json
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from .cache import result_cache
+
+NEXT = 'next'
+PREVIOUS = 'previous'
+
+
+class CursorPage:
+    """
+    A page of a CursorPaginator, iterable like a Django Page.
+    """
+
+    def __init__(self, paginator, object_list, has_next, has_previous):
+        """
+        Initializes a CursorPage instance.
+
+        :param paginator: The CursorPaginator.
+        :param object_list: The objects of the page, in the paginator ordering.
+        :param has_next: Whether a page follows this page.
+        :param has_previous: Whether a page precedes this page.
+        """
+        self.paginator = paginator
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.params = ''
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self):
+        """
+        The opaque token of the next page, or None on the last page.
+        """
+        if not self.has_next:
+            return None
+        return self.paginator.encode_cursor(NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        """
+        The opaque token of the previous page, or None on the first page.
+        """
+        if not self.has_previous:
+            return None
+        return self.paginator.encode_cursor(PREVIOUS, self.object_list[0])
+
+    @property
+    def total(self):
+        """
+        The approximate number of objects of every page, see CursorPaginator.total().
+        """
+        return self.paginator.total()
+
+
+class CursorPaginator:
+    """
+    Paginates a queryset by keyset instead of by offset, so every page costs the same as the first one.
+
+    The ordering columns must not be NULL and the last one must be unique, e.g. ['name', 'id']. A page is selected
+    with a WHERE condition on the ordering values of the last row of the page before it, carried in an opaque cursor,
+    and is served by an index on the ordering columns. No COUNT query is made unless total() is read.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        """
+        Initializes a CursorPaginator instance.
+
+        :param queryset: The queryset to paginate, its ordering is replaced.
+        :param ordering: The ordering field names, '-' prefixed for a descending order, ending with a unique field.
+        :param per_page: The number of objects per page.
+        """
+        self.queryset = queryset
+        self.ordering = ordering
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        """
+        Returns the page of a cursor.
+
+        :param cursor: The cursor of a page, see CursorPage.next_cursor and previous_cursor, or None for the first
+            page. Invalid cursors also select the first page.
+        :return: The CursorPage.
+        """
+        direction, values = self.decode_cursor(cursor)
+        if direction is not None:
+            try:
+                after = self._after(values, reverse=direction == PREVIOUS)
+                queryset = self.queryset.filter(after)
+            except (ValidationError, ValueError, TypeError):
+                direction = None
+
+        if direction is None:
+            object_list = list(self.queryset.order_by(*self.ordering)[:self.per_page + 1])
+            return CursorPage(self, object_list[:self.per_page], len(object_list) > self.per_page, False)
+
+        if direction == NEXT:
+            object_list = list(queryset.order_by(*self.ordering)[:self.per_page + 1])
+            return CursorPage(self, object_list[:self.per_page], len(object_list) > self.per_page, True)
+
+        reversed_ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+        object_list = list(queryset.order_by(*reversed_ordering)[:self.per_page + 1])
+        return CursorPage(self, object_list[:self.per_page][::-1], True, len(object_list) > self.per_page)
+
+    def total(self):
+        """
+        Counts the objects of every page. The count is cached until the farm data changes, so it can lag behind
+        changes of data outside of the farm data version, e.g. fields.
+
+        :return: The number of objects.
+        """
+        query = str(self.queryset.order_by().query)
+        return result_cache.get_or_calculate('cursor_paginator_total', [query], self.queryset.count)
+
+    def _after(self, values, reverse):
+        """
+        Builds the keyset condition selecting the rows after the ordering values, in the paginator ordering or in the
+        reversed ordering.
+
+        :param values: The ordering values of the row.
+        :param reverse: Whether the rows are selected in the reversed ordering.
+        :return: The Q condition.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            descending = field.startswith('-') != reverse
+            name = field.lstrip('-')
+            condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, direction, obj):
+        """
+        Encodes the cursor of the rows after or before an object.
+
+        :param direction: NEXT or PREVIOUS.
+        :param obj: The object, a model instance or a values() dictionary.
+        :return: The cursor string.
+        """
+        values = [obj[field.lstrip('-')] if isinstance(obj, dict) else getattr(obj, field.lstrip('-'))
+                  for field in self.ordering]
+        data = json.dumps([direction, values], cls=DjangoJSONEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """
+        Decodes a cursor.
+
+        :param cursor: The cursor string, or None.
+        :return: A tuple of the direction and the list of ordering values, or (None, None) for no or an invalid
+            cursor.
+        """
+        if not cursor:
+            return None, None
+        try:
+            direction, values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except (binascii.Error, ValueError, TypeError):
+            return None, None
+        if direction not in (NEXT, PREVIOUS) or not isinstance(values, list) or len(values) != len(self.ordering):
+            return None, None
+        return direction, values
+
+
+def paginate(request, queryset, ordering, per_page):
+    """
+    Returns the page of a queryset selected by the 'cursor' request parameter. The other request parameters are kept
+    in the 'params' of the page, so the pagination links keep the filters of the list.
+
+    :param request: The HTTP request object.
+    :param queryset: The queryset to paginate.
+    :param ordering: The ordering field names, see CursorPaginator.
+    :param per_page: The number of objects per page.
+    :return: The CursorPage.
+    """
+    page = CursorPaginator(queryset, ordering, per_page).page(request.GET.get('cursor'))
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    page.params = params.urlencode()
+    return page
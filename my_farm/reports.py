@@ -0,0 +1,311 @@
+import base64
+import json
+import time
+import zlib
+from array import array
+from django.db import transaction
+from .cache import result_cache
+from django.utils import timezone
+from .constants import REPORT_JOB_POLL_INTERVAL
+from .groups import GroupNumbers
+from .memo import memo_context
+from .models import CattleMovementReport, ReportJob
+from .rollup import DailyRollup
+from .snapshot import SnapshotGroup
+
+REPORT_SCHEMA_VERSION = 3
+# The counting rules of the reports calculated from the movement ledger, see MovementLedger.calculate.
+BALANCED_REPORT_SEMANTICS = 'balanced'
+# The counting rules of the reports calculated from the herd snapshots, see GroupNumbers.quantity. Reports stored
+# before the schema version 3 were counted this way.
+SNAPSHOT_REPORT_SEMANTICS = 'snapshot'
+# GroupNumbers attributes stored for each group, in the order of the stored values.
+REPORT_FIELDS = ['start_date_count', 'start_date_group_weight', 'birth_count', 'birth_weight', 'purchase_count',
+                 'purchase_weight', 'gift_count', 'gift_weight', 'moved_in', 'weight_moved_in', 'moved_out',
+                 'weight_moved_out', 'death_count', 'death_weight', 'sold_count', 'sold_weight', 'consumed_count',
+                 'consumed_weight', 'gifted_count', 'gifted_weight', 'end_date_count', 'end_date_group_weight',
+                 'count_difference', 'weight_difference']
+
+
+def encode_report(start_date, end_date, groups, include_cattle_ids=False, semantics=BALANCED_REPORT_SEMANTICS):
+    """
+    Encodes the groups of a livestock movement report in the compact report schema.
+
+    The report is stored as a single JSON object with native numbers: the names of the stored fields and, for each
+    group, its name followed by the values of the fields. The cattle of each group are left out, except for their ids
+    when include_cattle_ids is set, see encode_cattle_ids().
+
+    :param start_date: The start date of the report.
+    :param end_date: The end date of the report.
+    :param groups: The GroupNumbers instances of the report.
+    :param include_cattle_ids: Whether to add the ids of the cattle in each group.
+    :param semantics: The counting rules of the numbers, BALANCED_REPORT_SEMANTICS or SNAPSHOT_REPORT_SEMANTICS.
+    :return: The report data dictionary.
+    """
+    report_data = {
+        'version': REPORT_SCHEMA_VERSION,
+        'semantics': semantics,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'fields': REPORT_FIELDS,
+        'groups': [[group.group_name, *(_number(getattr(group, field)) for field in REPORT_FIELDS)]
+                   for group in groups],
+    }
+    if include_cattle_ids:
+        report_data['cattle_ids'] = {group.group_name: encode_cattle_ids(_group_cattle_ids(group.group_data))
+                                     for group in groups}
+    return report_data
+
+
+def decode_report(report_data):
+    """
+    Decodes the groups of a stored livestock movement report.
+
+    Reports stored before the compact schema, as a JSON string of GroupNumbers.to_dict() dictionaries, are decoded as
+    well.
+
+    :param report_data: The report data of a CattleMovementReport.
+    :return: The list of GroupNumbers instances, without cattle data.
+    """
+    if isinstance(report_data, str):
+        report_data = json.loads(report_data)
+    if isinstance(report_data, list):
+        return [GroupNumbers.from_dict({**group, 'group_data': []}) for group in report_data]
+
+    groups = []
+    for group_name, *values in report_data['groups']:
+        group = GroupNumbers(group_name, [])
+        for field, value in zip(report_data['fields'], values):
+            setattr(group, field, value)
+        groups.append(group)
+    return groups
+
+
+def report_semantics(report_data):
+    """
+    Returns the counting rules of a stored livestock movement report.
+
+    :param report_data: The report data of a CattleMovementReport.
+    :return: BALANCED_REPORT_SEMANTICS or SNAPSHOT_REPORT_SEMANTICS.
+    """
+    if isinstance(report_data, dict):
+        return report_data.get('semantics', SNAPSHOT_REPORT_SEMANTICS)
+    return SNAPSHOT_REPORT_SEMANTICS
+
+
+def encode_cattle_ids(cattle_ids):
+    """
+    Compresses a list of cattle ids, as the zlib compressed differences between the sorted ids, in base64.
+
+    :param cattle_ids: The cattle ids.
+    :return: The compressed ids.
+    """
+    previous = 0
+    differences = array('q')
+    for cattle_id in sorted(cattle_ids):
+        differences.append(cattle_id - previous)
+        previous = cattle_id
+    return base64.b64encode(zlib.compress(differences.tobytes())).decode('ascii')
+
+
+def decode_cattle_ids(value):
+    """
+    Decompresses the cattle ids compressed by encode_cattle_ids().
+
+    :param value: The compressed ids.
+    :return: The sorted list of cattle ids.
+    """
+    differences = array('q')
+    differences.frombytes(zlib.decompress(base64.b64decode(value)))
+    cattle_ids = []
+    previous = 0
+    for difference in differences:
+        previous += difference
+        cattle_ids.append(previous)
+    return cattle_ids
+
+
+def diff_reports(report_id, other_report_id):
+    """
+    Compares the stored numbers of two livestock movement reports, e.g. this quarter and the previous one.
+
+    The numbers are read from the stored report data without recalculating either report. Saved reports never change,
+    so the comparison is cached by the report ids alone. Reports counted with different rules, see report_semantics(),
+    differ even for the same herd, so they are not compared.
+
+    :param report_id: The ID of the report to compare from.
+    :param other_report_id: The ID of the report to compare to.
+    :return: A dictionary describing both reports and, for each group, the value of every REPORT_FIELDS metric in
+        both reports and its change from the first to the second report. Groups missing from a report count as 0.
+    :raises CattleMovementReport.DoesNotExist: If either report does not exist.
+    :raises ValueError: If the reports were counted with different rules.
+    """
+    def calculate():
+        reports = CattleMovementReport.objects.in_bulk([report_id, other_report_id])
+        if report_id not in reports or other_report_id not in reports:
+            raise CattleMovementReport.DoesNotExist('The report does not exist.')
+        report, other_report = reports[report_id], reports[other_report_id]
+        if report_semantics(report.report_data) != report_semantics(other_report.report_data):
+            raise ValueError('The reports were counted with different rules and cannot be compared.')
+
+        groups = {group.group_name: group for group in report.groups}
+        other_groups = {group.group_name: group for group in other_report.groups}
+        group_names = list(groups) + [group_name for group_name in other_groups if group_name not in groups]
+
+        diff_groups = []
+        for group_name in group_names:
+            metrics = {}
+            for field in REPORT_FIELDS:
+                value = getattr(groups[group_name], field) if group_name in groups else 0
+                other_value = getattr(other_groups[group_name], field) if group_name in other_groups else 0
+                metrics[field] = {'report': value, 'other_report': other_value,
+                                  'delta': _number(round(other_value - value, 2))}
+            diff_groups.append({'group_name': group_name, 'metrics': metrics})
+
+        return {
+            'report': _report_summary(report),
+            'other_report': _report_summary(other_report),
+            'groups': diff_groups,
+        }
+
+    return result_cache.get_or_calculate('report_diff', [report_id, other_report_id], calculate, versioned=False)
+
+
+def save_movement_report(start_date, end_date, groups, include_cattle_ids=False,
+                         semantics=BALANCED_REPORT_SEMANTICS):
+    """
+    Saves the groups of a livestock movement report. Older reports are deleted by the prune_reports command, see
+    my_farm.retention.
+
+    :param start_date: The start date of the report.
+    :param end_date: The end date of the report.
+    :param groups: The GroupNumbers instances of the report.
+    :param include_cattle_ids: Whether to store the ids of the cattle in each group, see encode_report().
+    :param semantics: The counting rules of the numbers, see encode_report().
+    :return: The saved CattleMovementReport.
+    """
+    report_title = f'Cattle Movement Report ({start_date.isoformat()} - {end_date.isoformat()})'
+    report = CattleMovementReport.objects.create(
+        title=report_title, report_data=encode_report(start_date, end_date, groups, include_cattle_ids, semantics))
+    return report
+
+
+def _number(value):
+    """
+    Converts a report value to a native JSON number, whole numbers as integers and others rounded to two decimals.
+
+    :param value: The value.
+    :return: The number.
+    """
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else round(value, 2)
+    return value
+
+
+def _report_summary(report):
+    """
+    Describes a saved report for a report comparison.
+
+    :param report: The CattleMovementReport.
+    :return: A dictionary with the 'id', 'title', 'generated_date', the 'semantics' and, for the compact report
+        schema, the 'start_date' and 'end_date' of the report.
+    """
+    report_data = report.report_data if isinstance(report.report_data, dict) else {}
+    return {
+        'id': report.pk,
+        'title': report.title,
+        'generated_date': report.generated_date.isoformat(),
+        'semantics': report_semantics(report.report_data),
+        'start_date': report_data.get('start_date'),
+        'end_date': report_data.get('end_date'),
+    }
+
+
+def _group_cattle_ids(group_data):
+    """
+    Returns the ids of the cattle in the group data of a GroupNumbers instance.
+
+    :param group_data: A SnapshotGroup, or a list of {'cattle': ..., 'weight': ...} dictionaries.
+    :return: The list of cattle ids.
+    """
+    if isinstance(group_data, SnapshotGroup):
+        return group_data.cattle_ids()
+    return [item['cattle']['id'] for item in group_data]
+
+
+def enqueue_report_job(start_date, end_date):
+    """
+    Adds a livestock movement report to the queue of the report worker.
+
+    :param start_date: The start date of the report.
+    :param end_date: The end date of the report.
+    :return: The pending ReportJob.
+    """
+    return ReportJob.objects.create(start_date=start_date, end_date=end_date)
+
+
+def claim_report_job():
+    """
+    Claims the oldest pending job for this worker.
+
+    The job is claimed with a conditional update, so when several workers poll the queue only one of them gets it.
+
+    :return: The claimed ReportJob, or None when no job is pending.
+    """
+    while True:
+        job = ReportJob.objects.filter(status=ReportJob.PENDING).order_by('id').first()
+        if job is None:
+            return None
+
+        started_at = timezone.now()
+        claimed = ReportJob.objects.filter(pk=job.pk, status=ReportJob.PENDING).update(
+            status=ReportJob.RUNNING, started_at=started_at)
+        if claimed:
+            job.status = ReportJob.RUNNING
+            job.started_at = started_at
+            return job
+
+
+def run_report_job(job):
+    """
+    Calculates and saves the report of a claimed job, recording the error if it fails.
+
+    The job is a single unit of work for my_farm.memo, so nothing calculated for it is kept for the next job.
+
+    :param job: The ReportJob to run.
+    :return: The finished ReportJob.
+    """
+    try:
+        with memo_context():
+            groups = DailyRollup().calculate(job.start_date, job.end_date)
+        with transaction.atomic():
+            job.report = save_movement_report(job.start_date, job.end_date, groups)
+            job.status = ReportJob.DONE
+            job.finished_at = timezone.now()
+            job.save(update_fields=['report', 'status', 'finished_at'])
+    except Exception as error:
+        job.status = ReportJob.FAILED
+        job.error = f'{type(error).__name__}: {error}'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+    return job
+
+
+def process_report_jobs(poll_interval=REPORT_JOB_POLL_INTERVAL, once=False):
+    """
+    Runs the pending report jobs, polling the queue for new jobs when it is empty.
+
+    :param poll_interval: The number of seconds to wait before polling an empty queue again.
+    :param once: Whether to return once the queue is empty instead of polling it.
+    :return: The number of jobs run.
+    """
+    processed = 0
+    while True:
+        job = claim_report_job()
+        if job is not None:
+            run_report_job(job)
+            processed += 1
+        elif once:
+            return processed
+        else:
+            time.sleep(poll_interval)
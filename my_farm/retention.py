@@ -0,0 +1,106 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Min, Sum, TextField
+from django.db.models.functions import Cast, Coalesce, Length, TruncMonth
+from django.utils import timezone
+from .constants import MAX_REPORTS, REPORT_RETENTION_BATCH_SIZE
+from .models import CattleMovementReport
+
+
+class ReportRetention:
+    """
+    Deletes the saved livestock movement reports that no retention policy keeps.
+
+    A report is kept when it is one of the last keep_last reports, when it is newer than max_age_days or when it is
+    the first report of its month and keep_monthly is set. The other reports are deleted in batches by ranges of the
+    indexed generated_date, so pruning never needs to load the reports that are kept.
+    """
+
+    def __init__(self, keep_last=None, max_age_days=None, keep_monthly=None, batch_size=REPORT_RETENTION_BATCH_SIZE):
+        """
+        Initializes a ReportRetention instance. Policies that are not provided are read from the REPORT_RETENTION
+        setting.
+
+        :param keep_last: The number of most recent reports to keep, or 0 to keep none by count.
+        :param max_age_days: The age in days under which reports are kept, or None to keep none by age.
+        :param keep_monthly: Whether to keep the first report of each month.
+        :param batch_size: The number of reports deleted at once.
+        """
+        policies = getattr(settings, 'REPORT_RETENTION', {})
+        self.keep_last = keep_last if keep_last is not None else policies.get('KEEP_LAST', MAX_REPORTS)
+        self.max_age_days = max_age_days if max_age_days is not None else policies.get('MAX_AGE_DAYS')
+        self.keep_monthly = keep_monthly if keep_monthly is not None else policies.get('KEEP_MONTHLY', False)
+        self.batch_size = batch_size
+
+    def cutoff(self):
+        """
+        Finds the generated date before which no policy keeps reports by count or age.
+
+        :return: The cutoff datetime, or None when every report is kept.
+        """
+        cutoffs = []
+        if self.keep_last:
+            kept = CattleMovementReport.objects.order_by('-generated_date').values_list('generated_date', flat=True)
+            last_kept = list(kept[self.keep_last - 1:self.keep_last])
+            if not last_kept:
+                return None
+            cutoffs.append(last_kept[0])
+        if self.max_age_days is not None:
+            cutoffs.append(timezone.now() - timedelta(days=self.max_age_days))
+
+        if not cutoffs:
+            return None
+        return min(cutoffs)
+
+    def expired_reports(self):
+        """
+        Selects the reports that no retention policy keeps.
+
+        :return: The queryset of the expired reports.
+        """
+        cutoff = self.cutoff()
+        if cutoff is None:
+            return CattleMovementReport.objects.none()
+
+        expired = CattleMovementReport.objects.filter(generated_date__lt=cutoff)
+        if self.keep_monthly:
+            monthly_firsts = CattleMovementReport.objects.annotate(month=TruncMonth('generated_date')).values(
+                'month').annotate(first_id=Min('id')).values('first_id')
+            expired = expired.exclude(id__in=monthly_firsts)
+        return expired
+
+    def prune(self, dry_run=False):
+        """
+        Deletes the expired reports in batches of batch_size.
+
+        :param dry_run: Whether to only count the expired reports without deleting them.
+        :return: A dictionary with the number of 'reports' and the 'bytes' of title and report data reclaimed, see
+            size().
+        """
+        expired = self.expired_reports()
+        if dry_run:
+            return {'reports': expired.count(), 'bytes': self.size(expired)}
+
+        reclaimed = {'reports': 0, 'bytes': 0}
+        while True:
+            batch = list(expired.order_by('generated_date').values_list('generated_date', flat=True)[
+                         :self.batch_size])
+            if not batch:
+                return reclaimed
+
+            batch_reports = expired.filter(generated_date__range=(batch[0], batch[-1]))
+            reclaimed['bytes'] += self.size(batch_reports)
+            deleted, per_model = batch_reports.delete()
+            reclaimed['reports'] += per_model.get(CattleMovementReport._meta.label, 0)
+
+    @staticmethod
+    def size(reports):
+        """
+        Measures the stored size of the title and report data of the reports, counted in characters, which is their
+        size in bytes for the ASCII JSON of the report data.
+
+        :param reports: The queryset of reports.
+        :return: The size in bytes.
+        """
+        return reports.aggregate(size=Coalesce(Sum(Length('title') + Length(Cast('report_data', TextField()))), 0))[
+            'size']
@@ -0,0 +1,232 @@
+from collections import Counter
+from datetime import date, timedelta
+from django.db import transaction
+from django.db.models import Max, Min
+from .ages import AGE_GROUPS
+from .groups import GroupNumbers
+from .growth import growth_registry
+from .ledger import MovementLedger
+from .models import DailyGroupRollup, MovementEvent
+
+ROLLUP_BATCH_SIZE = 1000
+
+# GroupNumbers attributes stored as running totals in DailyGroupRollup.
+FLOW_FIELDS = ['birth_count', 'birth_weight', 'purchase_count', 'purchase_weight', 'gift_count', 'gift_weight',
+               'death_count', 'death_weight', 'sold_count', 'sold_weight', 'consumed_count', 'consumed_weight',
+               'gifted_count', 'gifted_weight', 'moved_in', 'moved_out']
+MOVED_WEIGHT_FIELDS = {'weight_moved_in': 'in', 'weight_moved_out': 'out'}
+
+
+class DailyRollup:
+    """
+    Maintains the DailyGroupRollup table from the movement ledger and answers movement reports from it.
+
+    A report needs the rows of its last day and of the day before its first day, so it takes the same time however
+    many cattle the farm has had. Reports fall back to the MovementLedger when the rollup does not cover the dates or
+    events were recorded since it was updated.
+    """
+
+    def __init__(self):
+        """
+        Initializes a DailyRollup instance.
+        """
+        self.ledger = MovementLedger()
+
+    def update(self, until=None):
+        """
+        Rolls up the days not rolled up yet and the days affected by events recorded since the last update.
+
+        An event changes the balance of its day and of every later day, so the rollup is recalculated from the earliest
+        day of the new events. Everything is recalculated when the growth models change.
+
+        :param until: The last day to roll up, today by default.
+        :return: The number of days rolled up.
+        """
+        until = until or date.today()
+        growth_version = growth_registry.version()
+        last_event_id = MovementEvent.objects.aggregate(last_event_id=Max('id'))['last_event_id'] or 0
+
+        first_day = self.first_dirty_day(growth_version)
+        if first_day is None or first_day > until:
+            return 0
+
+        rows = self.calculate_rows(first_day, until, last_event_id, growth_version)
+        with transaction.atomic():
+            DailyGroupRollup.objects.filter(date__gte=first_day).delete()
+            DailyGroupRollup.objects.bulk_create(rows, batch_size=ROLLUP_BATCH_SIZE)
+
+        return (until - first_day).days + 1
+
+    def first_dirty_day(self, growth_version):
+        """
+        Finds the first day the rollup has to be calculated from.
+
+        :param growth_version: The current version of the growth models.
+        :return: The first day, or None if the ledger is empty.
+        """
+        first_event_date = MovementEvent.objects.aggregate(first_date=Min('date'))['first_date']
+        if first_event_date is None:
+            return None
+
+        latest = DailyGroupRollup.objects.order_by('-date').first()
+        if latest is None or latest.growth_version != growth_version:
+            return first_event_date
+
+        rolled_up_event_id = DailyGroupRollup.objects.aggregate(last_event_id=Max('last_event_id'))['last_event_id']
+        edited_from = MovementEvent.objects.filter(id__gt=rolled_up_event_id).aggregate(
+            first_date=Min('date'))['first_date']
+
+        first_day = latest.date + timedelta(days=1)
+        if edited_from is not None:
+            first_day = min(first_day, edited_from)
+        return first_day
+
+    def calculate_rows(self, first_day, until, last_event_id, growth_version):
+        """
+        Calculates the rollup rows of every group for each day, continuing the running totals of the day before.
+
+        :param first_day: The first day to calculate.
+        :param until: The last day to calculate.
+        :param last_event_id: The id of the last event recorded before the calculation.
+        :param growth_version: The current version of the growth models.
+        :return: The list of unsaved DailyGroupRollup instances.
+        """
+        opening_date = first_day - timedelta(days=1)
+        totals = {group_name: dict.fromkeys(FLOW_FIELDS + list(MOVED_WEIGHT_FIELDS), 0) for group_name in AGE_GROUPS}
+        for row in DailyGroupRollup.objects.filter(date=opening_date):
+            totals[row.group_name] = {field: getattr(row, field) for field in totals[row.group_name]}
+
+        balance = self.ledger.balance(opening_date)
+        events = self.ledger.events(date__gt=opening_date, date__lte=until)
+
+        rows = []
+        position = 0
+        day = first_day
+        while day <= until:
+            groups = {group_name: GroupNumbers(group_name, []) for group_name in AGE_GROUPS}
+            moved_weights = Counter()
+            while position < len(events) and events[position][3].date <= day:
+                event_id, cattle_id, delta, event = events[position]
+                balance.apply(event_id, cattle_id, delta, event)
+                self.ledger.add_flows(groups, moved_weights, delta, event)
+                position += 1
+
+            for group_name, cattle_ids in balance.groups().items():
+                group_totals = totals[group_name]
+                for field in FLOW_FIELDS:
+                    group_totals[field] += getattr(groups[group_name], field)
+                for field, direction in MOVED_WEIGHT_FIELDS.items():
+                    group_totals[field] += moved_weights[(group_name, direction)]
+
+                total_weight = sum(self.ledger.weight(*balance.attributes[cattle_id][1:], day)
+                                   for cattle_id in cattle_ids)
+                rows.append(DailyGroupRollup(date=day, group_name=group_name, headcount=len(cattle_ids),
+                                             total_weight=round(total_weight, 2), last_event_id=last_event_id,
+                                             growth_version=growth_version, **group_totals))
+            day += timedelta(days=1)
+
+        return rows
+
+    def report_ranges(self, ranges):
+        """
+        Reads the movement numbers of consecutive date ranges from the rollup.
+
+        :param ranges: The (first day, last day) tuples of the ranges, each starting the day after the previous one.
+        :return: The list of periods, as dictionaries with 'start_date', 'end_date' and 'groups', or None if the
+            rollup cannot answer the report.
+        """
+        opening_date = ranges[0][0] - timedelta(days=1)
+        boundaries = [opening_date] + [last_day for first_day, last_day in ranges]
+        rows = {}
+        for row in DailyGroupRollup.objects.filter(date__in=boundaries):
+            rows[(row.date, row.group_name)] = row
+
+        end_date = ranges[-1][1]
+        closing_rows = [rows.get((end_date, group_name)) for group_name in AGE_GROUPS]
+        if None in closing_rows or any(row.growth_version != growth_registry.version() for row in closing_rows):
+            return None
+        if any(rows.get((boundary, group_name)) is None for boundary in boundaries[1:] for group_name in AGE_GROUPS):
+            return None
+        if MovementEvent.objects.filter(id__gt=closing_rows[0].last_event_id, date__lte=end_date).exists():
+            return None
+
+        periods = []
+        for first_day, last_day in ranges:
+            opening_day = first_day - timedelta(days=1)
+            groups = [self.group_numbers(group_name, rows.get((opening_day, group_name)),
+                                         rows[(last_day, group_name)])
+                      for group_name in AGE_GROUPS]
+            periods.append({'start_date': first_day, 'end_date': last_day, 'groups': groups})
+        return periods
+
+    def calculate(self, start_date, end_date):
+        """
+        Calculates the movement numbers of every group between the dates, see MovementLedger.calculate.
+
+        :param start_date: The first day of the report.
+        :param end_date: The last day of the report, inclusive.
+        :return: The list of GroupNumbers instances.
+        """
+        periods = self.report_ranges([(start_date, end_date)])
+        if periods is None:
+            return self.ledger.calculate(start_date, end_date)
+        return periods[0]['groups']
+
+    def calculate_periods(self, start_date, end_date, granularity):
+        """
+        Calculates the movement numbers of every group for each calendar period, see MovementLedger.calculate_periods.
+
+        :param start_date: The start date of the range.
+        :param end_date: The end date of the range.
+        :param granularity: The period length, one of 'month', 'quarter' or 'year'.
+        :return: A tuple of the periods and the list of GroupNumbers totals for the whole range.
+        :raises ValueError: If the granularity is unknown.
+        """
+        periods = self.report_ranges(self.ledger.period_ranges(start_date, end_date, granularity))
+        if periods is None:
+            return self.ledger.calculate_periods(start_date, end_date, granularity)
+
+        totals = [GroupNumbers.combine([period['groups'][index] for period in periods])
+                  for index in range(len(AGE_GROUPS))]
+        return periods, totals
+
+    def headcounts(self, on_date):
+        """
+        Reads the headcount of every group at the end of a day from the rollup.
+
+        :param on_date: The date.
+        :return: A dictionary mapping each group name to its headcount, or None if the rollup cannot answer.
+        """
+        rows = list(DailyGroupRollup.objects.filter(date=on_date))
+        if len(rows) != len(AGE_GROUPS):
+            return None
+        if MovementEvent.objects.filter(id__gt=rows[0].last_event_id, date__lte=on_date).exists():
+            return None
+        headcounts = {row.group_name: row.headcount for row in rows}
+        return {group_name: headcounts[group_name] for group_name in AGE_GROUPS}
+
+    @staticmethod
+    def group_numbers(group_name, opening_row, closing_row):
+        """
+        Builds the movement numbers of a group from the rollup rows around a date range.
+
+        :param group_name: The name of the group.
+        :param opening_row: The row of the day before the range, or None before the first rolled up day.
+        :param closing_row: The row of the last day of the range.
+        :return: The GroupNumbers instance.
+        """
+        group = GroupNumbers(group_name, [])
+        if opening_row is not None:
+            group.start_date_count = opening_row.headcount
+            group.start_date_group_weight = round(opening_row.total_weight)
+        group.end_date_count = closing_row.headcount
+        group.end_date_group_weight = round(closing_row.total_weight)
+        group.count_difference = group.end_date_count - group.start_date_count
+        group.weight_difference = group.end_date_group_weight - group.start_date_group_weight
+
+        for field in FLOW_FIELDS:
+            setattr(group, field, getattr(closing_row, field) - (getattr(opening_row, field) if opening_row else 0))
+        for field in MOVED_WEIGHT_FIELDS:
+            setattr(group, field, round(getattr(closing_row, field) - (getattr(opening_row, field) if opening_row
+                                                                           else 0)))
+        return group
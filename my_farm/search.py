@@ -0,0 +1,82 @@
+import re
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from .memo import memoize
+from .models import Cattle
+
+# The full-text index of the cattle, an external content FTS5 table kept in sync with my_farm_cattle by triggers.
+SEARCH_TABLE = 'my_farm_cattle_fts'
+# The indexed columns and their bm25 weights, so matches in the number or name rank first.
+SEARCH_COLUMNS = {
+    'number': 10.0,
+    'name': 5.0,
+    'breed': 1.0,
+    'gender': 1.0,
+    'acquisition_method': 1.0,
+    'loss_method': 1.0,
+    'comments': 0.5,
+}
+SEARCH_TERMS = re.compile(r'\w+')
+# Queries of digits and date separators only, e.g. dates, which are not in the index.
+DATE_QUERY = re.compile(r'^[\d\s./-]+$')
+
+
+def search_index_available():
+    """
+    Checks whether the database has the full-text index of the cattle. Only SQLite with the FTS5 extension has it.
+
+    :return: True when the index exists.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    return memoize('search_index_available', (), lambda: SEARCH_TABLE in connection.introspection.table_names())
+
+
+def match_expression(query):
+    """
+    Builds the FTS5 match expression of a search query. Every term must match, as a prefix of an indexed word.
+
+    :param query: The search query.
+    :return: The match expression, or None when the query has no terms or looks like a date.
+    """
+    if DATE_QUERY.match(query):
+        return None
+    terms = SEARCH_TERMS.findall(query)
+    if not terms:
+        return None
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def search_cattle(query):
+    """
+    Searches the cattle that are not deleted. On SQLite the full-text index is queried and the cattle are ordered by
+    relevance. Other databases, and queries without words, fall back to case-insensitive substring matching of every
+    column, and so do queries that look like a date. Ranked results are annotated with their 'rank', lower first.
+
+    :param query: The search query.
+    :return: The queryset of the found cattle.
+    """
+    cattle = Cattle.objects.filter(deleted=False)
+    expression = match_expression(query)
+    if expression is None or not search_index_available():
+        return cattle.filter(
+            Q(type__icontains=query) |
+            Q(number__icontains=query) |
+            Q(name__icontains=query) |
+            Q(gender__icontains=query) |
+            Q(breed__icontains=query) |
+            Q(birth_date__icontains=query) |
+            Q(acquisition_method__icontains=query) |
+            Q(entry_date__icontains=query) |
+            Q(loss_method__icontains=query) |
+            Q(end_date__icontains=query) |
+            Q(comments__icontains=query)
+        )
+
+    weights = ', '.join(str(weight) for weight in SEARCH_COLUMNS.values())
+    return cattle.extra(
+        tables=[SEARCH_TABLE],
+        where=[f'{SEARCH_TABLE}.rowid = {Cattle._meta.db_table}.id', f'{SEARCH_TABLE} MATCH %s'],
+        params=[expression],
+    ).annotate(rank=RawSQL(f'bm25({SEARCH_TABLE}, {weights})', (), output_field=FloatField())).order_by('rank', 'number')
@@ -0,0 +1,149 @@
+from django.db.models import Min
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from .cache import result_cache
+from .counters import COUNTED_CATTLE_FIELDS, FarmCounters
+from .ledger import record_cattle_events
+from .models import Cattle, Field, Herd, MovementEvent, MovementCheckpoint
+from .tags import tag_index
+
+
+@receiver(pre_save, sender=Cattle)
+def remember_previous_cattle(sender, instance, **kwargs):
+    """
+    Remembers the gender, herd and counted values stored before a cattle is saved, so their changes can be recorded
+    in the ledger and the herd counters.
+
+    :param sender: The Cattle model.
+    :param instance: The Cattle instance being saved.
+    """
+    previous = None
+    if instance.pk is not None:
+        previous = Cattle.objects.filter(pk=instance.pk).values(*COUNTED_CATTLE_FIELDS).first()
+    instance._ledger_previous = previous
+
+
+@receiver(post_save, sender=Cattle)
+def record_cattle_movement(sender, instance, **kwargs):
+    """
+    Records the movement events of a saved cattle, including soft deletes.
+
+    :param sender: The Cattle model.
+    :param instance: The saved Cattle instance.
+    """
+    if kwargs.get('raw'):
+        return
+    record_cattle_events(instance, getattr(instance, '_ledger_previous', None))
+
+
+@receiver(pre_delete, sender=Cattle)
+def invalidate_cattle_checkpoints(sender, instance, **kwargs):
+    """
+    Deletes the checkpoints affected by the events removed together with a deleted cattle.
+
+    :param sender: The Cattle model.
+    :param instance: The Cattle instance being deleted.
+    """
+    first_date = MovementEvent.objects.filter(cattle_id=instance.pk).aggregate(first_date=Min('date'))['first_date']
+    if first_date is not None:
+        MovementCheckpoint.objects.filter(date__gte=first_date).delete()
+
+
+@receiver(post_save, sender=Cattle)
+@receiver(post_delete, sender=Cattle)
+@receiver(post_save, sender=Herd)
+@receiver(post_delete, sender=Herd)
+@receiver(post_save, sender=Field)
+@receiver(post_delete, sender=Field)
+def bump_farm_data_version(sender, instance, **kwargs):
+    """
+    Changes the farm data version after cattle, herds or fields change, including the soft delete of cattle, so
+    cached groups, reports and the dashboard are recalculated. The previous and new versions are kept on the instance
+    for the ear tag index.
+
+    :param sender: The Cattle, Herd or Field model.
+    :param instance: The saved or deleted instance.
+    """
+    instance._data_versions = result_cache.bump_version()
+
+
+@receiver(post_save, sender=Cattle)
+def refresh_tag_index(sender, instance, **kwargs):
+    """
+    Refreshes the ear tag index entry of a saved cattle, after the farm data version changed.
+
+    :param sender: The Cattle model.
+    :param instance: The saved Cattle instance.
+    """
+    tag_index.refresh_cattle(instance, getattr(instance, '_data_versions', (None, None)))
+
+
+@receiver(post_delete, sender=Cattle)
+def remove_from_tag_index(sender, instance, **kwargs):
+    """
+    Removes a deleted cattle from the ear tag index, after the farm data version changed.
+
+    :param sender: The Cattle model.
+    :param instance: The deleted Cattle instance.
+    """
+    tag_index.remove_cattle(instance.pk, getattr(instance, '_data_versions', (None, None)))
+
+
+@receiver(post_save, sender=Cattle)
+@receiver(post_delete, sender=Cattle)
+def update_cattle_counters(sender, instance, **kwargs):
+    """
+    Moves the contribution of a cattle out of the counters of the herd it left and into the herd it is in, and their
+    fields.
+
+    :param sender: The Cattle model.
+    :param instance: The saved or deleted Cattle instance.
+    """
+    if kwargs.get('raw'):
+        return
+    values = {field: getattr(instance, field) for field in COUNTED_CATTLE_FIELDS}
+    if kwargs['signal'] is post_delete:
+        FarmCounters().update_cattle(values, None)
+    else:
+        FarmCounters().update_cattle(getattr(instance, '_ledger_previous', None), values)
+
+
+@receiver(pre_save, sender=Herd)
+def remember_previous_field(sender, instance, **kwargs):
+    """
+    Remembers the field of a herd before it is saved, so the counters of the field it leaves are recounted.
+
+    :param sender: The Herd model.
+    :param instance: The Herd instance being saved.
+    """
+    previous_field_id = None
+    if instance.pk is not None:
+        previous_field_id = Herd.objects.filter(pk=instance.pk).values_list('field_id', flat=True).first()
+    instance._previous_field_id = previous_field_id
+
+
+@receiver(post_save, sender=Herd)
+def recount_herd_fields(sender, instance, created, **kwargs):
+    """
+    Recounts the counters of the fields of a herd created or moved to another field.
+
+    :param sender: The Herd model.
+    :param instance: The saved Herd instance.
+    :param created: Whether the herd was created.
+    """
+    if kwargs.get('raw'):
+        return
+    previous_field_id = getattr(instance, '_previous_field_id', None)
+    if created or previous_field_id != instance.field_id:
+        FarmCounters().recount(field_ids=[previous_field_id, instance.field_id])
+
+
+@receiver(post_delete, sender=Herd)
+def recount_deleted_herd_field(sender, instance, **kwargs):
+    """
+    Recounts the counters of the field of a deleted herd.
+
+    :param sender: The Herd model.
+    :param instance: The deleted Herd instance.
+    """
+    FarmCounters().recount(field_ids=[instance.field_id])
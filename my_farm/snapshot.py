@@ -0,0 +1,285 @@
+from array import array
+from .ages import MISSING_DATE_ORDINAL, date_ordinal, ordinal_date, classify_ordinals
+from .growth import growth_registry
+from .models import Cattle
+
+SNAPSHOT_FIELDS = ['id', 'gender', 'breed', 'birth_date', 'acquisition_method', 'entry_date', 'loss_method',
+                   'end_date']
+SNAPSHOT_CHUNK_SIZE = 2000
+
+# Code stored for a missing or unknown choice.
+MISSING_CODE = -1
+
+
+class HerdSnapshot:
+    """
+    A compact copy of the cattle columns used by the group calculations, stored as parallel typed arrays.
+
+    Dates are stored as day ordinals (MISSING_DATE_ORDINAL when missing) and choices as small integer codes into
+    GENDERS, BREEDS, ACQUISITION_METHODS and LOSS_METHODS (MISSING_CODE when missing), so a snapshot takes around
+    24 bytes per cattle. Values outside the model choices get the next free code of the snapshot.
+    """
+
+    GENDERS = [value for value, label in Cattle.GENDER]
+    BREEDS = [value for value, label in Cattle.BREED]
+    ACQUISITION_METHODS = [value for value, label in Cattle.ACQUISITION_METHOD]
+    LOSS_METHODS = [value for value, label in Cattle.LOSS_METHOD]
+
+    def __init__(self):
+        """
+        Initializes an empty HerdSnapshot instance.
+        """
+        self.ids = array('q')
+        self.genders = array('b')
+        self.breeds = array('b')
+        self.birth_ordinals = array('i')
+        self.acquisition_methods = array('b')
+        self.entry_ordinals = array('i')
+        self.loss_methods = array('b')
+        self.end_ordinals = array('i')
+        self.GENDERS = list(self.GENDERS)
+        self.BREEDS = list(self.BREEDS)
+        self.ACQUISITION_METHODS = list(self.ACQUISITION_METHODS)
+        self.LOSS_METHODS = list(self.LOSS_METHODS)
+        self._gender_codes = {value: code for code, value in enumerate(self.GENDERS)}
+        self._breed_codes = {value: code for code, value in enumerate(self.BREEDS)}
+        self._acquisition_codes = {value: code for code, value in enumerate(self.ACQUISITION_METHODS)}
+        self._loss_codes = {value: code for code, value in enumerate(self.LOSS_METHODS)}
+        self._growth_tables = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, queryset=None):
+        """
+        Loads the snapshot with a single query, streaming the rows in chunks.
+
+        :param queryset: The cattle queryset to load, by default all cattle that are not deleted.
+        :return: The HerdSnapshot instance.
+        """
+        if queryset is None:
+            queryset = Cattle.objects.filter(deleted=False)
+
+        snapshot = cls()
+        for row in queryset.values_list(*SNAPSHOT_FIELDS).iterator(chunk_size=SNAPSHOT_CHUNK_SIZE):
+            snapshot.append(*row)
+        return snapshot
+
+    @classmethod
+    def from_cattle_list(cls, cattle_list):
+        """
+        Builds the snapshot from cattle dictionaries, e.g. the result of Cattle.objects.values().
+
+        :param cattle_list: The cattle dictionaries.
+        :return: The HerdSnapshot instance.
+        """
+        snapshot = cls()
+        for cattle in cattle_list:
+            snapshot.append(*(cattle.get(field) for field in SNAPSHOT_FIELDS))
+        return snapshot
+
+    def append(self, cattle_id, gender, breed, birth_date, acquisition_method, entry_date, loss_method, end_date):
+        """
+        Appends a cattle to the snapshot.
+        """
+        self.ids.append(cattle_id)
+        self.genders.append(self._code(self.GENDERS, self._gender_codes, gender))
+        self.breeds.append(self._code(self.BREEDS, self._breed_codes, breed))
+        self.birth_ordinals.append(date_ordinal(birth_date))
+        self.acquisition_methods.append(self._code(self.ACQUISITION_METHODS, self._acquisition_codes,
+                                                   acquisition_method))
+        self.entry_ordinals.append(date_ordinal(entry_date))
+        self.loss_methods.append(self._code(self.LOSS_METHODS, self._loss_codes, loss_method))
+        self.end_ordinals.append(date_ordinal(end_date))
+
+    @property
+    def nbytes(self):
+        """
+        Returns the memory used by the snapshot columns.
+
+        :return: The size of the columns in bytes.
+        """
+        columns = [self.ids, self.genders, self.breeds, self.birth_ordinals, self.acquisition_methods,
+                   self.entry_ordinals, self.loss_methods, self.end_ordinals]
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def cattle(self, index):
+        """
+        Builds the dictionary of a single cattle, with the keys of Cattle.objects.values() stored in the snapshot.
+
+        :param index: The index of the cattle in the snapshot.
+        :return: The cattle dictionary.
+        """
+        return {
+            'id': self.ids[index],
+            'gender': self._choice(self.GENDERS, self.genders[index]),
+            'breed': self._choice(self.BREEDS, self.breeds[index]),
+            'birth_date': ordinal_date(self.birth_ordinals[index]),
+            'acquisition_method': self._choice(self.ACQUISITION_METHODS, self.acquisition_methods[index]),
+            'entry_date': ordinal_date(self.entry_ordinals[index]),
+            'loss_method': self._choice(self.LOSS_METHODS, self.loss_methods[index]),
+            'end_date': ordinal_date(self.end_ordinals[index]),
+        }
+
+    def classify(self, estimation_date):
+        """
+        Sorts the cattle into the age groups in a single pass, see my_farm.ages.classify_ordinals.
+
+        :param estimation_date: The estimation date for the classification.
+        :return: A dictionary mapping each group name to an array of indexes into the snapshot.
+        """
+        gender_keys = tuple(self._gender_codes[gender] for gender in ['Cow', 'Heifer', 'Bull'])
+        groups = classify_ordinals(self.genders, self.birth_ordinals, self.entry_ordinals, estimation_date,
+                                   gender_keys)
+        return {group_name: array('i', indexes) for group_name, indexes in groups.items()}
+
+    def estimate_weights(self, indexes, estimation_ordinals):
+        """
+        Estimates the weights of the selected cattle from the growth table of their breed and gender.
+
+        Weights are rounded to two decimals, like in GroupsManagement.calculate_groups, and stored as float32.
+
+        :param indexes: The indexes of the cattle in the snapshot.
+        :param estimation_ordinals: A single estimation date ordinal, or one ordinal per selected cattle.
+        :return: An array with the estimated weight of each selected cattle.
+        :raises ValueError: If any selected cattle has no valid gender.
+        """
+        if isinstance(estimation_ordinals, int):
+            estimation_ordinals = [estimation_ordinals] * len(indexes)
+
+        weights = array('f')
+        for index, estimation_ordinal in zip(indexes, estimation_ordinals):
+            table = self._growth_table(self.breeds[index], self.genders[index])
+            age_days = estimation_ordinal - self.birth_ordinals[index]
+            weights.append(round(table.weights[min(max(age_days, 0), table.last_age)], 2))
+        return weights
+
+    def groups(self, estimation_date):
+        """
+        Classifies the cattle and estimates their weights on the estimation date.
+
+        :param estimation_date: The estimation date for the calculation.
+        :return: A dictionary mapping each group name to its SnapshotGroup.
+        """
+        estimation_ordinal = estimation_date.toordinal()
+        return {group_name: SnapshotGroup(self, indexes, self.estimate_weights(indexes, estimation_ordinal))
+                for group_name, indexes in self.classify(estimation_date).items()}
+
+    def _growth_table(self, breed_code, gender_code):
+        """
+        Looks up the growth table of a breed and gender code.
+
+        :param breed_code: The breed code.
+        :param gender_code: The gender code.
+        :return: The GrowthTable.
+        :raises ValueError: If the gender code is not valid.
+        """
+        key = (breed_code, gender_code)
+        if key not in self._growth_tables:
+            self._growth_tables[key] = growth_registry.table(self._choice(self.GENDERS, gender_code),
+                                                             self._choice(self.BREEDS, breed_code))
+        return self._growth_tables[key]
+
+    @staticmethod
+    def _code(values, codes, value):
+        """
+        Converts a choice value to its code, adding values that are not known yet.
+
+        :param values: The values of the choice.
+        :param codes: The codes of the choice values.
+        :param value: The choice value.
+        :return: The choice code, or MISSING_CODE for None.
+        """
+        if value is None:
+            return MISSING_CODE
+        if value not in codes:
+            codes[value] = len(values)
+            values.append(value)
+        return codes[value]
+
+    @staticmethod
+    def _choice(values, code):
+        """
+        Converts a choice code back to its value.
+
+        :param values: The values of the choice.
+        :param code: The choice code.
+        :return: The choice value, or None for MISSING_CODE.
+        """
+        return values[code] if code != MISSING_CODE else None
+
+
+class SnapshotGroup:
+    """
+    A group of cattle in a HerdSnapshot, stored as the indexes of its cattle and their weights.
+
+    Iterating the group yields {'cattle': ..., 'weight': ...} dictionaries like the groups of
+    GroupsManagement.calculate_groups, built on demand from the snapshot columns.
+    """
+
+    def __init__(self, snapshot, indexes, weights):
+        """
+        Initializes a SnapshotGroup instance.
+
+        :param snapshot: The HerdSnapshot the group belongs to.
+        :param indexes: The indexes of the cattle in the snapshot.
+        :param weights: The estimated weight of each cattle, in the order of indexes.
+        """
+        self.snapshot = snapshot
+        self.indexes = indexes
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, position):
+        return {'cattle': self.snapshot.cattle(self.indexes[position]), 'weight': round(self.weights[position], 2)}
+
+    def __iter__(self):
+        for position in range(len(self.indexes)):
+            yield self[position]
+
+    @classmethod
+    def from_group_data(cls, group_data):
+        """
+        Returns the group data as a SnapshotGroup, converting lists of {'cattle': ..., 'weight': ...} dictionaries.
+
+        :param group_data: A SnapshotGroup, or a group of GroupsManagement.calculate_groups.
+        :return: The SnapshotGroup instance.
+        """
+        if isinstance(group_data, cls):
+            return group_data
+
+        snapshot = HerdSnapshot.from_cattle_list(item['cattle'] for item in group_data)
+        return cls(snapshot, array('i', range(len(snapshot))), array('f', (item['weight'] for item in group_data)))
+
+    def cattle_ids(self):
+        """
+        Returns the ids of the cattle in the group, in the order of the group.
+
+        :return: The list of cattle ids.
+        """
+        ids = self.snapshot.ids
+        return [ids[index] for index in self.indexes]
+
+    def active_positions(self, on_date=None):
+        """
+        Finds the cattle of the group that have not left the farm before the provided date.
+
+        :param on_date: The date, or None for cattle without an end date.
+        :return: The list of positions of the active cattle in the group.
+        """
+        end_ordinals = self.snapshot.end_ordinals
+        active_from = on_date.toordinal() if on_date is not None else MISSING_DATE_ORDINAL
+        return [position for position, index in enumerate(self.indexes) if end_ordinals[index] >= active_from]
+
+    def total_weight(self, positions):
+        """
+        Sums the weights of the cattle at the provided positions.
+
+        :param positions: The positions of the cattle in the group.
+        :return: The total weight.
+        """
+        weights = self.weights
+        return sum(round(weights[position], 2) for position in positions)
@@ -0,0 +1,223 @@
+import threading
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from datetime import date
+from .ages import age_group
+from .cache import result_cache
+from .constants import TAG_MATCH_LIMIT, TAG_SIMILARITY
+from .models import Cattle, Herd
+
+TagEntry = namedtuple('TagEntry', ['id', 'number', 'herd_id', 'gender', 'birth_date', 'end_date'])
+
+
+def normalize_tag(tag):
+    """
+    Normalizes a scanned or typed ear tag for matching, ignoring case and surrounding spaces.
+
+    :param tag: The ear tag.
+    :return: The normalized tag.
+    """
+    return str(tag).strip().upper()
+
+
+def tag_trigrams(tag):
+    """
+    Splits a normalized ear tag into its trigrams, padded so the first and last characters count as much as the
+    others.
+
+    :param tag: The normalized tag.
+    :return: The set of trigrams.
+    """
+    padded = f'  {tag} '
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class TagIndex:
+    """
+    Resolves cattle ear tags in memory by exact, prefix and typo-tolerant trigram matching.
+
+    The index holds the numbers of the cattle that are not deleted. Saved and deleted cattle are refreshed one by one
+    through signals, and the index stays current only when it was current right before the write changed the farm
+    data version. Changes that bypass signals, like bulk updates, or that happen in other processes change the shared
+    farm data version, and the index is reloaded on the next lookup.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty TagIndex instance, loaded on the first lookup.
+        """
+        self.version = None
+        self.entries = {}
+        self.cattle_tags = {}
+        self.sorted_tags = []
+        self.trigrams = {}
+        self.herds = {}
+        self.lock = threading.RLock()
+
+    @property
+    def loaded(self):
+        return self.version is not None
+
+    def is_current(self):
+        """
+        Checks whether the index was loaded for the current farm data version.
+
+        :return: True when the index is current.
+        """
+        return self.loaded and self.version == result_cache.data_version()
+
+    def ensure_current(self):
+        """
+        Reloads the index when the farm data changed since it was loaded.
+        """
+        if not self.is_current():
+            self.load()
+
+    def load(self):
+        """
+        Loads the numbers of every cattle that is not deleted and the names of the herds.
+        """
+        with self.lock:
+            version = result_cache.data_version()
+            entries = {}
+            cattle_tags = {}
+            trigrams = {}
+            for values in Cattle.objects.filter(deleted=False).order_by().values_list(*TagEntry._fields):
+                entry = TagEntry(*values)
+                tag = normalize_tag(entry.number)
+                entries.setdefault(tag, []).append(entry)
+                cattle_tags[entry.id] = tag
+                for trigram in tag_trigrams(tag):
+                    trigrams.setdefault(trigram, set()).add(tag)
+
+            self.entries = entries
+            self.cattle_tags = cattle_tags
+            self.sorted_tags = sorted(entries)
+            self.trigrams = trigrams
+            self.herds = dict(Herd.objects.values_list('id', 'name'))
+            self.version = version
+
+    def refresh_cattle(self, cattle, versions=(None, None)):
+        """
+        Updates the entry of a saved cattle.
+
+        :param cattle: The saved Cattle instance.
+        :param versions: The previous and new farm data versions of the save, see ResultCache.bump_version(). The
+            index stays current when it was loaded for the previous version.
+        """
+        if not self.loaded:
+            return
+        with self.lock:
+            self._remove(cattle.pk)
+            if not cattle.deleted:
+                self._add(TagEntry(*(getattr(cattle, field) for field in TagEntry._fields)))
+            self._follow(versions)
+
+    def remove_cattle(self, cattle_id, versions=(None, None)):
+        """
+        Removes the entry of a deleted cattle.
+
+        :param cattle_id: The id of the deleted cattle.
+        :param versions: The previous and new farm data versions of the delete, see refresh_cattle().
+        """
+        if not self.loaded:
+            return
+        with self.lock:
+            self._remove(cattle_id)
+            self._follow(versions)
+
+    def _follow(self, versions):
+        previous, version = versions
+        if previous is not None and self.version == previous:
+            self.version = version
+
+    def _add(self, entry):
+        tag = normalize_tag(entry.number)
+        if tag not in self.entries:
+            self.entries[tag] = []
+            self.sorted_tags.insert(bisect_left(self.sorted_tags, tag), tag)
+            for trigram in tag_trigrams(tag):
+                self.trigrams.setdefault(trigram, set()).add(tag)
+        self.entries[tag].append(entry)
+        self.cattle_tags[entry.id] = tag
+
+    def _remove(self, cattle_id):
+        tag = self.cattle_tags.pop(cattle_id, None)
+        if tag is None:
+            return
+
+        entries = [entry for entry in self.entries[tag] if entry.id != cattle_id]
+        if entries:
+            self.entries[tag] = entries
+            return
+
+        del self.entries[tag]
+        del self.sorted_tags[bisect_left(self.sorted_tags, tag)]
+        for trigram in tag_trigrams(tag):
+            self.trigrams[trigram].discard(tag)
+
+    def lookup(self, tag, limit=TAG_MATCH_LIMIT):
+        """
+        Finds the cattle of an ear tag. An exact match is preferred, then the tags starting with it, then the tags
+        with at least TAG_SIMILARITY of their trigrams in common, most similar first.
+
+        :param tag: The scanned or typed ear tag.
+        :param limit: The maximum number of prefix or similar tags.
+        :return: A tuple of the match kind, 'exact', 'prefix', 'similar' or None, and the list of TagEntry.
+        """
+        tag = normalize_tag(tag)
+        if not tag:
+            return None, []
+        if tag in self.entries:
+            return 'exact', list(self.entries[tag])
+
+        prefixed = []
+        for index in range(bisect_left(self.sorted_tags, tag), len(self.sorted_tags)):
+            if not self.sorted_tags[index].startswith(tag) or len(prefixed) == limit:
+                break
+            prefixed.append(self.sorted_tags[index])
+        if prefixed:
+            return 'prefix', [entry for found in prefixed for entry in self.entries[found]]
+
+        trigrams = tag_trigrams(tag)
+        shared = Counter(found for trigram in trigrams for found in self.trigrams.get(trigram, ()))
+        similar = []
+        for found, count in shared.items():
+            similarity = count / (len(trigrams) + len(tag_trigrams(found)) - count)
+            if similarity >= TAG_SIMILARITY:
+                similar.append((-similarity, found))
+        similar.sort()
+        if similar:
+            return 'similar', [entry for score, found in similar[:limit] for entry in self.entries[found]]
+        return None, []
+
+    def resolve(self, tags, on_date=None):
+        """
+        Resolves a batch of scanned ear tags to the cattle ids, herds and age classes.
+
+        :param tags: The list of ear tags.
+        :param on_date: The date of the age classes, today by default.
+        :return: The list of result dictionaries with the 'tag', the 'match' kind and the matching 'cattle'.
+        """
+        on_date = on_date or date.today()
+        self.ensure_current()
+        with self.lock:
+            results = []
+            for tag in tags:
+                match, entries = self.lookup(tag)
+                results.append({
+                    'tag': tag,
+                    'match': match,
+                    'cattle': [{
+                        'id': entry.id,
+                        'number': entry.number,
+                        'herd_id': entry.herd_id,
+                        'herd': self.herds.get(entry.herd_id),
+                        'age_class': age_group(entry.gender, entry.birth_date, on_date),
+                        'active': entry.end_date is None,
+                    } for entry in entries],
+                })
+        return results
+
+
+tag_index = TagIndex()
@@ -0,0 +1,106 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.aggregates import active_on, group_cattle, group_totals
+from my_farm.constants import GROWTH_PHASE_TOLERANCE
+from my_farm.groups import GroupNumbers, GroupsManagement
+from my_farm.models import Cattle
+from my_farm.snapshot import HerdSnapshot
+from my_farm.tests.test_ledger import create_herd
+
+DATES = [date(2021, 3, 1), date(2021, 12, 31), date(2022, 2, 28), date(2022, 6, 15), date(2023, 1, 1),
+         date(2024, 2, 29), date(2030, 1, 1)]
+
+
+class GroupTotalsTestCase(TestCase):
+    def setUp(self):
+        create_herd(40)
+        Cattle.objects.create(number='LT100', gender='Cow', breed='Angus', birth_date=None,
+                              acquisition_method='Purchase', entry_date=date(2021, 3, 1), comments='')
+        Cattle.objects.create(number='LT101', gender='Bull', breed='Angus', birth_date=date(2021, 6, 1),
+                              acquisition_method='Purchase', entry_date=None, comments='')
+
+    def expected_totals(self, on_date):
+        groups = GroupsManagement().calculate_snapshot_groups(on_date, HerdSnapshot.load())
+        totals = {}
+        for group_name, group in groups.items():
+            positions = group.active_positions(on_date)
+            totals[group_name] = {'count': len(positions), 'weight': group.total_weight(positions)}
+        return totals
+
+    def assert_totals_match(self, on_date):
+        with self.assertNumQueries(1):
+            totals = group_totals(on_date, Cattle.objects.filter(active_on(on_date)))
+        expected = self.expected_totals(on_date)
+        self.assertEqual(list(totals), list(expected))
+        for group_name, group in totals.items():
+            self.assertEqual(group['count'], expected[group_name]['count'], (on_date, group_name))
+            self.assertAlmostEqual(group['weight'], expected[group_name]['weight'], 2, (on_date, group_name))
+
+    def test_totals_match_the_python_engine(self):
+        for on_date in DATES:
+            self.assert_totals_match(on_date)
+
+    def test_totals_use_the_growth_curve_of_the_breed(self):
+        Cattle.objects.filter(number__in=['LT1', 'LT4']).update(breed='Crossbreed')
+        for on_date in DATES:
+            self.assert_totals_match(on_date)
+
+    def test_smooth_curve_totals_are_within_the_phase_tolerance(self):
+        Cattle.objects.filter(number__in=['LT0', 'LT2', 'LT5']).update(breed='Crossbreed')
+        for on_date in DATES:
+            totals = group_totals(on_date, Cattle.objects.filter(active_on(on_date)))
+            for group_name, expected in self.expected_totals(on_date).items():
+                self.assertEqual(totals[group_name]['count'], expected['count'])
+                self.assertAlmostEqual(totals[group_name]['weight'], expected['weight'],
+                                       delta=3 * GROWTH_PHASE_TOLERANCE)
+
+    def test_deleted_cattle_are_left_out(self):
+        before = group_totals(date(2023, 1, 1))['Cows']['count']
+        Cattle.objects.filter(gender='Cow').first().delete()
+        self.assertEqual(group_totals(date(2023, 1, 1))['Cows']['count'], before - 1)
+
+    def test_quantity_from_totals_matches_quantity(self):
+        start_date, end_date = date(2021, 12, 31), date(2022, 6, 15)
+        snapshot = HerdSnapshot.load()
+        start_groups = GroupsManagement().calculate_snapshot_groups(start_date, snapshot)
+        end_groups = GroupsManagement().calculate_snapshot_groups(end_date, snapshot)
+        start_totals = group_totals(start_date, Cattle.objects.filter(active_on(start_date)))
+        end_totals = group_totals(end_date, Cattle.objects.filter(active_on(end_date)))
+
+        for group_name, group_data in end_groups.items():
+            expected = GroupNumbers(group_name, group_data)
+            expected.quantity(start_groups, end_groups, start_date, end_date)
+            group = GroupNumbers(group_name, group_data)
+            group.quantity_from_totals(start_totals[group_name], end_totals[group_name])
+            for attribute in ['start_date_count', 'end_date_count', 'count_difference', 'start_date_group_weight',
+                              'end_date_group_weight', 'weight_difference']:
+                self.assertEqual(getattr(group, attribute), getattr(expected, attribute), (group_name, attribute))
+
+
+class GroupCattleTestCase(TestCase):
+    def setUp(self):
+        create_herd(40)
+
+    def test_selects_the_cattle_and_weights_of_the_python_engine(self):
+        on_date = date(2022, 2, 28)
+        groups = GroupsManagement()._calculate_groups(on_date)
+        for group_name, group_data in groups.items():
+            cattle_list = group_cattle(group_name, on_date).order_by('number')
+            expected = sorted(group_data, key=lambda item: item['cattle']['number'])
+            self.assertEqual([cattle.number for cattle in cattle_list], [item['cattle']['number'] for item in expected])
+            for cattle, item in zip(cattle_list, expected):
+                self.assertAlmostEqual(cattle.weight, item['weight'], 2)
+
+    def test_group_data_view_lists_the_group(self):
+        user = User.objects.create_user('farmer', password='password')
+        self.client.force_login(user)
+        response = self.client.get(reverse('my_farm:group_data', args=['cows']))
+        self.assertEqual(response.context['selected_group'], 'Cows')
+        group = response.context['groups'][0]
+        self.assertEqual([item['cattle']['number'] for item in group.group_data],
+                         list(Cattle.objects.filter(gender='Cow', entry_date__lte=date.today()).order_by(
+                             'number').values_list('number', flat=True)))
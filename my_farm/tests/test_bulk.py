@@ -0,0 +1,73 @@
+from datetime import date
+
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.bulk import move_to_herd, record_loss, select_cattle, soft_delete
+from my_farm.cache import result_cache
+from my_farm.ledger import MovementLedger
+from my_farm.models import Cattle, Herd, MovementEvent
+
+
+class BulkCattleTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        self.north = Herd.objects.create(name='North', location='Farm')
+        self.south = Herd.objects.create(name='South', location='Farm')
+        self.cattle = [Cattle.objects.create(number=f'LT{index}', gender='Cow', breed='Angus',
+                                             birth_date=date(2019, 1, 1), acquisition_method='Purchase',
+                                             entry_date=date(2021, 1, 1), herd=self.north, comments='')
+                       for index in range(6)]
+        self.ids = [cattle.pk for cattle in self.cattle]
+
+    def test_move_to_herd_records_herd_changes(self):
+        version = result_cache.data_version()
+        # The selected ids, the update, the reload, the recorded events, the event insert, the checkpoint delete and
+        # the herd recount with its cattle, update and fields, in three savepoints, and the data version update
+        with self.assertNumQueries(6 + 3 + 3 * 2 + 2):
+            moved = move_to_herd(select_cattle(self.ids[:4]), self.south)
+        self.assertEqual(moved, 4)
+        self.assertEqual(Cattle.objects.filter(herd=self.south).count(), 4)
+        self.assertNotEqual(result_cache.data_version(), version)
+        self.assertEqual(MovementEvent.objects.filter(event_type=MovementEvent.HERD_CHANGED, herd=self.south).count(),
+                         4)
+        self.assertEqual(move_to_herd(select_cattle(self.ids[:4]), self.south), 0)
+
+    def test_record_loss(self):
+        self.assertEqual(record_loss(select_cattle(filters={'herd': self.north.pk}), 'Sold', date(2023, 5, 1)), 6)
+        groups = MovementLedger().calculate(date(2023, 1, 1), date(2023, 12, 31))
+        self.assertEqual(sum(group.sold_count for group in groups), 6)
+        self.assertEqual(sum(group.end_date_count for group in groups), 0)
+        with self.assertRaises(ValueError):
+            record_loss(select_cattle(self.ids), 'Stolen', date(2023, 5, 1))
+
+    def test_soft_delete(self):
+        self.assertEqual(soft_delete(select_cattle(self.ids[:2])), 2)
+        self.assertEqual(Cattle.objects.filter(deleted=True).count(), 2)
+        groups = MovementLedger().calculate(date(2022, 1, 1), date(2022, 12, 31))
+        self.assertEqual(sum(group.end_date_count for group in groups), 4)
+        self.assertEqual(select_cattle(self.ids).count(), 4)
+
+    def test_select_cattle_requires_ids_or_filters(self):
+        with self.assertRaises(ValueError):
+            select_cattle()
+        with self.assertRaises(ValueError):
+            select_cattle(filters={'name': 'Bella'})
+
+    def test_bulk_endpoint(self):
+        url = reverse('my_farm:bulk_cattle')
+        response = self.client.post(url, {'action': 'move_herd', 'cattle_ids': self.ids[:3],
+                                          'herd_id': self.south.pk})
+        self.assertEqual(response.json(), {'action': 'move_herd', 'updated': 3})
+
+        response = self.client.post(url, {'action': 'record_loss', 'herd': self.south.pk, 'loss_method': 'Sold',
+                                          'end_date': '2023-05-01'})
+        self.assertEqual(response.json()['updated'], 3)
+
+        response = self.client.post(url, {'action': 'delete', 'active': '1'})
+        self.assertEqual(response.json()['updated'], 3)
+
+        self.assertEqual(self.client.post(url, {'action': 'record_loss', 'cattle_ids': self.ids,
+                                                'loss_method': 'Sold'}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'action': 'delete'}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 405)
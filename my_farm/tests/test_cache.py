@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+from datetime import date
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.cache import LRUFileBasedCache, result_cache
+from my_farm.groups import GroupsManagement
+from my_farm.models import Cattle, FarmDataVersion, Herd
+
+
+class ResultCacheTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        self.cattle = Cattle.objects.create(number='LT1', gender='Cow', breed='Angus', birth_date=date(2020, 1, 1),
+                                            acquisition_method='Purchase', entry_date=date(2021, 1, 1),
+                                            comments='')
+        self.groups_manager = GroupsManagement()
+
+    def test_calculate_groups_is_cached(self):
+        # The data version and the cattle, then only the data version
+        with self.assertNumQueries(2):
+            first = self.groups_manager.calculate_groups(date(2022, 1, 1))
+        with self.assertNumQueries(1):
+            second = self.groups_manager.calculate_groups(date(2022, 1, 1))
+        self.assertEqual(first, second)
+        self.assertEqual(result_cache.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_changes_bump_the_data_version(self):
+        changes = [
+            lambda: Cattle.objects.create(number='LT2', gender='Bull', breed='Angus', comments=''),
+            lambda: self.cattle.save(),
+            lambda: self.cattle.delete(),
+            lambda: Herd.objects.create(name='North', location='Farm'),
+            lambda: Cattle.objects.filter(pk=self.cattle.pk).update(comments='Bulk update'),
+        ]
+        for change in changes:
+            version = result_cache.data_version()
+            change()
+            self.assertNotEqual(result_cache.data_version(), version)
+
+    def test_writes_of_other_processes_invalidate_the_cache(self):
+        self.groups_manager.calculate_groups(date(2022, 1, 1))
+        # Another process shares only the database, its write and version change skip the cache of this process
+        Cattle._base_manager.bulk_create([Cattle(number='LT2', gender='Cow', breed='Angus', birth_date=date(2020, 1, 1),
+                                                 acquisition_method='Purchase', entry_date=date(2021, 1, 1),
+                                                 comments='')])
+        self.assertEqual(len(self.groups_manager.calculate_groups(date(2022, 1, 1))['Cows']), 1)
+        FarmDataVersion.objects.update(version='other-process')
+        self.assertEqual(result_cache.data_version(), 'other-process')
+        self.assertEqual(len(self.groups_manager.calculate_groups(date(2022, 1, 1))['Cows']), 2)
+
+    def test_rolled_back_writes_keep_the_version(self):
+        version = result_cache.data_version()
+        with transaction.atomic():
+            Herd.objects.create(name='North', location='Farm')
+            self.assertNotEqual(result_cache.data_version(), version)
+            transaction.set_rollback(True)
+        self.assertEqual(result_cache.data_version(), version)
+
+    def test_soft_deleted_cattle_leave_the_cached_groups(self):
+        self.assertEqual(len(self.groups_manager.calculate_groups(date(2022, 1, 1))['Cows']), 1)
+        self.cattle.delete()
+        self.assertEqual(len(self.groups_manager.calculate_groups(date(2022, 1, 1))['Cows']), 0)
+
+    def test_stats_view(self):
+        self.groups_manager.calculate_groups(date(2022, 1, 1))
+        response = self.client.get(reverse('my_farm:report_cache_stats'))
+        self.assertEqual(response.json()['misses'], 1)
+
+
+class LRUCacheBackendTestCase(TestCase):
+    def check_least_recently_used_is_evicted(self, cache):
+        for key in ['a', 'b', 'c']:
+            cache.set(key, key)
+            time.sleep(0.01)
+        cache.get('a')
+        time.sleep(0.01)
+        cache.set('d', 'd')
+
+        self.assertEqual(cache.get('a'), 'a')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('d'), 'd')
+
+    def test_local_memory_backend(self):
+        self.check_least_recently_used_is_evicted(
+            LocMemCache('lru-test', {'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 3}}))
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LRUFileBasedCache(os.path.join(directory, 'reports'),
+                                      {'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 3}})
+            self.check_least_recently_used_is_evicted(cache)
@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.census import HerdCensus
+from my_farm.groups import GroupsManagement
+from my_farm.models import Cattle
+
+
+class HerdCensusTestCase(TestCase):
+    def setUp(self):
+        genders = ['Heifer', 'Bull', 'Cow']
+        Cattle.objects.bulk_create([
+            Cattle(number=f'LT{index}', gender=genders[index % 3], breed='Angus',
+                   birth_date=date(2021, 1, 31) + timedelta(days=index * 11),
+                   entry_date=date(2021, 3, 1) + timedelta(days=index * 13),
+                   end_date=date(2023, 1, 1) + timedelta(days=index * 5) if index % 4 == 0 else None,
+                   acquisition_method='Birth', comments='')
+            for index in range(40)
+        ])
+
+    def test_census_matches_calculate_groups(self):
+        start_date = date(2022, 1, 1)
+        census = HerdCensus(start_date, date(2023, 12, 31)).calculate_census()
+        groups_manager = GroupsManagement()
+
+        for day in range(0, 730, 17):
+            estimation_date = start_date + timedelta(days=day)
+            self.assertEqual(census['dates'][day], estimation_date.isoformat())
+            groups = groups_manager.calculate_groups(estimation_date)
+            for group_name, cattle_data in groups.items():
+                present = [item for item in cattle_data
+                           if item['cattle']['end_date'] is None or item['cattle']['end_date'] >= estimation_date]
+                self.assertEqual(census['groups'][group_name]['count'][day], len(present))
+                self.assertAlmostEqual(census['groups'][group_name]['weight'][day],
+                                       sum(item['weight'] for item in present), delta=0.1)
+
+    def test_herd_census_view(self):
+        response = self.client.get(reverse('my_farm:herd_census'),
+                                   {'start_date': '2022-01-01', 'end_date': '2022-01-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['dates']), 31)
+
+        response = self.client.get(reverse('my_farm:herd_census'),
+                                   {'start_date': '2022-02-01', 'end_date': '2022-01-31'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,125 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from my_farm.bulk import assign_herds_to_field, move_to_herd, record_loss, select_cattle
+from my_farm.cache import result_cache
+from my_farm.counters import FarmCounters
+from my_farm.groups import GroupsManagement
+from my_farm.models import Cattle, Field, Herd
+
+
+class FarmCountersTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        self.field = Field.objects.create(name='Meadow', location='Farm', coordinates='0,0')
+        self.north = Herd.objects.create(name='North', location='Farm', field=self.field)
+        self.south = Herd.objects.create(name='South', location='Farm')
+        self.cattle = [Cattle.objects.create(number=f'LT{index}', gender='Cow', breed='Angus',
+                                             birth_date=date(2019, 1, 1), herd=self.north, comments='')
+                       for index in range(3)]
+
+    def assertCounters(self, instance, **counters):
+        instance.refresh_from_db()
+        self.assertEqual({name: getattr(instance, name) for name in counters}, counters)
+
+    def test_cattle_writes_update_counters(self):
+        self.assertCounters(self.north, active_cattle_count=3, total_cattle_count=3)
+        self.assertCounters(self.field, herd_count=1, active_cattle_count=3, total_cattle_count=3)
+
+        cattle = self.cattle[0]
+        cattle.loss_method = 'Sold'
+        cattle.end_date = date(2023, 1, 1)
+        cattle.save()
+        self.assertCounters(self.north, active_cattle_count=2, total_cattle_count=3)
+
+        cattle.delete()
+        self.assertCounters(self.north, active_cattle_count=2, total_cattle_count=2)
+
+        self.cattle[1].herd = self.south
+        self.cattle[1].save()
+        self.assertCounters(self.north, active_cattle_count=1, total_cattle_count=1)
+        self.assertCounters(self.south, active_cattle_count=1, total_cattle_count=1)
+        self.assertCounters(self.field, active_cattle_count=1, total_cattle_count=1)
+
+    def test_live_weight(self):
+        weight = GroupsManagement().estimate_weights([date(2019, 1, 1)], ['Cow'], date.today())[0]
+        self.north.refresh_from_db()
+        self.assertAlmostEqual(self.north.live_weight, round(3 * weight, 2))
+        self.assertEqual(self.north.counted_on, date.today())
+
+    def test_single_cattle_writes_do_not_recount_the_herd(self):
+        cattle = self.cattle[0]
+        cattle.birth_date = date(2022, 6, 1)
+        with CaptureQueriesContext(connection) as context:
+            cattle.save()
+        self.assertFalse([query for query in context.captured_queries
+                          if query['sql'].startswith('SELECT') and 'FROM "my_farm_cattle"' in query['sql']
+                          and '"my_farm_cattle"."herd_id" IN' in query['sql']])
+        weights = GroupsManagement().estimate_weights([date(2019, 1, 1), date(2022, 6, 1)], ['Cow', 'Cow'],
+                                                      date.today())
+        self.north.refresh_from_db()
+        self.assertAlmostEqual(self.north.live_weight, round(2 * weights[0] + weights[1], 2))
+
+        cattle.comments = 'Only the comments change'
+        cattle.save()
+        self.cattle[2].herd = self.south
+        self.cattle[2].save()
+        Cattle.objects.create(number='LT9', gender='Bull', breed='Angus', birth_date=date(2023, 1, 1),
+                              herd=self.south, comments='')
+        self.cattle[1].delete()
+        self.assertEqual(FarmCounters().reconcile(dry_run=True), {'herds': 0, 'fields': 0})
+
+    def test_counter_writes_keep_the_data_version(self):
+        version = result_cache.data_version()
+        FarmCounters().recount(herd_ids=[self.north.pk])
+        FarmCounters().update_cattle(None, {'herd_id': self.north.pk, 'gender': 'Cow', 'breed': 'Angus',
+                                            'birth_date': date(2019, 1, 1), 'loss_method': None, 'deleted': False})
+        self.assertEqual(result_cache.data_version(), version)
+        self.assertCounters(self.field, active_cattle_count=4)
+
+    def test_herd_writes_update_field_counters(self):
+        self.south.field = self.field
+        self.south.save()
+        self.assertCounters(self.field, herd_count=2, active_cattle_count=3)
+
+        self.north.delete()
+        self.assertCounters(self.field, herd_count=1, active_cattle_count=0)
+
+    def test_bulk_writes_update_counters(self):
+        move_to_herd(select_cattle([cattle.pk for cattle in self.cattle[:2]]), self.south)
+        self.assertCounters(self.north, active_cattle_count=1)
+        self.assertCounters(self.south, active_cattle_count=2)
+
+        record_loss(select_cattle(filters={'herd': self.south.pk}), 'Death', date(2023, 1, 1))
+        self.assertCounters(self.south, active_cattle_count=0, total_cattle_count=2)
+
+        other = Field.objects.create(name='Hill', location='Farm', coordinates='1,1')
+        assign_herds_to_field([self.north.pk, self.south.pk], other)
+        self.assertCounters(self.field, herd_count=0, total_cattle_count=0)
+        self.assertCounters(other, herd_count=2, active_cattle_count=1, total_cattle_count=3)
+
+    def test_reconcile_repairs_drift(self):
+        Herd._base_manager.filter(pk=self.north.pk).update(active_cattle_count=10)
+        Field.objects.filter(pk=self.field.pk).update(herd_count=5)
+        self.assertEqual(FarmCounters().reconcile(dry_run=True), {'herds': 1, 'fields': 1})
+        self.assertCounters(self.north, active_cattle_count=10)
+
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('1 herds and 1 fields', out.getvalue())
+        self.assertCounters(self.north, active_cattle_count=3)
+        self.assertCounters(self.field, herd_count=1)
+        self.assertEqual(FarmCounters().reconcile(), {'herds': 0, 'fields': 0})
+
+    def test_list_pages_read_counters(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('my_farm:herd_list'))
+        self.assertContains(response, '>3</a>')
+        response = self.client.get(reverse('my_farm:field_list'))
+        self.assertContains(response, '>1</a>')
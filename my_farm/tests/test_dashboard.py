@@ -0,0 +1,81 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.cache import result_cache
+from my_farm.dashboard import calculate_farm_summary, farm_summary
+from my_farm.groups import CattleGroupData, GroupsManagement
+from my_farm.models import Cattle, Field, Herd
+from my_farm.tests.test_ledger import create_herd
+
+
+class FarmSummaryTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        create_herd(40)
+        Herd.objects.create(name='Herd 1', location='North', start_date=date(2021, 1, 1), is_active=True)
+        Herd.objects.create(name='Herd 2', location='South', start_date=date(2021, 1, 1), is_active=False)
+        Field.objects.create(name='Field 1', location='North', coordinates='54.1, 23.9', is_active=True)
+
+    def expected_groups(self, on_date):
+        groups = {}
+        for group_name, group_data in GroupsManagement()._calculate_groups(on_date).items():
+            group = CattleGroupData(group_name, group_data)
+            group.count_active_cattle()
+            groups[group_name] = group.active_cattle
+        return groups
+
+    def test_groups_match_the_python_classification(self):
+        for on_date in [date(2021, 3, 1), date(2021, 12, 31), date(2022, 2, 28), date(2022, 6, 15),
+                        date(2023, 1, 1), date(2024, 2, 29)]:
+            summary = calculate_farm_summary(on_date)
+            expected = self.expected_groups(on_date)
+            self.assertEqual(summary['groups'], expected, on_date)
+            self.assertEqual(summary['total_cattle_count'], sum(expected.values()))
+
+    def test_counts_active_herds_and_fields(self):
+        summary = calculate_farm_summary(date(2023, 1, 1))
+        self.assertEqual(summary['active_herds_count'], 1)
+        self.assertEqual(summary['active_field_count'], 1)
+        self.assertEqual(calculate_farm_summary(date(2020, 1, 1))['active_herds_count'], 0)
+
+    def test_summary_is_cached(self):
+        # The data version, the rollup rows, the group totals, the herds and the fields
+        with self.assertNumQueries(5):
+            summary = farm_summary(date(2023, 1, 1))
+        with self.assertNumQueries(1):
+            self.assertEqual(farm_summary(date(2023, 1, 1)), summary)
+
+    def test_the_date_is_part_of_the_key(self):
+        farm_summary(date(2023, 1, 1))
+        with self.assertNumQueries(5):
+            farm_summary(date(2023, 1, 2))
+
+    def test_changes_invalidate_the_summary(self):
+        on_date = date(2023, 1, 1)
+        total = farm_summary(on_date)['total_cattle_count']
+        cattle = Cattle.objects.filter(end_date__isnull=True).first()
+        cattle.end_date = date(2022, 12, 1)
+        cattle.loss_method = 'Sold'
+        cattle.save()
+        self.assertEqual(farm_summary(on_date)['total_cattle_count'], total - 1)
+
+        Field.objects.create(name='Field 2', location='South', coordinates='54.2, 23.8', is_active=True)
+        self.assertEqual(farm_summary(on_date)['active_field_count'], 2)
+
+        Herd.objects.filter(name='Herd 2').update(is_active=True)
+        self.assertEqual(farm_summary(on_date)['active_herds_count'], 2)
+
+    def test_home_shows_the_summary(self):
+        user = User.objects.create_user('farmer', password='password')
+        self.client.force_login(user)
+        response = self.client.get(reverse('my_farm:home'))
+        summary = farm_summary()
+        self.assertEqual({group.group_name: group.active_cattle for group in response.context['groups']},
+                         summary['groups'])
+        self.assertEqual(response.context['total_cattle_count'], summary['total_cattle_count'])
+        self.assertEqual(response.context['active_herds_count'], 1)
+        self.assertEqual(response.context['active_field_count'], 1)
+        self.assertEqual(response.context['groups'][0].url, reverse('my_farm:group_data', args=['cows']))
@@ -0,0 +1,49 @@
+import csv
+import gzip
+import json
+from datetime import date
+
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.models import Cattle
+
+
+class ExportCattleTestCase(TestCase):
+    def setUp(self):
+        Cattle.objects.bulk_create([
+            Cattle(number=f'LT{index}', name=f'Name, {index}', gender='Cow', breed='Angus',
+                   birth_date=date(2020, 1, 1 + index), acquisition_method='Purchase',
+                   entry_date=date(2021, 1, 1), loss_method='Sold' if index == 2 else None, comments='')
+            for index in range(5)
+        ])
+        Cattle.objects.filter(number='LT4').update(deleted=True)
+        self.url = reverse('my_farm:export_cattle')
+
+    def content(self, response):
+        self.assertFalse(hasattr(response, 'content'))
+        return b''.join(response.streaming_content)
+
+    def test_csv_export(self):
+        response = self.client.get(self.url, {'columns': ['Number', 'name', 'birth_date']})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(self.content(response).decode().splitlines()))
+        self.assertEqual(rows[0], ['number', 'name', 'birth_date'])
+        self.assertEqual(rows[1], ['LT0', 'Name, 0', '2020-01-01'])
+        self.assertEqual(len(rows), 5)
+
+    def test_ndjson_export_of_active_cattle(self):
+        response = self.client.get(self.url, {'format': 'ndjson', 'query_loss_method_null': '1'})
+        lines = [json.loads(line) for line in self.content(response).decode().splitlines()]
+        self.assertEqual([line['number'] for line in lines], ['LT0', 'LT1', 'LT3'])
+        self.assertEqual(lines[0]['entry_date'], '2021-01-01')
+
+    def test_gzip_export(self):
+        response = self.client.get(self.url, {'columns': ['number']}, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(self.content(response)).decode().split(), ['number', 'LT0', 'LT1', 'LT2',
+                                                                                      'LT3'])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'columns': ['picture']}).status_code, 400)
@@ -0,0 +1,178 @@
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+
+from my_farm.constants import FEMALE_BIRTH_WEIGHT, MALE_MAX_WEIGHT
+from my_farm.groups import GroupsManagement, GroupNumbers, age_in_months
+from my_farm.management.commands.benchmark_groups import legacy_classify, synthetic_cattle
+from my_farm.memo import memo_context
+from my_farm.models import Cattle
+
+
+class EstimateWeightsTestCase(TestCase):
+    def setUp(self):
+        self.groups_manager = GroupsManagement()
+
+    def test_estimate_weights_single_date(self):
+        weights = self.groups_manager.estimate_weights(
+            [date(2022, 1, 1), date(2022, 1, 1), date(2015, 1, 1)],
+            ['Heifer', 'Bull', 'Bull'],
+            date(2022, 1, 11),
+        )
+        self.assertEqual(list(weights), [32 + 10 * 1.05, 36 + 10 * 1.05, MALE_MAX_WEIGHT])
+
+    def test_estimate_weights_per_cattle_dates(self):
+        weights = self.groups_manager.estimate_weights(
+            [date(2022, 1, 1), date(2022, 1, 1)],
+            ['Cow', 'Cow'],
+            [date(2021, 1, 1), date(2022, 1, 3)],
+        )
+        # Estimation dates before the birthdate fall back to the birth weight
+        self.assertEqual(list(weights), [FEMALE_BIRTH_WEIGHT, 32 + 2 * 1.05])
+
+    def test_estimate_weights_at_dates(self):
+        weights = self.groups_manager.estimate_weights_at_dates(
+            [date(2022, 1, 1)], ['Bull'], [date(2022, 1, 1), date(2022, 1, 21)])
+        self.assertEqual(list(weights[date(2022, 1, 1)]), [36])
+        self.assertEqual(list(weights[date(2022, 1, 21)]), [36 + 20 * 1.05])
+
+    def test_estimate_weights_invalid_gender(self):
+        with self.assertRaises(ValueError):
+            self.groups_manager.estimate_weights([date(2022, 1, 1)], ['Ox'], date(2022, 1, 1))
+
+
+class ClassifyCattleTestCase(TestCase):
+    def test_age_in_months_matches_relativedelta(self):
+        for birth_date in [date(2020, 1, 31), date(2020, 2, 29), date(2021, 8, 15), date(2021, 12, 31)]:
+            for offset in range(0, 900, 7):
+                estimation_date = birth_date + timedelta(days=offset)
+                age = relativedelta(estimation_date, birth_date)
+                self.assertEqual(age_in_months(birth_date, estimation_date), age.years * 12 + age.months)
+
+    def test_classify_cattle_matches_legacy_classification(self):
+        groups_manager = GroupsManagement()
+        for estimation_date in [date(2023, 2, 28), date(2024, 2, 29), date(2024, 3, 31), date(2025, 2, 28)]:
+            cattle_list = synthetic_cattle(2000, estimation_date)
+            self.assertEqual(groups_manager.classify_cattle(cattle_list, estimation_date),
+                             legacy_classify(cattle_list, estimation_date))
+
+
+class AcquisitionLossTestCase(TestCase):
+    def setUp(self):
+        for number, entry_date, loss_method, end_date in [
+                ('LT1', date(2021, 6, 1), 'Sold', date(2022, 6, 1)),
+                ('LT2', date(2022, 3, 1), 'Death', date(2023, 3, 1)),
+                ('LT3', date(2022, 4, 1), None, None)]:
+            Cattle.objects.create(number=number, gender='Cow', breed='Angus', birth_date=date(2019, 1, 1),
+                                  acquisition_method='Purchase', entry_date=entry_date, loss_method=loss_method,
+                                  end_date=end_date, comments='')
+        self.start_date, self.end_date = date(2022, 1, 1), date(2022, 12, 31)
+
+    def test_single_period_counts_both_columns(self):
+        # Every cattle entered or left within the dates is counted as acquired and, with a loss method, as lost
+        group = GroupNumbers('Cows', GroupsManagement().calculate_groups(self.end_date)['Cows'])
+        group.acquisition_loss(self.start_date, self.end_date)
+        self.assertEqual((group.purchase_count, group.sold_count, group.death_count), (3, 1, 1))
+        self.assertEqual(group.acquisition_loss_ids, set(Cattle.objects.values_list('id', flat=True)))
+
+
+class ReportQueryCountTestCase(TestCase):
+    def create_cattle(self, count):
+        Cattle.objects.bulk_create([
+            Cattle(number=f'LT{index}', gender=['Heifer', 'Bull', 'Cow'][index % 3], breed='Angus',
+                   birth_date=date(2020, 1 + index % 12, 1), acquisition_method='Purchase',
+                   entry_date=date(2022, 1 + index % 12, 1), comments='')
+            for index in range(count)
+        ])
+
+    def run_report(self, start_date, end_date):
+        groups_manager = GroupsManagement()
+        start_date_groups = groups_manager.calculate_groups(estimation_date=start_date)
+        end_date_groups = groups_manager.calculate_groups(estimation_date=end_date)
+        for group_name, cattle_data in end_date_groups.items():
+            group = GroupNumbers(group_name, cattle_data)
+            group.quantity(start_date_groups, end_date_groups, start_date, end_date)
+            group.acquisition_loss(start_date, end_date)
+            group.check_movement(start_date_groups, end_date_groups)
+
+    def test_report_query_count_does_not_grow_with_herd(self):
+        # The data version once and the cattle of each date
+        self.create_cattle(5)
+        with self.assertNumQueries(3), memo_context():
+            self.run_report(date(2022, 1, 1), date(2022, 12, 31))
+
+        Cattle.objects.all().delete()
+        self.create_cattle(60)
+        with self.assertNumQueries(3), memo_context():
+            self.run_report(date(2022, 1, 1), date(2022, 12, 31))
+
+
+class PeriodBoundariesTestCase(TestCase):
+    def test_period_boundaries(self):
+        groups_manager = GroupsManagement()
+        self.assertEqual(groups_manager.period_boundaries(date(2022, 1, 15), date(2022, 4, 10), 'month'),
+                         [date(2022, 1, 15), date(2022, 1, 31), date(2022, 2, 28), date(2022, 3, 31),
+                          date(2022, 4, 10)])
+        self.assertEqual(groups_manager.period_boundaries(date(2022, 3, 31), date(2022, 12, 31), 'quarter'),
+                         [date(2022, 3, 31), date(2022, 6, 30), date(2022, 9, 30), date(2022, 12, 31)])
+        with self.assertRaises(ValueError):
+            groups_manager.period_boundaries(date(2022, 1, 1), date(2022, 12, 31), 'week')
+
+
+class DiffMovementsTestCase(TestCase):
+    def setUp(self):
+        genders = ['Heifer', 'Bull', 'Cow']
+        acquisition_methods = ['Birth', 'Purchase', 'Gift']
+        Cattle.objects.bulk_create([
+            Cattle(number=f'LT{index}', gender=genders[index % 3], breed='Angus',
+                   birth_date=date(2021, 1, 1) + timedelta(days=index * 13),
+                   acquisition_method=acquisition_methods[index % 3],
+                   entry_date=date(2021, 6, 1) + timedelta(days=index * 5),
+                   loss_method='Sold' if index % 4 == 0 else None,
+                   end_date=date(2022, 5, 1) + timedelta(days=index * 3) if index % 4 == 0 else None,
+                   comments='')
+            for index in range(120)
+        ])
+        self.groups_manager = GroupsManagement()
+
+    @staticmethod
+    def legacy_movement(group, start_date_groups, end_date_groups):
+        start_date_list = list(start_date_groups.get(group.group_name, []))
+        end_date_list = list(end_date_groups.get(group.group_name, []))
+        excluded = [item for item in group.group_data if item['cattle']['id'] in group.acquisition_loss_ids]
+
+        moved_out = [item for item in start_date_list if
+                     item['cattle']['id'] not in [cattle['cattle']['id'] for cattle in end_date_list] and
+                     item not in excluded]
+        moved_in = [item for item in end_date_list if
+                    item['cattle']['id'] not in [cattle['cattle']['id'] for cattle in start_date_list] and
+                    item not in excluded]
+        return (len(moved_in), len(moved_out), round(sum(item['weight'] for item in moved_in)),
+                round(sum(item['weight'] for item in moved_out)))
+
+    def test_diff_movements_matches_pairwise_comparison(self):
+        for start_date, end_date in [(date(2021, 12, 31), date(2022, 6, 30)), (date(2022, 1, 1), date(2023, 3, 31))]:
+            start_date_groups = self.groups_manager.calculate_groups(start_date)
+            end_date_groups = self.groups_manager.calculate_groups(end_date)
+
+            groups = []
+            for group_name, cattle_data in end_date_groups.items():
+                group = GroupNumbers(group_name, cattle_data)
+                group.acquisition_loss(start_date, end_date)
+                groups.append(group)
+
+            movements = GroupNumbers.diff_movements(
+                start_date_groups, end_date_groups, {group.group_name: group.acquisition_loss_ids for group in groups})
+            for group in groups:
+                group.check_movement(start_date_groups, end_date_groups, movements)
+                self.assertEqual((group.moved_in, group.moved_out, group.weight_moved_in, group.weight_moved_out),
+                                 self.legacy_movement(group, start_date_groups, end_date_groups), group.group_name)
+
+                single_group = GroupNumbers(group.group_name, group.group_data)
+                single_group.acquisition_loss(start_date, end_date)
+                single_group.check_movement(start_date_groups, end_date_groups)
+                self.assertEqual(single_group.moved_in, group.moved_in)
+                self.assertEqual(single_group.weight_moved_out, group.weight_moved_out)
+
+        self.assertTrue(any(group.moved_in for group in groups))
@@ -0,0 +1,72 @@
+from datetime import date
+
+from django.test import TestCase
+
+from my_farm.growth import GrowthRegistry, GompertzGrowth, LinearGrowth, PiecewiseGrowth, growth_registry
+from my_farm.groups import GroupsManagement
+
+
+class GrowthModelTestCase(TestCase):
+    def test_linear_table_matches_rule(self):
+        table = LinearGrowth(32, 1.05, 600).compile()
+        self.assertEqual(table.weight(-5), 32)
+        self.assertEqual(table.weight(10), 32 + 10 * 1.05)
+        self.assertEqual(table.weight(100000), 600)
+
+    def test_gompertz_table(self):
+        table = GompertzGrowth(35, 650, 0.004).compile()
+        self.assertAlmostEqual(table.weight(0), 35)
+        self.assertLess(table.weight(365), table.weight(730))
+        self.assertAlmostEqual(table.weight(100000), 650, places=0)
+
+    def test_piecewise_table(self):
+        table = PiecewiseGrowth([(0, 40), (100, 140), (200, 190)]).compile()
+        self.assertEqual(table.weight(50), 90)
+        self.assertEqual(table.weight(150), 165)
+        self.assertEqual(table.weight(5000), 190)
+        with self.assertRaises(ValueError):
+            PiecewiseGrowth([(10, 40), (100, 140)])
+
+    def test_phases_describe_table(self):
+        for model in [LinearGrowth(32, 1.05, 600), GompertzGrowth(35, 650, 0.004),
+                      PiecewiseGrowth([(0, 40), (100, 140), (200, 190)])]:
+            table = model.compile()
+            for first_age, end_age, weight, daily_gain in table.phases:
+                for age_days in range(first_age, min(end_age or table.last_age + 1, table.last_age + 1), 13):
+                    self.assertAlmostEqual(weight + (age_days - first_age) * daily_gain, table.weight(age_days),
+                                           delta=0.5)
+
+    def test_version_changes_with_parameters(self):
+        self.assertEqual(LinearGrowth(32, 1.05, 600).version(), LinearGrowth(32, 1.05, 600).version())
+        self.assertNotEqual(LinearGrowth(32, 1.05, 600).version(), LinearGrowth(32, 1.1, 600).version())
+
+
+class GrowthRegistryTestCase(TestCase):
+    def test_breed_specific_model(self):
+        registry = GrowthRegistry()
+        registry.register('Bull', LinearGrowth(36, 1.05, 800))
+        registry.register('Bull', LinearGrowth(40, 1.2, 900), breed='Angus')
+
+        self.assertEqual(registry.table('Bull', 'Crossbreed').weight(0), 36)
+        self.assertEqual(registry.table('Bull', 'Angus').weight(0), 40)
+        with self.assertRaises(ValueError):
+            registry.table('Ox')
+
+    def test_estimate_weights_uses_breed(self):
+        growth_registry.register('Heifer', LinearGrowth(30, 1.0, 550), breed='Hereford')
+        try:
+            weights = GroupsManagement().estimate_weights(
+                [date(2022, 1, 1), date(2022, 1, 1)], ['Heifer', 'Heifer'], date(2022, 1, 11),
+                ['Angus', 'Hereford'])
+        finally:
+            growth_registry.unregister('Heifer', breed='Hereford')
+        self.assertEqual(list(weights), [32 + 10 * 1.05, 40])
+
+    def test_crossbreed_curves_are_registered(self):
+        self.assertEqual(growth_registry.table('Cow', 'Crossbreed').version,
+                         GompertzGrowth(34, 620, 0.005).version())
+        self.assertEqual(growth_registry.table('Heifer', 'Crossbreed').version,
+                         growth_registry.table('Cow', 'Crossbreed').version)
+        bull = growth_registry.table('Bull', 'Crossbreed')
+        self.assertEqual([bull.weight(age_days) for age_days in [0, 205, 365, 730, 1460]], [38, 260, 420, 700, 900])
+        self.assertEqual(growth_registry.table('Bull', 'Angus').weight(0), 36)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.imports import CattleImport
+from my_farm.ledger import MovementLedger
+from my_farm.models import Cattle, Herd, MovementEvent
+
+CSV = """Number,Name,Gender,Breed,Birth_Date,Acquisition_Method,Entry_Date,Herd,Comments
+LT1,Bella,cow,Angus,2020-01-01,Purchase,2022-01-01,North,
+LT2,,Bull,Crossbreed,2022-03-01,birth,2022-03-01,{herd_id},
+LT3,,Ox,Angus,,,,,
+LT1,,Cow,Angus,,,,,Duplicate in the file
+LT0,,Heifer,Angus,,,,,Already in the database
+LT4,,Heifer,Angus,2022-13-01,,,,
+LT5,,Heifer,Angus,,,,South,
+,,Heifer,Angus,,,,,
+LT6,,Heifer,Angus,2022-01-01,Gift,2022-06-01,,
+"""
+
+
+class CattleImportTestCase(TestCase):
+    def setUp(self):
+        self.herd = Herd.objects.create(name='North', location='Farm')
+        Cattle.objects.create(number='LT0', gender='Cow', breed='Angus', comments='')
+        self.csv = CSV.replace('{herd_id}', str(self.herd.pk))
+
+    def test_import_reports_errors_per_row(self):
+        stats = CattleImport(batch_size=3).import_csv(StringIO(self.csv))
+        self.assertEqual((stats['rows'], stats['created'], stats['failed']), (9, 3, 6))
+        self.assertEqual([line_num for line_num, error in stats['errors']], [4, 5, 6, 7, 8, 9])
+        self.assertIn('Invalid gender Ox', stats['errors'][0][1])
+        self.assertIn('LT1 is already used', stats['errors'][1][1])
+        self.assertIn('LT0 is already used', stats['errors'][2][1])
+        self.assertIn('Unknown herd South', stats['errors'][4][1])
+
+        bella = Cattle.objects.get(number='LT1')
+        self.assertEqual((bella.name, bella.gender, bella.herd, bella.entry_date),
+                         ('Bella', 'Cow', self.herd, date(2022, 1, 1)))
+        self.assertEqual(Cattle.objects.get(number='LT2').acquisition_method, 'Birth')
+        self.assertEqual(Cattle.objects.get(number='LT2').herd, self.herd)
+
+    def test_import_records_the_ledger_events(self):
+        CattleImport().import_csv(StringIO(self.csv))
+        self.assertTrue(MovementEvent.objects.filter(cattle__number='LT6', event_type=MovementEvent.ENTERED).exists())
+        groups = MovementLedger().calculate(date(2022, 1, 1), date(2022, 12, 31))
+        self.assertEqual(sum(group.purchase_count + group.birth_count + group.gift_count for group in groups), 3)
+
+    def test_batches_use_one_number_lookup(self):
+        rows = ''.join(f'LT{index},,Heifer,Angus\n' for index in range(100, 110))
+        # Herds once, then for each batch the used numbers, the insert and the data version update inside a savepoint
+        with self.assertNumQueries(1 + 2 * 6):
+            CattleImport(batch_size=5).import_csv(StringIO('number,name,gender,breed\n' + rows))
+        self.assertEqual(Cattle.objects.count(), 11)
+
+    def test_missing_required_column(self):
+        with self.assertRaises(ValueError):
+            CattleImport().import_csv(StringIO('number,gender\nLT9,Cow\n'))
+
+    def test_upload_view(self):
+        upload = SimpleUploadedFile('cattle.csv', self.csv.encode('utf-8-sig'), content_type='text/csv')
+        response = self.client.post(reverse('my_farm:import_cattle'), {'csv_file': upload})
+        self.assertEqual(response.context['stats']['created'], 3)
+        self.assertContains(response, 'Unknown herd South')
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write(self.csv)
+        self.addCleanup(os.remove, csv_file.name)
+        output, errors = StringIO(), StringIO()
+        call_command('import_cattle', csv_file.name, stdout=output, stderr=errors)
+        self.assertIn('Imported 3 of 9 rows', output.getvalue())
+        self.assertIn('Line 4: Invalid gender Ox', errors.getvalue())
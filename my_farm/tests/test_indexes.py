@@ -0,0 +1,35 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from my_farm.models import Cattle
+
+
+class CattleIndexesTestCase(TestCase):
+    def test_indexes_exist(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Cattle._meta.db_table)
+        for index in Cattle._meta.indexes:
+            self.assertIn(index.name, constraints)
+
+    def test_benchmark_queries_use_indexes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'plans.json')
+            out = StringIO()
+            call_command('benchmark_queries', size=600, repeat=1, check=True, output=path, stdout=out)
+            with open(path) as report_file:
+                report = json.load(report_file)
+
+        self.assertIn('calves by gender', out.getvalue())
+        self.assertEqual(report['size'], 600)
+        queries = {entry['query']: entry for entry in report['queries']}
+        self.assertIn('cattle_active_gender_idx', queries['calves by gender']['after']['plan'])
+        self.assertNotIn('cattle_active_gender_idx', queries['calves by gender']['before']['plan'])
+        self.assertTrue(all(entry['uses_index'] for entry in report['queries']))
+        self.assertFalse(Cattle.objects.exists())
+        self.test_indexes_exist()
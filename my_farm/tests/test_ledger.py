@@ -0,0 +1,248 @@
+from datetime import date, timedelta
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+
+from my_farm.cache import result_cache
+from my_farm.groups import GroupNumbers, GroupsManagement
+from my_farm.ledger import MovementLedger, record_cattle_list_events
+from my_farm.models import Cattle, FarmDataVersion, Herd, MovementCheckpoint, MovementEvent
+from my_farm.rollup import DailyRollup
+
+backfill_migration = import_module('my_farm.migrations.0013_backfill_movement_events')
+
+
+def create_herd(count):
+    genders = ['Heifer', 'Bull', 'Cow']
+    acquisition_methods = ['Birth', 'Purchase', 'Gift']
+    loss_methods = ['Death', 'Sold', 'Consumed', 'Gifted']
+    for index in range(count):
+        Cattle.objects.create(
+            number=f'LT{index}', gender=genders[index % 3], breed='Angus',
+            birth_date=date(2021, 1, 1) + timedelta(days=index * 5),
+            acquisition_method=acquisition_methods[index % 3],
+            entry_date=date(2021, 3, 1) + timedelta(days=index * 6),
+            loss_method=loss_methods[index % 4] if index % 5 == 0 else None,
+            end_date=date(2022, 2, 1) + timedelta(days=index * 4) if index % 5 == 0 else None,
+            comments='')
+
+
+class RecordCattleEventsTestCase(TestCase):
+    def setUp(self):
+        self.cattle = Cattle.objects.create(number='LT1', gender='Heifer', breed='Angus', birth_date=date(2022, 1, 10),
+                                            acquisition_method='Purchase', entry_date=date(2022, 3, 1),
+                                            comments='')
+
+    def net_events(self):
+        events = {}
+        for event in MovementEvent.objects.filter(cattle=self.cattle):
+            key = (event.event_type, event.date, event.from_group_name, event.group_name)
+            events[key] = events.get(key, 0) + event.delta
+        return {key: count for key, count in events.items() if count}
+
+    def test_saving_records_events(self):
+        self.assertEqual(self.net_events(), {
+            (MovementEvent.ENTERED, date(2022, 3, 1), None, 'Calves'): 1,
+            (MovementEvent.AGE_CLASS_CROSSED, date(2023, 1, 10), 'Calves', 'Young_Heifer'): 1,
+            (MovementEvent.AGE_CLASS_CROSSED, date(2024, 1, 10), 'Young_Heifer', 'Adult_Heifer'): 1,
+        })
+
+        count = MovementEvent.objects.count()
+        self.cattle.comments = 'Unchanged movement'
+        self.cattle.save()
+        self.assertEqual(MovementEvent.objects.count(), count)
+
+    def test_corrections_append_cancelling_events(self):
+        count = MovementEvent.objects.count()
+        self.cattle.loss_method = 'Sold'
+        self.cattle.end_date = date(2023, 6, 1)
+        self.cattle.save()
+
+        # The crossing into the adults no longer happens, so it is cancelled rather than deleted
+        self.assertEqual(MovementEvent.objects.count(), count + 2)
+        self.assertEqual(MovementEvent.objects.filter(delta=-1).count(), 1)
+        self.assertEqual(self.net_events(), {
+            (MovementEvent.ENTERED, date(2022, 3, 1), None, 'Calves'): 1,
+            (MovementEvent.AGE_CLASS_CROSSED, date(2023, 1, 10), 'Calves', 'Young_Heifer'): 1,
+            (MovementEvent.LEFT, date(2023, 6, 1), None, 'Young_Heifer'): 1,
+        })
+
+        self.cattle.delete()
+        self.assertEqual(self.net_events(), {})
+
+    def test_gender_and_herd_changes_are_recorded(self):
+        herd = Herd.objects.create(name='North', location='Farm')
+        self.cattle.gender = 'Cow'
+        self.cattle.herd = herd
+        self.cattle.save()
+
+        gender_change = MovementEvent.objects.get(event_type=MovementEvent.GENDER_CHANGED)
+        self.assertEqual((gender_change.date, gender_change.from_gender, gender_change.gender),
+                         (date.today(), 'Heifer', 'Cow'))
+        self.assertEqual(gender_change.group_name, 'Cows')
+        herd_change = MovementEvent.objects.get(event_type=MovementEvent.HERD_CHANGED)
+        self.assertEqual((herd_change.from_herd_id, herd_change.herd_id), (None, herd.id))
+        # The heifer stays in its groups until the gender change
+        self.assertIn((MovementEvent.ENTERED, date(2022, 3, 1), None, 'Calves'), self.net_events())
+
+
+class MovementLedgerTestCase(TestCase):
+    def setUp(self):
+        create_herd(60)
+        self.ledger = MovementLedger()
+
+    def test_periods_are_balanced(self):
+        periods, totals = self.ledger.calculate_periods(date(2021, 1, 1), date(2023, 12, 31), 'quarter')
+        for group in [group for period in periods for group in period['groups']] + totals:
+            acquisitions = group.birth_count + group.purchase_count + group.gift_count
+            losses = group.death_count + group.sold_count + group.consumed_count + group.gifted_count
+            self.assertEqual(group.end_date_count,
+                             group.start_date_count + acquisitions - losses + group.moved_in - group.moved_out)
+
+    def test_end_balance_matches_the_herd(self):
+        groups_manager = GroupsManagement()
+        for end_date in [date(2021, 12, 31), date(2022, 6, 30), date(2023, 3, 31)]:
+            expected = {}
+            for group_name, group in groups_manager.calculate_groups(end_date).items():
+                present = [item for item in group
+                           if item['cattle']['end_date'] is None or item['cattle']['end_date'] > end_date]
+                expected[group_name] = (len(present), round(sum(item['weight'] for item in present)))
+            groups = self.ledger.calculate(date(2021, 1, 1), end_date)
+            self.assertEqual({group.group_name: (group.end_date_count, group.end_date_group_weight)
+                              for group in groups}, expected)
+
+    def test_acquisitions_and_losses_match_the_herd(self):
+        groups = self.ledger.calculate(date(2021, 6, 1), date(2022, 5, 31))
+        cattle = Cattle.objects.all()
+        self.assertEqual(sum(group.purchase_count for group in groups),
+                         cattle.filter(acquisition_method='Purchase', entry_date__range=(date(2021, 6, 1),
+                                                                                         date(2022, 5, 31))).count())
+        self.assertEqual(sum(group.sold_count for group in groups),
+                         cattle.filter(loss_method='Sold', end_date__range=(date(2021, 6, 1),
+                                                                            date(2022, 5, 31))).count())
+
+    def test_reports_start_from_a_checkpoint(self):
+        first = self.ledger.calculate(date(2022, 1, 1), date(2022, 12, 31))
+        # Reports are read-only, the checkpoints are saved by the commands
+        self.assertFalse(MovementCheckpoint.objects.exists())
+        self.ledger.save_checkpoints(date(2022, 1, 1))
+        self.assertTrue(MovementCheckpoint.objects.filter(date=date(2021, 12, 31)).exists())
+        self.assertEqual(self.ledger.save_checkpoints(date(2022, 1, 1)), 0)
+
+        # The opening balance is read from the checkpoint, so only the events of the window are read
+        result_cache.clear()
+        with self.assertNumQueries(4):
+            second = self.ledger.calculate(date(2022, 1, 1), date(2022, 12, 31))
+        self.assertEqual([group.to_dict() for group in second], [group.to_dict() for group in first])
+
+        cattle = Cattle.objects.get(number='LT59')
+        cattle.entry_date = date(2021, 12, 1)
+        cattle.save()
+        self.assertFalse(MovementCheckpoint.objects.filter(date=date(2021, 12, 31)).exists())
+        third = self.ledger.calculate(date(2022, 1, 1), date(2022, 12, 31))
+        self.assertEqual(sum(group.start_date_count for group in third),
+                         sum(group.start_date_count for group in first) + 1)
+
+
+class ReportBoundaryTestCase(TestCase):
+    def setUp(self):
+        for number, entry_date, loss_method, end_date in [
+                ('LT1', date(2021, 1, 1), 'Sold', date(2022, 1, 1)),
+                ('LT2', date(2022, 1, 1), None, None),
+                ('LT3', date(2021, 1, 1), 'Death', date(2022, 12, 31)),
+                ('LT4', date(2021, 1, 1), None, None)]:
+            Cattle.objects.create(number=number, gender='Cow', breed='Angus', birth_date=date(2019, 1, 1),
+                                  acquisition_method='Purchase', entry_date=entry_date, loss_method=loss_method,
+                                  end_date=end_date, comments='')
+        self.start_date, self.end_date = date(2022, 1, 1), date(2022, 12, 31)
+
+    def assert_boundaries(self, group):
+        # The cattle leaving on the start date are in the beginning count, the cattle entering on it are not
+        self.assertEqual(group.start_date_count, 3)
+        self.assertEqual(group.purchase_count, 1)
+        self.assertEqual((group.sold_count, group.death_count), (1, 1))
+        # The cattle leaving on the end date are not in the end count
+        self.assertEqual(group.end_date_count, 2)
+
+    def test_ledger_boundaries(self):
+        groups = {group.group_name: group for group in MovementLedger().calculate(self.start_date, self.end_date)}
+        self.assert_boundaries(groups['Cows'])
+
+    def test_rollup_boundaries(self):
+        rollup = DailyRollup()
+        rollup.update(self.end_date)
+        self.assertIsNotNone(rollup.report_ranges([(self.start_date, self.end_date)]))
+        groups = {group.group_name: group for group in rollup.calculate(self.start_date, self.end_date)}
+        self.assert_boundaries(groups['Cows'])
+
+    def test_snapshot_report_boundaries(self):
+        # The snapshot engine counts the cattle entering on the start date and leaving on the end date in the counts
+        groups_manager = GroupsManagement()
+        start_date_groups = groups_manager.calculate_groups(self.start_date)
+        end_date_groups = groups_manager.calculate_groups(self.end_date)
+        group = GroupNumbers('Cows', end_date_groups['Cows'])
+        group.quantity(start_date_groups, end_date_groups, self.start_date, self.end_date)
+        self.assertEqual((group.start_date_count, group.end_date_count), (4, 3))
+
+
+class BackfillMovementEventsTestCase(TestCase):
+    def test_backfill_records_missing_events_once(self):
+        Cattle.objects.bulk_create([
+            Cattle(number=f'LT{index}', gender='Bull', breed='Angus', birth_date=date(2022, 1, 1),
+                   acquisition_method='Birth', entry_date=date(2022, 1, 1), comments='')
+            for index in range(5)
+        ])
+        self.assertFalse(MovementEvent.objects.exists())
+
+        call_command('backfill_movement_events', stdout=StringIO())
+        count = MovementEvent.objects.count()
+        self.assertEqual(count, 15)
+
+        call_command('backfill_movement_events', stdout=StringIO())
+        self.assertEqual(MovementEvent.objects.count(), count)
+
+    def test_migration_records_the_events_of_existing_cattle(self):
+        Cattle.objects.bulk_create([
+            Cattle(number=f'LT{index}', gender='Bull', breed='Angus', birth_date=date(2022, 1, 1),
+                   acquisition_method='Birth', entry_date=date(2022, 1, 1), comments='')
+            for index in range(5)
+        ])
+        version = result_cache.data_version()
+
+        backfill_migration.record_movement_events(apps, None)
+        self.assertEqual(MovementEvent.objects.count(), 15)
+        self.assertNotEqual(FarmDataVersion.objects.get().version, version)
+        groups = MovementLedger().calculate(date(2022, 1, 1), date(2022, 12, 31))
+        self.assertEqual(sum(group.birth_count for group in groups), 5)
+
+        backfill_migration.record_movement_events(apps, None)
+        self.assertEqual(MovementEvent.objects.count(), 15)
+
+        # Only the events the migration records again are removed
+        herd = Herd.objects.create(name='Herd 1', location='North', start_date=date(2022, 1, 1), is_active=True)
+        cattle = Cattle.objects.get(number='LT3')
+        cattle.herd = herd
+        cattle.save()
+        backfill_migration.remove_movement_events(apps, None)
+        self.assertEqual(set(MovementEvent.objects.values_list('cattle__number', flat=True)), {'LT3'})
+        backfill_migration.record_movement_events(apps, None)
+        self.assertEqual(MovementEvent.objects.count(), 16)
+
+    def test_migration_records_the_events_of_the_ledger(self):
+        genders = ['Heifer', 'Bull', 'Cow']
+        Cattle.objects.bulk_create([
+            Cattle(number=f'LT{index}', gender=genders[index % 3], breed='Angus',
+                   birth_date=date(2020, 1, 31) + timedelta(days=index * 37) if index % 7 else None,
+                   acquisition_method='Purchase', entry_date=date(2021, 3, 1) + timedelta(days=index * 11),
+                   loss_method='Sold' if index % 4 == 0 else None,
+                   end_date=date(2022, 2, 1) + timedelta(days=index * 13) if index % 4 == 0 else None,
+                   comments='')
+            for index in range(40)
+        ])
+        backfill_migration.record_movement_events(apps, None)
+
+        # The events frozen in the migration are the events the ledger derives today
+        self.assertEqual(record_cattle_list_events(list(Cattle.objects.all())), [])
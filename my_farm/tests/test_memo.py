@@ -0,0 +1,61 @@
+from datetime import date
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from my_farm.cache import result_cache
+from my_farm.groups import GroupsManagement
+from my_farm.memo import RequestMemoMiddleware, current_memo, memo_context
+from my_farm.models import Cattle
+
+
+class RequestMemoTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        self.cattle = Cattle.objects.create(number='LT1', gender='Heifer', breed='Angus', birth_date=date(2021, 1, 1),
+                                            acquisition_method='Birth', entry_date=date(2021, 1, 1), comments='')
+        self.groups_manager = GroupsManagement()
+
+    def test_snapshot_is_loaded_once_per_context(self):
+        with memo_context():
+            with self.assertNumQueries(1):
+                first = self.groups_manager.calculate_snapshot_groups(date(2022, 1, 1))
+                self.groups_manager.calculate_snapshot_groups(date(2023, 1, 1))
+                GroupsManagement().calculate_snapshot_groups(date(2022, 6, 30))
+            self.assertIs(self.groups_manager.calculate_snapshot_groups(date(2022, 1, 1)), first)
+
+        with self.assertNumQueries(1):
+            self.groups_manager.calculate_snapshot_groups(date(2022, 1, 1))
+
+    def test_groups_are_read_from_the_cache_once_per_context(self):
+        with memo_context():
+            first = self.groups_manager.calculate_groups(date(2022, 1, 1))
+            second = GroupsManagement().calculate_groups(date(2022, 1, 1))
+        self.assertIs(first, second)
+        self.assertEqual(result_cache.stats()['hits'] + result_cache.stats()['misses'], 1)
+
+    def test_data_changes_drop_the_memo(self):
+        with memo_context() as memo:
+            self.groups_manager.estimate_cattle_weight(self.cattle.pk, date(2022, 1, 1))
+            self.assertEqual(len(memo.results), 1)
+            self.cattle.birth_date = date(2021, 6, 1)
+            self.cattle.save()
+            self.assertEqual(list(memo.results), [('farm_data_version',)])
+            self.assertEqual(self.groups_manager.estimate_cattle_weight(self.cattle.pk, date(2022, 1, 1)),
+                             32 + 214 * 1.05)
+
+    def test_memo_is_dropped_when_the_context_exits(self):
+        with memo_context() as memo:
+            with memo_context() as nested_memo:
+                self.assertIs(nested_memo, memo)
+            self.assertIs(current_memo(), memo)
+        self.assertIsNone(current_memo())
+
+    def test_requests_run_in_a_memo_context(self):
+        memos = []
+        middleware = RequestMemoMiddleware(lambda request: memos.append(current_memo()) or HttpResponse())
+        middleware(RequestFactory().get('/'))
+        self.assertIsNotNone(memos[0])
+        self.assertIsNone(current_memo())
+        self.assertIn('my_farm.memo.RequestMemoMiddleware', settings.MIDDLEWARE)
@@ -0,0 +1,96 @@
+from datetime import date
+
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from my_farm.cache import result_cache
+from my_farm.models import Cattle, Herd
+from my_farm.pagination import CursorPaginator, paginate
+
+
+class CursorPaginatorTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        Herd.objects.bulk_create([Herd(name=f'Herd {index % 4}', location='Farm') for index in range(11)])
+        self.herds = Herd.objects.all()
+
+    def names(self, page):
+        return [(herd.name, herd.id) for herd in page]
+
+    def test_pages_forward_and_back(self):
+        paginator = CursorPaginator(self.herds, ['name', 'id'], 4)
+        expected = sorted((herd.name, herd.id) for herd in self.herds)
+
+        first = paginator.page()
+        self.assertEqual(self.names(first), expected[:4])
+        self.assertEqual((first.has_previous, first.has_next), (False, True))
+        self.assertIsNone(first.previous_cursor)
+
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        self.assertEqual(self.names(second), expected[4:8])
+        self.assertEqual(self.names(third), expected[8:])
+        self.assertEqual((third.has_previous, third.has_next), (True, False))
+
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual(self.names(back), expected[4:8])
+        self.assertTrue(back.has_previous)
+        start = paginator.page(back.previous_cursor)
+        self.assertEqual(self.names(start), expected[:4])
+        self.assertFalse(start.has_previous)
+
+    def test_descending_ordering(self):
+        paginator = CursorPaginator(self.herds, ['-name', '-id'], 5)
+        expected = sorted(((herd.name, herd.id) for herd in self.herds), reverse=True)
+        second = paginator.page(paginator.page().next_cursor)
+        self.assertEqual(self.names(second), expected[5:10])
+
+    def test_deep_page_costs_a_single_query(self):
+        paginator = CursorPaginator(self.herds, ['name', 'id'], 2)
+        page = paginator.page()
+        while page.has_next:
+            with self.assertNumQueries(1):
+                page = paginator.page(page.next_cursor)
+        self.assertEqual(len(page), 1)
+
+    def test_invalid_cursor_selects_first_page(self):
+        paginator = CursorPaginator(self.herds, ['name', 'id'], 4)
+        first = self.names(paginator.page())
+        for cursor in ['%%%', 'bm90IGpzb24', paginator.encode_cursor('next', {'name': 'Herd 1', 'id': 'x'}),
+                       paginator.encode_cursor('sideways', {'name': 'Herd 1', 'id': 1})]:
+            self.assertEqual(self.names(paginator.page(cursor)), first)
+
+    def test_total_is_cached_until_data_changes(self):
+        paginator = CursorPaginator(self.herds, ['name', 'id'], 4)
+        self.assertEqual(paginator.page().total, 11)
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.total(), 11)
+        Herd.objects.create(name='Herd 9', location='Farm')
+        self.assertEqual(paginator.total(), 12)
+
+    def test_paginate_keeps_request_parameters(self):
+        request = RequestFactory().get('/', {'is_active': 'True', 'cursor': 'abc'})
+        page = paginate(request, self.herds, ['name', 'id'], 4)
+        self.assertEqual(page.params, 'is_active=True')
+
+    def test_herd_list_links(self):
+        response = self.client.get(reverse('my_farm:herd_list'), {'is_active': 'True'})
+        page = response.context['page_obj']
+        self.assertContains(response, f'?is_active=True&cursor={page.next_cursor}')
+        self.assertContains(response, '11 in total')
+        response = self.client.get(reverse('my_farm:herd_list'), {'cursor': page.next_cursor})
+        self.assertEqual(len(response.context['page_obj']), 5)
+
+    def test_ranked_search_pages(self):
+        Cattle.objects.bulk_create([Cattle(number=f'AN{index:03}', gender='Cow', breed='Angus',
+                                           comments='angus' * (index % 3), birth_date=date(2020, 1, 1))
+                                    for index in range(45)])
+        numbers = []
+        params = {'query': 'angus'}
+        while True:
+            page = self.client.get(reverse('my_farm:search_cattle'), params).context['cattle_list']
+            numbers.extend(cattle.number for cattle in page)
+            if not page.has_next:
+                break
+            params['cursor'] = page.next_cursor
+        self.assertEqual(sorted(numbers), [f'AN{index:03}' for index in range(45)])
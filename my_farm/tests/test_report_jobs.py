@@ -0,0 +1,87 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.cache import result_cache
+from my_farm.models import CattleMovementReport, ReportJob
+from my_farm.reports import claim_report_job, enqueue_report_job, run_report_job
+from my_farm.rollup import DailyRollup
+from my_farm.tests.test_ledger import create_herd
+
+
+class ReportJobTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        create_herd(30)
+        self.client.force_login(User.objects.create_user('farmer', password='password'))
+
+    def test_generate_report_enqueues_a_job(self):
+        response = self.client.post(reverse('my_farm:generate_report'),
+                                    {'start_date': '2022-01-01', 'end_date': '2022-12-31'})
+        job = ReportJob.objects.get()
+        self.assertRedirects(response, reverse('my_farm:report_job', args=[job.pk]))
+        self.assertEqual(job.status, ReportJob.PENDING)
+        self.assertEqual((job.start_date, job.end_date), (date(2022, 1, 1), date(2022, 12, 31)))
+        self.assertFalse(CattleMovementReport.objects.exists())
+
+        response = self.client.get(reverse('my_farm:report_job', args=[job.pk]))
+        self.assertTemplateUsed(response, 'my_farm/report_job.html')
+
+    def test_report_page_shows_the_job_of_the_session_dates(self):
+        response = self.client.get(reverse('my_farm:report'))
+        self.assertRedirects(response, reverse('my_farm:generate_report'))
+
+        self.client.post(reverse('my_farm:generate_report'), {'start_date': '2022-01-01', 'end_date': '2022-12-31'})
+        job = ReportJob.objects.get()
+        with self.assertNumQueries(2):
+            # The session and the job
+            response = self.client.get(reverse('my_farm:report'))
+        self.assertRedirects(response, reverse('my_farm:report_job', args=[job.pk]), fetch_redirect_response=False)
+        self.assertFalse(CattleMovementReport.objects.exists())
+
+    def test_worker_runs_pending_jobs(self):
+        earlier_job = enqueue_report_job(date(2021, 1, 1), date(2021, 12, 31))
+        job = enqueue_report_job(date(2022, 1, 1), date(2022, 12, 31))
+        output = StringIO()
+        call_command('run_report_worker', '--once', stdout=output)
+        self.assertIn('Ran 2 report jobs', output.getvalue())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.DONE)
+        self.assertIsNotNone(job.report)
+
+        response = self.client.get(reverse('my_farm:report_job_status', args=[job.pk]))
+        self.assertEqual(response.json(), {'status': 'Done', 'error': '', 'report_id': job.report.pk})
+
+        response = self.client.get(reverse('my_farm:report_job', args=[job.pk]))
+        self.assertTemplateUsed(response, 'my_farm/livestock_movement_report.html')
+        expected = DailyRollup().calculate(date(2022, 1, 1), date(2022, 12, 31))
+        for group, expected_group in zip(response.context['groups'], expected):
+            self.assertEqual(group.group_name, expected_group.group_name)
+            self.assertEqual(group.end_date_count, expected_group.end_date_count)
+            self.assertEqual(group.birth_count, expected_group.birth_count)
+
+        earlier_job.refresh_from_db()
+        self.assertEqual(list(response.context['last_reports']), [earlier_job.report])
+        self.assertContains(response, 'Cattle Movement Report (2021-01-01 - 2021-12-31)')
+
+    def test_job_is_claimed_once(self):
+        job = enqueue_report_job(date(2022, 1, 1), date(2022, 12, 31))
+        self.assertEqual(claim_report_job().pk, job.pk)
+        self.assertIsNone(claim_report_job())
+
+    def test_failed_job_records_the_error(self):
+        enqueue_report_job(date(2022, 1, 1), date(2022, 12, 31))
+        with mock.patch.object(DailyRollup, 'calculate', side_effect=ValueError('Invalid gender.')):
+            job = run_report_job(claim_report_job())
+        self.assertEqual(job.status, ReportJob.FAILED)
+        self.assertEqual(job.error, 'ValueError: Invalid gender.')
+        self.assertFalse(CattleMovementReport.objects.exists())
+
+        response = self.client.get(reverse('my_farm:report_job_status', args=[job.pk]))
+        self.assertEqual(response.json()['status'], 'Failed')
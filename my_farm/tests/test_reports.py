@@ -0,0 +1,124 @@
+import json
+from datetime import date
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.cache import result_cache
+from my_farm.groups import GroupsManagement, GroupNumbers
+from my_farm.models import CattleMovementReport
+from my_farm.reports import BALANCED_REPORT_SEMANTICS, REPORT_FIELDS, SNAPSHOT_REPORT_SEMANTICS, decode_cattle_ids, \
+    decode_report, diff_reports, encode_cattle_ids, encode_report, report_semantics, save_movement_report
+from my_farm.tests.test_ledger import create_herd
+
+compact_report_data = import_module('my_farm.migrations.0006_compact_report_data').compact_report_data
+
+
+class ReportSchemaTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        create_herd(30)
+        self.start_date, self.end_date = date(2022, 1, 1), date(2022, 12, 31)
+        groups_manager = GroupsManagement()
+        start_date_groups = groups_manager.calculate_snapshot_groups(self.start_date)
+        end_date_groups = groups_manager.calculate_snapshot_groups(self.end_date)
+        self.groups = []
+        for group_name, cattle_data in end_date_groups.items():
+            group = GroupNumbers(group_name, cattle_data)
+            group.quantity(start_date_groups, end_date_groups, self.start_date, self.end_date)
+            group.acquisition_loss(self.start_date, self.end_date)
+            group.check_movement(start_date_groups, end_date_groups)
+            self.groups.append(group)
+
+    def assert_same_numbers(self, groups):
+        self.assertEqual([group.group_name for group in groups], [group.group_name for group in self.groups])
+        for group, expected in zip(groups, self.groups):
+            for field in REPORT_FIELDS:
+                self.assertEqual(getattr(group, field), getattr(expected, field), field)
+
+    def test_reports_are_stored_with_native_numbers(self):
+        report = save_movement_report(self.start_date, self.end_date, self.groups)
+        report.refresh_from_db()
+        self.assertEqual(report.report_data['version'], 3)
+        self.assertEqual(report.report_data['semantics'], BALANCED_REPORT_SEMANTICS)
+        self.assertNotIn('group_data', json.dumps(report.report_data))
+        self.assertTrue(all(isinstance(value, (int, float)) for group in report.report_data['groups']
+                            for value in group[1:]))
+        self.assert_same_numbers(report.groups)
+
+    def test_cattle_ids_appendix(self):
+        report_data = encode_report(self.start_date, self.end_date, self.groups, include_cattle_ids=True)
+        for group in self.groups:
+            self.assertEqual(decode_cattle_ids(report_data['cattle_ids'][group.group_name]),
+                             sorted(group.group_data.cattle_ids()))
+        self.assertEqual(decode_cattle_ids(encode_cattle_ids([])), [])
+
+    def test_legacy_reports_are_migrated(self):
+        legacy_groups = [{**group.to_dict(), 'group_data': [{'cattle': {'id': cattle_id}, 'weight': 100}
+                                                           for cattle_id in group.group_data.cattle_ids()]}
+                         for group in self.groups]
+        report = CattleMovementReport.objects.create(
+            title='Cattle Movement Report (2022-01-01 - 2022-12-31)', report_data=json.dumps(legacy_groups))
+        self.assert_same_numbers(decode_report(report.report_data))
+
+        compact_report_data(apps, None)
+        report = CattleMovementReport.objects.get(pk=report.pk)
+        self.assertEqual(report.report_data['start_date'], '2022-01-01')
+        self.assertEqual(report.report_data['fields'], REPORT_FIELDS)
+        self.assertEqual(report_semantics(report.report_data), SNAPSHOT_REPORT_SEMANTICS)
+        self.assert_same_numbers(report.groups)
+        self.assertEqual(decode_cattle_ids(report.report_data['cattle_ids'][self.groups[0].group_name]),
+                         sorted(self.groups[0].group_data.cattle_ids()))
+
+
+class ReportDiffTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        first = GroupNumbers('Calves', [])
+        first.start_date_count, first.birth_count, first.end_date_group_weight = 4, 2, 350.5
+        second = GroupNumbers('Calves', [])
+        second.start_date_count, second.birth_count, second.end_date_group_weight = 6, 1, 420
+        cows = GroupNumbers('Cows', [])
+        cows.end_date_count = 3
+        self.report = save_movement_report(date(2023, 1, 1), date(2023, 3, 31), [first])
+        self.other_report = save_movement_report(date(2023, 4, 1), date(2023, 6, 30), [second, cows])
+
+    def test_diff_endpoint(self):
+        url = reverse('my_farm:report_diff', args=[self.report.pk, self.other_report.pk])
+        diff = self.client.get(url).json()
+        self.assertEqual(diff['report']['start_date'], '2023-01-01')
+        self.assertEqual(diff['other_report']['end_date'], '2023-06-30')
+
+        calves, cows = diff['groups']
+        self.assertEqual(calves['metrics']['start_date_count'], {'report': 4, 'other_report': 6, 'delta': 2})
+        self.assertEqual(calves['metrics']['birth_count']['delta'], -1)
+        self.assertEqual(calves['metrics']['end_date_group_weight']['delta'], 69.5)
+        self.assertEqual(cows['group_name'], 'Cows')
+        self.assertEqual(cows['metrics']['end_date_count'], {'report': 0, 'other_report': 3, 'delta': 3})
+        self.assertEqual(set(calves['metrics']), set(REPORT_FIELDS))
+
+    def test_diff_is_cached(self):
+        diff = diff_reports(self.report.pk, self.other_report.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(diff_reports(self.report.pk, self.other_report.pk), diff)
+
+        # Saved reports never change, so farm data changes do not invalidate the comparison
+        result_cache.bump_version()
+        with self.assertNumQueries(0):
+            diff_reports(self.report.pk, self.other_report.pk)
+
+    def test_missing_report(self):
+        response = self.client.get(reverse('my_farm:report_diff', args=[self.report.pk, 999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_reports_counted_with_different_rules_are_not_compared(self):
+        legacy_report = save_movement_report(date(2022, 10, 1), date(2022, 12, 31), [GroupNumbers('Calves', [])],
+                                             semantics=SNAPSHOT_REPORT_SEMANTICS)
+        with self.assertRaises(ValueError):
+            diff_reports(legacy_report.pk, self.report.pk)
+        response = self.client.get(reverse('my_farm:report_diff', args=[legacy_report.pk, self.report.pk]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(diff_reports(self.report.pk, self.other_report.pk)['report']['semantics'],
+                         BALANCED_REPORT_SEMANTICS)
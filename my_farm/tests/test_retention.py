@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from my_farm.models import CattleMovementReport, ReportJob
+from my_farm.retention import ReportRetention
+
+
+class ReportRetentionTestCase(TestCase):
+    def setUp(self):
+        # Two reports on the 1st and 15th of each month from January to June 2023
+        for month in range(1, 7):
+            for day in (1, 15):
+                report = CattleMovementReport.objects.create(title=f'Report {month}-{day}', report_data={'groups': []})
+                CattleMovementReport.objects.filter(pk=report.pk).update(
+                    generated_date=datetime(2023, month, day, tzinfo=timezone.utc))
+
+    def remaining_titles(self):
+        return list(CattleMovementReport.objects.order_by('generated_date').values_list('title', flat=True))
+
+    def test_keep_last(self):
+        reclaimed = ReportRetention(keep_last=3, batch_size=4).prune()
+        self.assertEqual(reclaimed['reports'], 9)
+        self.assertGreater(reclaimed['bytes'], 0)
+        self.assertEqual(self.remaining_titles(), ['Report 5-15', 'Report 6-1', 'Report 6-15'])
+
+    def test_keep_last_and_monthly(self):
+        ReportRetention(keep_last=2, keep_monthly=True).prune()
+        self.assertEqual(self.remaining_titles(), ['Report 1-1', 'Report 2-1', 'Report 3-1', 'Report 4-1',
+                                                   'Report 5-1', 'Report 6-1', 'Report 6-15'])
+
+    def test_max_age_keeps_newer_reports(self):
+        report = CattleMovementReport.objects.create(title='Today', report_data={'groups': []})
+        ReportRetention(keep_last=0, max_age_days=30).prune()
+        self.assertEqual(list(CattleMovementReport.objects.all()), [report])
+
+    def test_every_report_is_kept_without_count_or_age_policies(self):
+        self.assertEqual(ReportRetention(keep_last=0).prune(), {'reports': 0, 'bytes': 0})
+        self.assertEqual(ReportRetention(keep_last=20).prune()['reports'], 0)
+
+    def test_jobs_of_deleted_reports_are_kept(self):
+        job = ReportJob.objects.create(start_date=datetime(2023, 1, 1).date(), end_date=datetime(2023, 2, 1).date(),
+                                       status=ReportJob.DONE, report=CattleMovementReport.objects.earliest('id'))
+        ReportRetention(keep_last=1).prune()
+        job.refresh_from_db()
+        self.assertIsNone(job.report)
+
+    @override_settings(REPORT_RETENTION={'KEEP_LAST': 4, 'KEEP_MONTHLY': False})
+    def test_command(self):
+        output = StringIO()
+        call_command('prune_reports', '--dry-run', stdout=output)
+        self.assertIn('Would delete 8 reports', output.getvalue())
+        self.assertEqual(CattleMovementReport.objects.count(), 12)
+
+        call_command('prune_reports', stdout=output)
+        self.assertIn('Deleted 8 reports', output.getvalue())
+        self.assertEqual(CattleMovementReport.objects.count(), 4)
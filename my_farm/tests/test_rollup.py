@@ -0,0 +1,89 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.aggregates import group_totals
+from my_farm.cache import result_cache
+from my_farm.dashboard import rollup_active_cattle
+from my_farm.ledger import MovementLedger
+from my_farm.models import Cattle, DailyGroupRollup, MovementCheckpoint
+from my_farm.rollup import DailyRollup
+from my_farm.tests.test_ledger import create_herd
+
+
+class DailyRollupTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        create_herd(40)
+        self.rollup = DailyRollup()
+        self.rollup.update(date(2023, 12, 31))
+
+    def assert_matches_ledger(self, ranges):
+        expected = MovementLedger()._calculate_ranges(ranges)
+        with self.assertNumQueries(2):
+            periods = self.rollup.report_ranges(ranges)
+        for period, expected_period in zip(periods, expected):
+            for group, expected_group in zip(period['groups'], expected_period['groups']):
+                expected_numbers = expected_group.to_dict()
+                for attribute, value in group.to_dict().items():
+                    if attribute != 'group_data':
+                        self.assertEqual(value, expected_numbers[attribute], attribute)
+
+    def test_reports_match_the_ledger(self):
+        self.assert_matches_ledger([(date(2021, 1, 1), date(2023, 12, 31))])
+        self.assert_matches_ledger([(date(2021, 6, 1), date(2021, 12, 31)), (date(2022, 1, 1), date(2022, 9, 30))])
+
+    def test_update_only_processes_new_and_edited_days(self):
+        self.assertEqual(self.rollup.update(date(2023, 12, 31)), 0)
+        self.assertEqual(self.rollup.update(date(2024, 1, 10)), 10)
+
+        cattle = Cattle.objects.get(number='LT3')
+        cattle.loss_method = 'Sold'
+        cattle.end_date = date(2024, 1, 5)
+        cattle.save()
+        self.assertEqual(self.rollup.update(date(2024, 1, 10)), 6)
+        self.assert_matches_ledger([(date(2023, 6, 1), date(2024, 1, 10))])
+
+    def test_reports_fall_back_to_the_ledger_when_stale(self):
+        cattle = Cattle.objects.get(number='LT3')
+        cattle.end_date = date(2022, 6, 1)
+        cattle.loss_method = 'Death'
+        cattle.save()
+        self.assertIsNone(self.rollup.report_ranges([(date(2022, 1, 1), date(2022, 12, 31))]))
+        groups = self.rollup.calculate(date(2022, 1, 1), date(2022, 12, 31))
+        self.assertEqual(sum(group.death_count for group in groups),
+                         Cattle.objects.filter(loss_method='Death', end_date__year=2022).count())
+
+    def test_command(self):
+        output = StringIO()
+        call_command('rollup_daily_groups', '--until', '2024-01-31', stdout=output)
+        self.assertIn('Rolled up 31 days', output.getvalue())
+        self.assertEqual(DailyGroupRollup.objects.filter(date=date(2024, 1, 31)).count(), 6)
+        self.assertTrue(MovementCheckpoint.objects.filter(date=date(2023, 12, 31)).exists())
+        self.assertFalse(MovementCheckpoint.objects.filter(date=date(2024, 1, 31)).exists())
+
+    def test_home_reads_the_headcounts_of_the_rollup(self):
+        today = date.today()
+        cattle = Cattle.objects.filter(end_date__isnull=True, gender='Cow').first()
+        cattle.end_date = date(today.year + 1, 1, 1)
+        cattle.loss_method = 'Sold'
+        cattle.save()
+        totals = group_totals(today, Cattle.objects.filter(end_date__isnull=True))
+        expected = {group_name: group['count'] for group_name, group in totals.items()}
+        self.assertIsNone(rollup_active_cattle(today))
+
+        self.rollup.update()
+        self.assertEqual(rollup_active_cattle(today), expected)
+        # The headcounts of the rollup are the source of the summary
+        DailyGroupRollup.objects.filter(date=today, group_name='Calves').update(headcount=F('headcount') + 5)
+        user = User.objects.create_user('farmer', password='password')
+        self.client.force_login(user)
+        response = self.client.get(reverse('my_farm:home'))
+        self.assertEqual({group.group_name: group.active_cattle for group in response.context['groups']},
+                         {**expected, 'Calves': expected['Calves'] + 5})
+        self.assertEqual(response.context['total_cattle_count'], sum(expected.values()) + 5)
@@ -0,0 +1,69 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.constants import SEARCH_PAGE_SIZE
+from my_farm.models import Cattle
+from my_farm.search import match_expression, search_cattle, search_index_available
+
+
+class CattleSearchTestCase(TestCase):
+    def setUp(self):
+        self.bella = Cattle.objects.create(number='LT100', name='Bella', gender='Cow', breed='Angus',
+                                           birth_date=date(2020, 1, 1), acquisition_method='Purchase',
+                                           entry_date=date(2021, 1, 1), comments='Calm, bought at the Vilnius fair')
+        self.bruno = Cattle.objects.create(number='LT200', name='Bruno', gender='Bull', breed='Hereford',
+                                           birth_date=date(2020, 2, 1), acquisition_method='Born',
+                                           entry_date=date(2020, 2, 1), comments='Sired by Bella’s neighbour')
+
+    def numbers(self, cattle):
+        return [item.number for item in cattle]
+
+    def test_index_is_available(self):
+        self.assertTrue(search_index_available())
+
+    def test_match_expression(self):
+        self.assertEqual(match_expression('bel  "an'), '"bel"* AND "an"*')
+        self.assertIsNone(match_expression('- "'))
+        self.assertIsNone(match_expression('2020-02'))
+
+    def test_prefix_search(self):
+        self.assertEqual(self.numbers(search_cattle('bel')), ['LT100', 'LT200'])
+        self.assertEqual(self.numbers(search_cattle('vilni fair')), ['LT100'])
+        self.assertEqual(self.numbers(search_cattle('hereford')), ['LT200'])
+        self.assertEqual(self.numbers(search_cattle('LT2')), ['LT200'])
+
+    def test_name_ranks_before_comments(self):
+        self.assertEqual(self.numbers(search_cattle('bella')), ['LT100', 'LT200'])
+        self.assertEqual(self.numbers(search_cattle('bruno')), ['LT200'])
+
+    def test_index_follows_changes(self):
+        self.bella.name = 'Daisy'
+        self.bella.save()
+        Cattle.objects.filter(pk=self.bruno.pk).update(breed='Limousin')
+        self.assertEqual(self.numbers(search_cattle('daisy')), ['LT100'])
+        self.assertEqual(self.numbers(search_cattle('limou')), ['LT200'])
+        self.assertEqual(self.numbers(search_cattle('hereford')), [])
+
+        self.bruno.delete()
+        self.assertEqual(self.numbers(search_cattle('limousin')), [])
+        Cattle.objects.filter(pk=self.bruno.pk).delete()
+        self.assertEqual(self.numbers(search_cattle('limousin')), [])
+
+    def test_like_fallback(self):
+        with mock.patch('my_farm.search.search_index_available', return_value=False):
+            self.assertEqual(set(self.numbers(search_cattle('ella'))), {'LT100', 'LT200'})
+            self.assertEqual(self.numbers(search_cattle('2020-02')), ['LT200'])
+        self.assertEqual(self.numbers(search_cattle('-02-')), ['LT200'])
+
+    def test_search_view_is_paginated(self):
+        Cattle.objects.bulk_create([Cattle(number=f'AN{index:03}', gender='Cow', breed='Angus', comments='')
+                                    for index in range(SEARCH_PAGE_SIZE + 5)])
+        url = reverse('my_farm:search_cattle')
+        first = self.client.get(url, {'query': 'angus'}).context['cattle_list']
+        self.assertEqual(len(first), SEARCH_PAGE_SIZE)
+        response = self.client.get(url, {'query': 'angus', 'cursor': first.next_cursor})
+        self.assertEqual(len(response.context['cattle_list']), 6)
+        self.assertContains(response, '?query=angus&cursor=')
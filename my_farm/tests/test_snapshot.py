@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from my_farm.groups import GroupsManagement, GroupNumbers
+from my_farm.models import Cattle
+from my_farm.snapshot import HerdSnapshot, SnapshotGroup
+
+
+class HerdSnapshotTestCase(TestCase):
+    def setUp(self):
+        genders = ['Heifer', 'Bull', 'Cow']
+        acquisition_methods = ['Birth', 'Purchase', 'Gift']
+        loss_methods = ['Death', 'Sold', 'Consumed', 'Gifted']
+        Cattle.objects.bulk_create([
+            Cattle(number=f'LT{index}', gender=genders[index % 3], breed=['Angus', 'Crossbreed', 'Hereford'][index % 3],
+                   birth_date=date(2020, 6, 1) + timedelta(days=index * 11),
+                   acquisition_method=acquisition_methods[index % 3],
+                   entry_date=date(2021, 1, 1) + timedelta(days=index * 7),
+                   loss_method=loss_methods[index % 4] if index % 5 == 0 else None,
+                   end_date=date(2022, 3, 1) + timedelta(days=index * 8) if index % 5 == 0 else None,
+                   comments='')
+            for index in range(80)
+        ])
+        self.groups_manager = GroupsManagement()
+
+    def test_snapshot_groups_match_calculate_groups(self):
+        snapshot = HerdSnapshot.load()
+        for estimation_date in [date(2021, 6, 30), date(2022, 6, 30), date(2023, 1, 31)]:
+            expected = self.groups_manager.calculate_groups(estimation_date)
+            groups = self.groups_manager.calculate_snapshot_groups(estimation_date, snapshot)
+            self.assertEqual({group_name: list(group) for group_name, group in groups.items()},
+                             {group_name: [{'cattle': {field: item['cattle'][field] for field in
+                                                       ['id', 'gender', 'breed', 'birth_date', 'acquisition_method',
+                                                        'entry_date', 'loss_method', 'end_date']},
+                                            'weight': item['weight']} for item in group]
+                              for group_name, group in expected.items()})
+
+    def test_group_numbers_match_for_snapshot_groups(self):
+        start_date, end_date = date(2021, 1, 1), date(2022, 12, 31)
+        snapshot = HerdSnapshot.load()
+        start_date_groups = self.groups_manager.calculate_groups(start_date)
+        end_date_groups = self.groups_manager.calculate_groups(end_date)
+        start_snapshot_groups = self.groups_manager.calculate_snapshot_groups(start_date, snapshot)
+        end_snapshot_groups = self.groups_manager.calculate_snapshot_groups(end_date, snapshot)
+
+        for group_name in end_date_groups:
+            group = GroupNumbers(group_name, end_date_groups[group_name])
+            group.quantity(start_date_groups, end_date_groups, start_date, end_date)
+            group.acquisition_loss(start_date, end_date)
+            snapshot_group = GroupNumbers(group_name, end_snapshot_groups[group_name])
+            snapshot_group.quantity(start_snapshot_groups, end_snapshot_groups, start_date, end_date)
+            snapshot_group.acquisition_loss(start_date, end_date)
+            for attribute in ['start_date_count', 'end_date_count', 'start_date_group_weight', 'end_date_group_weight',
+                              'birth_count', 'purchase_count', 'gift_count', 'death_count', 'sold_count',
+                              'consumed_count', 'gifted_count']:
+                self.assertAlmostEqual(getattr(snapshot_group, attribute), getattr(group, attribute), 2)
+
+    def test_missing_values_round_trip(self):
+        snapshot = HerdSnapshot()
+        snapshot.append(1, 'Cow', None, None, None, date(2022, 1, 1), None, None)
+        snapshot.append(2, 'Cow', 'Jersey', None, 'Exchange', None, None, None)
+        self.assertEqual(snapshot.cattle(0), {
+            'id': 1, 'gender': 'Cow', 'breed': None, 'birth_date': None, 'acquisition_method': None,
+            'entry_date': date(2022, 1, 1), 'loss_method': None, 'end_date': None,
+        })
+        self.assertEqual(snapshot.cattle(1)['breed'], 'Jersey')
+        self.assertEqual(snapshot.cattle(1)['acquisition_method'], 'Exchange')
+        self.assertNotIn('Jersey', HerdSnapshot.BREEDS)
+
+    def test_snapshot_memory_is_compact(self):
+        snapshot = HerdSnapshot()
+        for index in range(500000):
+            snapshot.append(index, 'Cow', 'Angus', date(2020, 1, 1), 'Purchase', date(2021, 1, 1), None, None)
+        # Around 24 bytes per cattle, so half a million cattle stay well within tens of megabytes
+        self.assertEqual(snapshot.nbytes, 500000 * 24)
+
+    def test_from_group_data_keeps_snapshot_groups(self):
+        snapshot = HerdSnapshot.load()
+        group = snapshot.groups(date(2022, 6, 30))['Cows']
+        self.assertIs(SnapshotGroup.from_group_data(group), group)
@@ -0,0 +1,99 @@
+import json
+from datetime import date
+
+from django.test import TestCase
+from django.urls import reverse
+
+from my_farm.cache import result_cache
+from my_farm.models import Cattle, FarmDataVersion, Herd
+from my_farm.tags import TagIndex, tag_index, tag_trigrams
+
+
+class TagIndexTestCase(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        self.herd = Herd.objects.create(name='North', location='Farm')
+        self.cow = Cattle.objects.create(number='LT1001', gender='Cow', breed='Angus', birth_date=date(2019, 1, 1),
+                                         herd=self.herd, comments='')
+        self.calf = Cattle.objects.create(number='LT1002', gender='Heifer', breed='Angus',
+                                          birth_date=date(2023, 3, 1), comments='')
+        Cattle.objects.create(number='DE5550', gender='Bull', breed='Hereford', birth_date=date(2020, 1, 1),
+                              comments='')
+        self.index = TagIndex()
+        self.index.load()
+
+    def numbers(self, entries):
+        return [entry.number for entry in entries]
+
+    def test_trigrams(self):
+        self.assertEqual(tag_trigrams('AB'), {'  A', ' AB', 'AB '})
+
+    def test_exact_and_prefix_lookup(self):
+        match, entries = self.index.lookup(' lt1001 ')
+        self.assertEqual((match, self.numbers(entries)), ('exact', ['LT1001']))
+        match, entries = self.index.lookup('LT10')
+        self.assertEqual((match, self.numbers(entries)), ('prefix', ['LT1001', 'LT1002']))
+        self.assertEqual(self.index.lookup('LT10', limit=1)[1][0].number, 'LT1001')
+
+    def test_similar_lookup(self):
+        match, entries = self.index.lookup('DE5559')
+        self.assertEqual((match, self.numbers(entries)), ('similar', ['DE5550']))
+        self.assertEqual(self.index.lookup('XYZ'), (None, []))
+        self.assertEqual(self.index.lookup(''), (None, []))
+
+    def test_refresh_on_save_and_delete(self):
+        tag_index.load()
+        self.calf.number = 'LT2002'
+        self.calf.save()
+        self.assertTrue(tag_index.is_current())
+        self.assertEqual(tag_index.lookup('LT1002')[0], 'similar')
+        self.assertEqual(tag_index.lookup('LT2002')[0], 'exact')
+
+        self.calf.delete()
+        self.assertTrue(tag_index.is_current())
+        self.assertEqual(tag_index.lookup('LT2002'), (None, []))
+
+        pk = self.cow.pk
+        Cattle.objects.filter(pk=pk).delete()
+        self.assertTrue(tag_index.is_current())
+        self.assertNotIn(pk, tag_index.cattle_tags)
+
+    def test_reload_after_a_write_of_another_process(self):
+        tag_index.load()
+        # Another process renames the cow, then this process saves the calf
+        Cattle._base_manager.filter(pk=self.cow.pk).update(number='LT3001')
+        FarmDataVersion.objects.update(version='other-process')
+        self.calf.save()
+        self.assertFalse(tag_index.is_current())
+        self.assertEqual(tag_index.resolve(['LT3001'])[0]['match'], 'exact')
+
+    def test_reload_after_bulk_update(self):
+        tag_index.load()
+        Cattle.objects.filter(pk=self.cow.pk).update(number='LT3001')
+        self.assertFalse(tag_index.is_current())
+        self.assertEqual(tag_index.resolve(['LT3001'])[0]['match'], 'exact')
+
+    def test_resolve(self):
+        results = tag_index.resolve(['LT1001', 'lt1002', 'nope'], on_date=date(2024, 1, 1))
+        self.assertEqual(results[0], {'tag': 'LT1001', 'match': 'exact', 'cattle': [
+            {'id': self.cow.pk, 'number': 'LT1001', 'herd_id': self.herd.pk, 'herd': 'North', 'age_class': 'Cows',
+             'active': True}]})
+        self.assertEqual(results[1]['cattle'][0]['age_class'], 'Calves')
+        self.assertEqual(results[2], {'tag': 'nope', 'match': None, 'cattle': []})
+
+    def test_lookup_endpoint(self):
+        url = reverse('my_farm:lookup_tags')
+        tags = ['LT1001', 'LT1002'] * 200
+        tag_index.resolve([])
+        # Only the shared data version is read
+        with self.assertNumQueries(1):
+            response = self.client.post(url, json.dumps({'tags': tags}), content_type='application/json')
+        results = response.json()['results']
+        self.assertEqual(len(results), 400)
+        self.assertEqual(results[1]['cattle'][0]['id'], self.calf.pk)
+
+        self.assertEqual(self.client.post(url, 'tags', content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.post(url, json.dumps({'tags': 'LT1'}),
+                                          content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.post(url, json.dumps({'tags': ['LT1'] * 1001}),
+                                          content_type='application/json').status_code, 400)
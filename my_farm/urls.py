@@ -3,11 +3,14 @@ from django.urls import path
 from .views import home, group_data
 from .views_herd import herd_list, add_herd, herd_detail, cattle_list_by_herd, search_herd, update_herd, \
     upload_herd_picture
-from .views_movement_report import GenerateReportView, LivestockMovementReportView
+from .views_movement_report import GenerateReportView, LivestockMovementReportView, MultiPeriodReportView, \
+    report_job, report_job_status, report_diff
+from .views_census import herd_census, report_cache_stats
 from .views_field import field_list, field_detail, herd_list_by_field, update_field, add_field, upload_field_picture, \
     search_field
 from .views_cattle import cattle_info, add_cattle, update_cattle, search_cattle, cattle_detail, \
-    delete_confirmation_page, CattleDeleteView, upload_cattle_picture
+    delete_confirmation_page, CattleDeleteView, upload_cattle_picture, export_cattle, \
+    import_cattle, bulk_cattle, lookup_tags
 
 
 app_name = "my_farm"
@@ -21,6 +24,12 @@ urlpatterns = [
     path('livestock_movement_report/', LivestockMovementReportView.as_view(), name='report'),
     path('livestock_movement_report/last_reports/', LivestockMovementReportView.as_view(), {'last_reports': True},
          name='last_reports'),
+    path('livestock_movement_report/periods/', MultiPeriodReportView.as_view(), name='multi_period_report'),
+    path('report_job/<int:job_id>/', report_job, name='report_job'),
+    path('report_job/<int:job_id>/status/', report_job_status, name='report_job_status'),
+    path('report_diff/<int:report_id>/<int:other_report_id>/', report_diff, name='report_diff'),
+    path('herd_census/', herd_census, name='herd_census'),
+    path('report_cache_stats/', report_cache_stats, name='report_cache_stats'),
 
     path('cattle_info/', cattle_info, name='cattle_info'),
     path('cattle/<int:cattle_id>/', cattle_detail, name='cattle_detail'),
@@ -30,6 +39,10 @@ urlpatterns = [
     path('cattle/delete/<int:pk>/', CattleDeleteView.as_view(), name='delete_cattle'),
     path('confirmation_page/', delete_confirmation_page, name='delete_confirmation_page'),
     path('search_cattle/', search_cattle, name='search_cattle'),
+    path('export_cattle/', export_cattle, name='export_cattle'),
+    path('import_cattle/', import_cattle, name='import_cattle'),
+    path('bulk_cattle/', bulk_cattle, name='bulk_cattle'),
+    path('lookup_tags/', lookup_tags, name='lookup_tags'),
 
     path('herds/', herd_list, name='herd_list'),
     path('herds/<int:herd_id>/', herd_detail, name='herd_detail'),
@@ -1,18 +1,44 @@
-from django.core.paginator import Paginator
-from django.db.models import Q
-from django.http import HttpResponseRedirect, Http404
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from django.http import HttpResponseRedirect, Http404, HttpResponseBadRequest, StreamingHttpResponse, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_POST
 from django.views.generic import DeleteView
-from my_cattle.forms import GenderForm, CattleForm
+from my_cattle.forms import GenderForm, CattleForm, CattleImportForm
+from my_farm.bulk import BULK_FILTERS, move_to_herd, record_loss, select_cattle, soft_delete
+from my_farm.constants import EXPORT_CHUNK_SIZE, SEARCH_PAGE_SIZE, TAG_LOOKUP_MAX_TAGS
+from my_farm.imports import CattleImport
 from my_farm.models import Cattle, Herd
-
+from my_farm.pagination import paginate
+from my_farm.search import search_cattle as cattle_search
+from my_farm.tags import tag_index
+
+# The cattle columns that can be displayed and exported, by label.
+CATTLE_COLUMNS = {
+    'ID': 'id',
+    'Type': 'type',
+    'Number': 'number',
+    'Name': 'name',
+    'Gender': 'gender',
+    'Breed': 'breed',
+    'Birth Date': 'birth_date',
+    'Acquisition Method': 'acquisition_method',
+    'Entry Date': 'entry_date',
+    'Loss Method': 'loss_method',
+    'End Date': 'end_date',
+    'Comments': 'comments',
+}
 
 
 def cattle_info(request):
     """
     Retrieves cattle information and handles column selection for display.
-    The cattle are paginated to display 5 cattle per page.
+    The cattle are paginated by number to display 4 cattle per page.
 
     :param request: The HTTP request object.
     :return: The rendered HTTP response with the cattle information displayed.
@@ -24,37 +50,19 @@ def cattle_info(request):
     if query_loss_method_null:
         cattle = cattle.filter(loss_method__isnull=True)
 
-    paginator = Paginator(cattle, 4)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, cattle, ['number'], 4)
 
     context = {
         'cattle': page_obj,
     }
 
-    all_columns = ['ID', 'Type', 'Number', 'Name', 'Gender', 'Breed', 'Birth Date',
-                   'Acquisition Method', 'Entry Date', 'Loss Method', 'End Date', 'Comments']
+    all_columns = list(CATTLE_COLUMNS)
 
     if request.method == 'POST':
         selected_columns = request.POST.getlist('columns')
 
         if len(selected_columns) > 0:
-            column_dict = {
-                'ID': 'id',
-                'Type': 'type',
-                'Number': 'number',
-                'Name': 'name',
-                'Gender': 'gender',
-                'Breed': 'breed',
-                'Birth Date': 'birth_date',
-                'Acquisition Method': 'acquisition_method',
-                'Entry Date': 'entry_date',
-                'Loss Method': 'loss_method',
-                'End Date': 'end_date',
-                'Comments': 'comments'
-            }
-
-            selected_fields = [column_dict[column] for column in selected_columns]
+            selected_fields = [CATTLE_COLUMNS[column] for column in selected_columns]
 
             cattle = cattle.values(*selected_fields)
         else:
@@ -69,34 +77,108 @@ def cattle_info(request):
     return render(request, 'cattle/cattle_info.html', context)
 
 
+class Echo:
+    """
+    A file-like object that returns what is written to it instead of storing it, used to stream CSV rows.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_cattle(request):
+    """
+    Streams the cattle that are not deleted as a CSV or NDJSON file.
+
+    The cattle are read in chunks of EXPORT_CHUNK_SIZE and written row by row, so memory use does not grow with the
+    herd. The response is compressed on the fly when the client accepts gzip.
+
+    The 'format' query parameter selects 'csv' (the default) or 'ndjson'. The 'columns' parameters select the columns,
+    by label or field name as in cattle_info, all columns by default. 'query_loss_method_null' limits the export to
+    cattle that have not left the farm.
+
+    :param request: The HTTP request object.
+    :return: The streaming HTTP response with the exported cattle.
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return HttpResponseBadRequest("The format must be 'csv' or 'ndjson'.")
+
+    fields = list(CATTLE_COLUMNS.values())
+    selected_columns = request.GET.getlist('columns')
+    if selected_columns:
+        if any(column not in CATTLE_COLUMNS and column not in fields for column in selected_columns):
+            return HttpResponseBadRequest('Unknown column.')
+        fields = [CATTLE_COLUMNS.get(column, column) for column in selected_columns]
+
+    cattle = Cattle.objects.filter(deleted=False)
+    if request.GET.get('query_loss_method_null'):
+        cattle = cattle.filter(loss_method__isnull=True)
+    rows = cattle.order_by('id').values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        lines = (writer.writerow(row) for row in _with_header(fields, rows))
+        content_type = 'text/csv'
+    else:
+        lines = (json.dumps(dict(zip(fields, row)), default=str) + '\n' for row in rows)
+        content_type = 'application/x-ndjson'
+
+    chunks = (line.encode() for line in lines)
+    gzipped = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if gzipped:
+        chunks = _gzip_chunks(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="cattle.{export_format}"'
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def _with_header(fields, rows):
+    """
+    Yields the field names followed by the rows.
+    """
+    yield fields
+    yield from rows
+
+
+def _gzip_chunks(chunks):
+    """
+    Compresses a stream of byte strings into a gzip stream, yielding compressed data as soon as it is available.
+
+    :param chunks: The byte strings.
+    :return: A generator of gzip compressed byte strings.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
 def search_cattle(request):
     """
     Performs a search query on the Cattle model based on the provided query parameter.
-    It filters the cattle_list based on various fields and renders the search_cattle.html template.
+    The found cattle are ranked by relevance, paginated and rendered with the search_cattle.html template.
 
     :param request: The HTTP request object.
-    :return: The rendered search_cattle page with the filtered cattle_list and query parameter as context.
+    :return: The rendered search_cattle page with the page of found cattle and query parameter as context.
     """
     query = request.GET.get('query')
     if query:
-        cattle_list = Cattle.objects.filter(deleted=False).filter(
-            Q(type__icontains=query) |
-            Q(number__icontains=query) |
-            Q(name__icontains=query) |
-            Q(gender__icontains=query) |
-            Q(breed__icontains=query) |
-            Q(birth_date__icontains=query) |
-            Q(acquisition_method__icontains=query) |
-            Q(entry_date__icontains=query) |
-            Q(loss_method__icontains=query) |
-            Q(end_date__icontains=query) |
-            Q(comments__icontains=query)
-        )
+        cattle_list = cattle_search(query)
     else:
         cattle_list = Cattle.objects.filter(deleted=False)
 
+    ordering = ['rank', 'number'] if 'rank' in cattle_list.query.annotations else ['number']
+    page_obj = paginate(request, cattle_list, ordering, SEARCH_PAGE_SIZE)
+
     context = {
-        'cattle_list': cattle_list,
+        'cattle_list': page_obj,
         'query': query,
     }
     return render(request, 'cattle/search_cattle.html', context)
@@ -124,6 +206,88 @@ def add_cattle(request):
     return render(request, 'cattle/add_cattle.html', {'form': form, 'herd_queryset': herd_queryset})
 
 
+def import_cattle(request):
+    """
+    Imports cattle from an uploaded CSV file and displays the rows that could not be imported.
+
+    :param request: The HTTP request object.
+    :return: The rendered HTTP response with the form, or with the import statistics and errors.
+    """
+    stats = None
+    if request.method == 'POST':
+        form = CattleImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            csv_file = io.TextIOWrapper(form.cleaned_data['csv_file'].file, encoding='utf-8-sig', newline='')
+            try:
+                stats = CattleImport().import_csv(csv_file)
+            except (ValueError, UnicodeDecodeError) as error:
+                form.add_error('csv_file', str(error))
+    else:
+        form = CattleImportForm()
+    return render(request, 'cattle/import_cattle.html', {'form': form, 'stats': stats})
+
+
+@require_POST
+def bulk_cattle(request):
+    """
+    Applies an operation to many cattle at once with a single update, see my_farm.bulk.
+
+    The cattle are selected by the 'cattle_ids' parameters or by the 'herd', 'gender', 'breed', 'acquisition_method'
+    and 'active' filters. The 'action' parameter selects the operation:
+
+    - 'move_herd' moves the cattle to the herd with the 'herd_id' parameter, or out of their herd without it.
+    - 'record_loss' sets the 'loss_method' and the 'end_date' in YYYY-MM-DD format.
+    - 'delete' soft deletes the cattle.
+
+    :param request: The HTTP request object.
+    :return: The JSON response with the 'action' and the number of cattle 'updated', or an 'error'.
+    """
+    action = request.POST.get('action')
+    filters = {name: request.POST[name] for name in [*BULK_FILTERS, 'active'] if request.POST.get(name)}
+    try:
+        cattle = select_cattle(request.POST.getlist('cattle_ids'), filters)
+        if action == 'move_herd':
+            herd = get_object_or_404(Herd, id=request.POST['herd_id']) if request.POST.get('herd_id') else None
+            updated = move_to_herd(cattle, herd)
+        elif action == 'record_loss':
+            try:
+                end_date = date.fromisoformat(request.POST.get('end_date', ''))
+            except ValueError:
+                return JsonResponse({'error': 'The end date must be in YYYY-MM-DD format.'}, status=400)
+            updated = record_loss(cattle, request.POST.get('loss_method'), end_date)
+        elif action == 'delete':
+            updated = soft_delete(cattle)
+        else:
+            return JsonResponse({'error': "The action must be 'move_herd', 'record_loss' or 'delete'."}, status=400)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    return JsonResponse({'action': action, 'updated': updated})
+
+
+@require_POST
+def lookup_tags(request):
+    """
+    Resolves a batch of scanned ear tags to cattle in one round trip, with the in-memory ear tag index.
+
+    The request body is JSON with the list of 'tags'. Each tag matches exactly, as a prefix or, for misread tags, by
+    similarity.
+
+    :param request: The HTTP request object.
+    :return: The JSON response with the 'results' of the tags in the requested order, or an 'error'.
+    """
+    try:
+        tags = json.loads(request.body).get('tags')
+    except (ValueError, AttributeError):
+        tags = None
+    if not isinstance(tags, list) or not all(isinstance(tag, (str, int)) for tag in tags):
+        return JsonResponse({'error': "The request body must be JSON with a list of 'tags'."}, status=400)
+    if len(tags) > TAG_LOOKUP_MAX_TAGS:
+        return JsonResponse({'error': f'At most {TAG_LOOKUP_MAX_TAGS} tags can be looked up at once.'}, status=400)
+
+    return JsonResponse({'results': tag_index.resolve(tags)})
+
+
 def update_cattle(request, cattle_id=None):
     """
     Updates the information of a specific cattle based on the submitted form data.
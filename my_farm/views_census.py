@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+from django.http import JsonResponse
+from .cache import result_cache
+from .census import HerdCensus
+
+DEFAULT_CENSUS_DAYS = 365
+MAX_CENSUS_DAYS = 3660
+
+
+def herd_census(request):
+    """
+    Returns the daily headcount and estimated live weight of each age group as JSON.
+
+    The date range is taken from the 'start_date' and 'end_date' query parameters in ISO format. It defaults to the
+    last 365 days up to today.
+
+    :param request: The HTTP request object.
+    :return: The JSON response with the census dates and the daily 'count' and 'weight' series of each group.
+    """
+    try:
+        end_date = date.fromisoformat(request.GET['end_date']) if request.GET.get('end_date') else date.today()
+        start_date = date.fromisoformat(request.GET['start_date']) if request.GET.get('start_date') else \
+            end_date - timedelta(days=DEFAULT_CENSUS_DAYS - 1)
+    except ValueError:
+        return JsonResponse({'error': 'Dates must be in YYYY-MM-DD format.'}, status=400)
+
+    if end_date < start_date:
+        return JsonResponse({'error': 'The end date must not be earlier than the start date.'}, status=400)
+    if (end_date - start_date).days >= MAX_CENSUS_DAYS:
+        return JsonResponse({'error': f'The census can cover at most {MAX_CENSUS_DAYS} days.'}, status=400)
+
+    return JsonResponse(HerdCensus(start_date, end_date).calculate_census())
+
+
+def report_cache_stats(request):
+    """
+    Returns the hit and miss counters of the report cache of the serving process as JSON.
+
+    :param request: The HTTP request object.
+    :return: The JSON response with the 'hits', 'misses', 'hit_rate' and current 'data_version'.
+    """
+    return JsonResponse({**result_cache.stats(), 'data_version': result_cache.data_version()})
@@ -1,27 +1,27 @@
-from django.core.paginator import Paginator
-from django.db.models import Count, Q
+from django.db.models import Q
 from django.shortcuts import render, redirect, get_object_or_404
 from my_cattle.forms import FieldForm
+from .bulk import assign_herds_to_field
+from .constants import SEARCH_PAGE_SIZE
+from .pagination import paginate
 from .models import Field, Herd
 
 
 def field_list(request):
     """
     Retrieves field information and displays the list of fields.
-    The fields are paginated to display 5 fields per page.
+    The fields are paginated by name to display 5 fields per page.
 
     :param request: The HTTP request object.
     :return: The rendered HTTP response with the field information displayed.
     """
     is_active = request.GET.get('is_active')
-    fields = Field.objects.annotate(count_herd=Count('field_herds'))
+    fields = Field.objects.all()
 
     if is_active == 'True':
         fields = fields.filter(is_active=True)
 
-    paginator = Paginator(fields, 5)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, fields, ['name', 'id'], 5)
 
     return render(request, 'fields/field_list.html', {'page_obj': page_obj})
 
@@ -37,12 +37,7 @@ def add_field(request):
         form = FieldForm(request.POST, request.FILES)
         if form.is_valid():
             field = form.save()
-            herd_ids = request.POST.getlist('herd')
-            herds = Herd.objects.filter(id__in=herd_ids)
-
-            for herd in herds:
-                herd.field = field
-                herd.save()
+            assign_herds_to_field(request.POST.getlist('herd'), field)
 
             return redirect('my_farm:field_list')
     else:
@@ -85,9 +80,6 @@ def field_detail(request, field_id=None):
     """
     field = get_object_or_404(Field, id=field_id) if field_id else None
 
-    if field:
-        field.herd_count = field.field_herds.count()
-
     return render(request, 'fields/field_detail.html', {'field': field})
 
 
@@ -123,9 +115,7 @@ def herd_list_by_field(request, field_id):
     :return: The rendered herd_list_by_field page with the field and herd_list as context.
     """
     field = get_object_or_404(Field, id=field_id)
-    herd_list = Herd.objects.filter(field=field).annotate(
-        count_cattle=Count('cattle', filter=Q(cattle__deleted=False, cattle__loss_method__isnull=True))
-    )
+    herd_list = Herd.objects.filter(field=field).select_related('herd_leader')
 
     return render(request, 'fields/herd_list_by_field.html', {'field': field, 'herd_list': herd_list})
 
@@ -146,7 +136,7 @@ def search_field(request):
         except KeyError:
             is_active_value = None
 
-        field_list = Field.objects.annotate(count_herd=Count('field_herds')).filter(
+        field_list = Field.objects.filter(
             Q(name__icontains=query) |
             Q(location__icontains=query) |
             Q(coordinates__icontains=query) |
@@ -157,10 +147,10 @@ def search_field(request):
             Q(is_active=is_active_value)
         )
     else:
-        field_list = Field.objects.annotate(count_herd=Count('field_herds'))
+        field_list = Field.objects.all()
 
     context = {
-        'field_list': field_list,
+        'field_list': paginate(request, field_list, ['name', 'id'], SEARCH_PAGE_SIZE),
         'query': query,
     }
     return render(request, 'fields/search_field.html', context)
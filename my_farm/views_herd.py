@@ -1,37 +1,30 @@
-from django.core.paginator import Paginator
-from django.db.models import Count, Q
+from django.db.models import Q
 from django.shortcuts import render, redirect, get_object_or_404
 from my_cattle.forms import HerdForm
+from my_farm.constants import LIST_PAGE_SIZE, SEARCH_PAGE_SIZE
 from my_farm.models import Cattle, Herd
+from my_farm.pagination import paginate
 
 
 def herd_list(request):
     """
     Retrieves herd information and displays the list of herds.
 
-    This view retrieves information about herds, including the number of active cattle in each herd. Only cattle that
-    are not marked as deleted and have no loss method specified are counted. The herds are paginated to display 5 herds
-    per page.
+    This view retrieves information about herds, including the number of active cattle in each herd, read from the
+    maintained herd counters. Only cattle that are not marked as deleted and have no loss method specified are
+    counted. The herds are paginated by name to display 5 herds per page.
 
     :param request: The HTTP request object.
     :return: The rendered HTTP response with the herd information displayed.
 
     """
-
-    cattle_count_query = Count(
-        'cattle',
-        filter=Q(cattle__deleted=False, cattle__loss_method__isnull=True)
-    )
-
     is_active = request.GET.get('is_active')
 
-    herds = Herd.objects.annotate(count_cattle=cattle_count_query)
+    herds = Herd.objects.select_related('field', 'herd_leader')
     if is_active == 'True':
         herds = herds.filter(is_active=True)
 
-    paginator = Paginator(herds, 5)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, herds, ['name', 'id'], 5)
 
     context = {'page_obj': page_obj}
     return render(request, 'herd/herd_list.html', context)
@@ -108,9 +101,6 @@ def herd_detail(request, herd_id=None):
     """
     herd = get_object_or_404(Herd, id=herd_id) if herd_id else None
 
-    if herd:
-        herd.cattle_count = herd.cattle_set.filter(deleted=False, loss_method__isnull=True).count()
-
     return render(request, 'herd/herd_detail.html', {'herd': herd})
 
 
@@ -147,7 +137,8 @@ def cattle_list_by_herd(request, herd_id):
     :return: The rendered cattle_list_by_herd page with the herd and cattle_list as context.
     """
     herd = get_object_or_404(Herd, id=herd_id)
-    cattle_list = Cattle.objects.filter(herd=herd, deleted=False, loss_method__isnull=True)
+    cattle_list = paginate(request, Cattle.objects.filter(herd=herd, deleted=False, loss_method__isnull=True),
+                           ['number'], LIST_PAGE_SIZE)
 
     context = {
         'herd': herd,
@@ -173,23 +164,21 @@ def search_herd(request):
         except KeyError:
             is_active_value = None
 
-        herd_list = Herd.objects.annotate(
-            count_cattle=Count('cattle')
-        ).filter(
+        herd_list = Herd.objects.select_related('field', 'herd_leader').filter(
             Q(name__icontains=query) |
             Q(location__icontains=query) |
             Q(field__name__icontains=query) |
             Q(description__icontains=query) |
             Q(start_date__icontains=query) |
             Q(herd_leader__name__icontains=query) |
-            Q(count_cattle__icontains=query) |
+            Q(total_cattle_count__icontains=query) |
             Q(is_active=is_active_value)
         )
     else:
-        herd_list = Herd.objects.annotate(count_cattle=Count('cattle'))
+        herd_list = Herd.objects.select_related('field', 'herd_leader')
 
     context = {
-        'herd_list': herd_list,
+        'herd_list': paginate(request, herd_list, ['name', 'id'], SEARCH_PAGE_SIZE),
         'query': query,
     }
     return render(request, 'herd/search_herd.html', context)
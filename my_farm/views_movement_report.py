@@ -1,10 +1,12 @@
 from datetime import date, datetime
-from django.shortcuts import render, redirect
+from django.http import JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
-from .constants import MAX_REPORTS
-from .groups import GroupsManagement, GroupNumbers
+from .groups import GroupsManagement, PERIOD_GRANULARITIES
 import json
-from .models import CattleMovementReport
+from .models import CattleMovementReport, ReportJob
+from .reports import diff_reports, enqueue_report_job
+from .rollup import DailyRollup
 
 
 class GenerateReportView(View):
@@ -47,24 +49,34 @@ class GenerateReportView(View):
         """
         Handles the POST request for generating a report.
 
+        Single period reports are queued for the report worker, see my_farm.reports, and the user is redirected to
+        the status page of the job.
+
         :param: request (HttpRequest): The HTTP request object.
-        :return:HttpResponse: The redirect HTTP response to the report page.
+        :return:HttpResponse: The redirect HTTP response to the report or report job page.
         """
         start_date = datetime.fromisoformat(request.POST.get('start_date')).date()
         end_date = datetime.fromisoformat(request.POST.get('end_date')).date()
 
+        granularity = request.POST.get('granularity')
+
         # Store the data in session
         request.session['report_data'] = {
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat(),
         }
 
-        return redirect('my_farm:report')
+        if granularity in PERIOD_GRANULARITIES:
+            request.session['report_data']['granularity'] = granularity
+            return redirect('my_farm:multi_period_report')
+
+        job = enqueue_report_job(start_date, end_date)
+        return redirect('my_farm:report_job', job_id=job.pk)
 
 
 class LivestockMovementReportView(GroupsManagement, GenerateReportView, View):
     """
-    A view class for generating and displaying the livestock movement report.
+    A view class for displaying the livestock movement report.
 
     Inherits from GroupsManagement, GenerateReportView, and View.
 
@@ -74,7 +86,7 @@ class LivestockMovementReportView(GroupsManagement, GenerateReportView, View):
     Methods:
         __init__(): Initializes the class and sets initial values.
         load_report_data(request): Loads the report data from the session.
-        get(request): Handles the GET request for generating and displaying the report.
+        get(request): Handles the GET request for displaying the report of the latest report job.
     """
 
     report_template = 'my_farm/livestock_movement_report.html'
@@ -83,13 +95,12 @@ class LivestockMovementReportView(GroupsManagement, GenerateReportView, View):
         """
         Initializes the LivestockMovementReportView class.
 
-        Calls the __init__ methods of the super classes and sets initial values for groups and encoder_class attributes.
+        Calls the __init__ methods of the super classes and sets the initial value for the groups attribute.
         """
         super(GroupsManagement, self).__init__()
         super(GenerateReportView, self).__init__()
         super(View, self).__init__()
         self.groups = []
-        self.encoder_class = GroupNumbersEncoder
 
     def load_report_data(self, request):
         """
@@ -112,7 +123,74 @@ class LivestockMovementReportView(GroupsManagement, GenerateReportView, View):
 
     def get(self, request):
         """
-        Handles the GET request for generating and displaying the livestock movement report.
+        Handles the GET request for displaying the livestock movement report.
+
+        The report is calculated by the report worker, so the request is redirected to the latest report job for the
+        dates of the session, see report_job. Nothing is calculated or saved here.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            HttpResponse: The redirect HTTP response to the report job page, or to the generate report page if no
+            report was generated for the dates.
+        """
+        if not self.load_report_data(request):
+            return redirect('my_farm:generate_report')
+
+        job = ReportJob.objects.filter(start_date=self.start_date, end_date=self.end_date).order_by('-id').first()
+        if job is None:
+            return redirect('my_farm:generate_report')
+
+        return redirect('my_farm:report_job', job_id=job.pk)
+
+
+class MultiPeriodReportView(LivestockMovementReportView):
+    """
+    A view class for generating and displaying the livestock movement report split into monthly, quarterly or yearly
+    periods, with a column for each period and a column with the totals.
+
+    Inherits from LivestockMovementReportView.
+
+    Attributes:
+        report_template (str): The template for rendering the report.
+        report_rows (list): The labels and GroupNumbers attributes of the report rows.
+
+    Methods:
+        get(request): Handles the GET request for generating and displaying the report.
+    """
+
+    report_template = 'my_farm/multi_period_report.html'
+    report_rows = [
+        ('Beginning of period, pcs', 'start_date_count'),
+        ('Beginning of period, kg', 'start_date_group_weight'),
+        ('Births, pcs', 'birth_count'),
+        ('Births, kg', 'birth_weight'),
+        ('Purchases, pcs', 'purchase_count'),
+        ('Purchases, kg', 'purchase_weight'),
+        ('Gifts, pcs', 'gift_count'),
+        ('Gifts, kg', 'gift_weight'),
+        ('Moved to group, pcs', 'moved_in'),
+        ('Moved to group, kg', 'weight_moved_in'),
+        ('Moved from group, pcs', 'moved_out'),
+        ('Moved from group, kg', 'weight_moved_out'),
+        ('Deaths, pcs', 'death_count'),
+        ('Deaths, kg', 'death_weight'),
+        ('Sold, pcs', 'sold_count'),
+        ('Sold, kg', 'sold_weight'),
+        ('Consumed, pcs', 'consumed_count'),
+        ('Consumed, kg', 'consumed_weight'),
+        ('Gifted, pcs', 'gifted_count'),
+        ('Gifted, kg', 'gifted_weight'),
+        ('End of period, pcs', 'end_date_count'),
+        ('End of period, kg', 'end_date_group_weight'),
+        ('Difference, pcs', 'count_difference'),
+        ('Difference, kg', 'weight_difference'),
+    ]
+
+    def get(self, request):
+        """
+        Handles the GET request for generating and displaying the multi-period livestock movement report.
 
         Args:
             request (HttpRequest): The HTTP request object.
@@ -123,67 +201,83 @@ class LivestockMovementReportView(GroupsManagement, GenerateReportView, View):
         if not self.load_report_data(request):
             return redirect('my_farm:generate_report')
 
-        groups_manager = GroupsManagement()
+        granularity = request.session['report_data'].get('granularity')
+        if granularity not in PERIOD_GRANULARITIES:
+            return redirect('my_farm:report')
 
-        estimation_date = groups_manager.calculate_groups(estimation_date=self.end_date)
-        start_date_groups = groups_manager.calculate_groups(estimation_date=self.start_date)
-        end_date_groups = groups_manager.calculate_groups(estimation_date=self.end_date)
+        periods, totals = DailyRollup().calculate_periods(self.start_date, self.end_date, granularity)
 
-        self.groups = []
-        for group_name, cattle_data in estimation_date.items():
-            group = GroupNumbers(group_name, cattle_data)
-            group.quantity(start_date_groups, end_date_groups, self.start_date, self.end_date)
-            group.acquisition_loss(self.start_date, self.end_date)
-            group.check_movement(start_date_groups, end_date_groups)
-            self.groups.append(group)
+        report_groups = []
+        for index, total in enumerate(totals):
+            columns = [period['groups'][index] for period in periods] + [total]
+            rows = [(label, [getattr(column, attribute) for column in columns])
+                    for label, attribute in self.report_rows]
+            report_groups.append({'group_name': total.group_name, 'rows': rows})
 
         context = {
             'start_date': self.start_date.isoformat(),
             'end_date': self.end_date.isoformat(),
-            'groups': self.groups,
+            'granularity': granularity,
+            'periods': periods,
+            'report_groups': report_groups,
         }
 
-        group_dicts = [group.to_dict() for group in self.groups]
+        return render(request, self.report_template, context)
 
-        last_reports = CattleMovementReport.objects.order_by('-id')[1:4]
 
-        context['last_reports'] = last_reports
+def report_job(request, job_id):
+    """
+    Displays the status of a report job, or the finished livestock movement report once the job is done.
 
-        report_data = json.dumps(group_dicts, cls=self.encoder_class, default=str)
-        report_title = f'Cattle Movement Report ({self.start_date.isoformat()} - {self.end_date.isoformat()})'
-        report = CattleMovementReport(title=report_title, report_data=report_data)
-        report.save()
+    While the job is pending or running the page polls the report_job_status endpoint and reloads when it finishes.
 
-        all_reports = CattleMovementReport.objects.order_by('-id')
-        recent_reports = all_reports[:MAX_REPORTS]
+    :param request: The HTTP request object.
+    :param job_id: The ID of the report job.
+    :return: The rendered report, or the rendered status page of the job.
+    """
+    job = get_object_or_404(ReportJob.objects.select_related('report'), id=job_id)
 
-        old_reports = all_reports.exclude(pk__in=recent_reports)
-        old_reports.delete()
+    if job.status == ReportJob.DONE and job.report is not None:
+        context = {
+            'start_date': job.start_date.isoformat(),
+            'end_date': job.end_date.isoformat(),
+            'groups': job.report.groups,
+            'last_reports': CattleMovementReport.objects.exclude(pk=job.report.pk).order_by('-id')[:3],
+            'report_id': job.report.pk,
+        }
+        return render(request, LivestockMovementReportView.report_template, context)
 
-        context['report_id'] = report.pk
+    return render(request, 'my_farm/report_job.html', {'job': job})
 
-        return render(request, self.report_template, context)
 
+def report_job_status(request, job_id):
+    """
+    Returns the status of a report job as JSON, polled by the report job page.
 
-class GroupNumbersEncoder(json.JSONEncoder):
+    :param request: The HTTP request object.
+    :param job_id: The ID of the report job.
+    :return: The JSON response with the 'status' of the job, its 'error' and the 'report_id' once it is done.
     """
-    Custom JSON encoder for serializing objects of the GroupNumbers class.
+    job = get_object_or_404(ReportJob, id=job_id)
+    return JsonResponse({'status': job.status, 'error': job.error, 'report_id': job.report_id})
 
-    Methods:
-    default(self, obj): Overrides the default method of the JSONEncoder class.
+
+def report_diff(request, report_id, other_report_id):
     """
-    def default(self, obj):
-        """
-        Serializes the GroupNumbers object into a dictionary using the to_dict method.
+    Returns the change of every group metric between two saved livestock movement reports as JSON.
 
-        :param obj: The object to be serialized.
-        :return: The serialized dictionary representation of the object.
-        """
-        if isinstance(obj, GroupNumbers):
-            return obj.to_dict()
-        if isinstance(obj, date):
-            return obj.isoformat()
-        return super().default(obj)
+    :param request: The HTTP request object.
+    :param report_id: The ID of the report to compare from.
+    :param other_report_id: The ID of the report to compare to.
+    :return: The JSON response with the comparison, see my_farm.reports.diff_reports, a 404 response if either
+        report does not exist or a 400 response if the reports were counted with different rules.
+    """
+    try:
+        return JsonResponse(diff_reports(report_id, other_report_id))
+    except CattleMovementReport.DoesNotExist as error:
+        return JsonResponse({'error': str(error)}, status=404)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
 
 
 class DateEncoder(json.JSONEncoder):